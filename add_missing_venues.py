@@ -1,6 +1,14 @@
 import json
 import pandas as pd
 
+from map_index import write_index
+from precache_manifest import write_manifest
+from marker_clusters import write_clusters
+from time_index import write_time_index
+from search_index import write_search_index
+from snapshot_deltas import publish_snapshot
+from venue_registry import open_registry
+
 def add_missing_venues():
     """Add missing venues to the GeoJSON file."""
     
@@ -13,19 +21,16 @@ def add_missing_venues():
     print("Reading CSV file...")
     df = pd.read_csv('lexington_events_time_imperial_modified.csv')
     
-    # Define the missing venues with their coordinates
-    missing_venues = {
-        "Al's Bar of Lexington": {
-            "lat": 38.0540236,
-            "lon": -84.4863297,
-            "address": "Al's Bar, 601, North Limestone, Elsmere Park, Lexington, Fayette County, Kentucky, 40542, United States"
-        },
-        "Dreaming Creek Brewery": {
-            "lat": 37.7482288,
-            "lon": -84.2930104,
-            "address": "Dreaming Creek Brewery, 109, East Irvine Street, Richmond downtown, Richmond, Madison County, Kentucky, 40475, United States"
-        }
-    }
+    # Venues with events but no features, located through the venue registry
+    geojson_venues = {feature['properties']['Venue'] for feature in geojson_data['features']}
+    with open_registry() as registry:
+        missing_venues = {}
+        for venue_name in sorted(set(df['Location'].dropna()) - geojson_venues):
+            venue = registry.get(venue_name)
+            if venue is None:
+                print(f"  ⚠️  {venue_name} is not in the venue registry; run find_venue_coordinates.py")
+            else:
+                missing_venues[venue_name] = venue
     
     print(f"\n📍 Adding {len(missing_venues)} missing venues...")
     
@@ -67,6 +72,15 @@ def add_missing_venues():
     with open('shp/merged_venues_events.geojson', 'w') as f:
         json.dump(geojson_data, f, indent=2)
     
+    # Publish a new map data version and keep the front end's precomputed
+    # groupings, clusters, time index and search index in step with the GeoJSON
+    publish_snapshot()
+    write_clusters(index=write_index())
+    write_time_index()
+    write_search_index()
+    # Rehash the assets so the service worker re-fetches the new sidecars
+    write_manifest()
+    
     print("✅ Successfully added missing venues!")
     
     # Show summary
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Artist Enrichment for Scraped Events
+
+Every event has a Songkick link, but the map only shows what is on the
+listing page. This optional stage follows the links to each artist's page and
+adds a few fields for the popups:
+
+    Genres           "indie rock; folk"
+    On_Tour          True / False (None if the page doesn't say)
+    Similar_Artists  "Artist A; Artist B; Artist C"
+
+Event links usually point at a concert page, so the artist page is found
+from there (two requests the first time an artist is seen). Unique artists
+are fetched with a bounded thread pool over the shared rate-limited session,
+and results are cached per artist in a JSON file with a TTL:
+
+    artist_cache.json
+    {
+        "<normalized artist>": {
+            "artist": "King 810",
+            "artist_url": "https://www.songkick.com/artists/...",
+            "genres": [...], "on_tour": true, "similar_artists": [...],
+            "fetched_at": "2025-09-01T06:00:00"
+        }
+    }
+
+Only artists that are not cached, or whose entry has expired, are fetched,
+so after the first crawl a run costs a handful of requests.
+
+Usage:
+    python artist_enrichment.py [events.csv]
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import urljoin
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from dedup import normalize_text
+from event_extraction import SONGKICK_BASE_URL
+from http_client import create_session
+
+CACHE_FILE = 'artist_cache.json'
+
+# Cached artist data is refreshed after this long
+CACHE_TTL_DAYS = 7
+# Failed lookups are retried sooner
+ERROR_TTL_DAYS = 1
+
+# Concurrent artist lookups; the rate limiter still bounds requests per host
+MAX_WORKERS = 4
+
+# Save the cache after this many newly fetched artists
+CACHE_SAVE_INTERVAL = 20
+
+# Limits on what is kept per artist
+MAX_GENRES = 5
+MAX_SIMILAR_ARTISTS = 5
+
+# Output columns, keyed by cache field
+ENRICHMENT_COLUMNS = {
+    'genres': 'Genres',
+    'on_tour': 'On_Tour',
+    'similar_artists': 'Similar_Artists'
+}
+
+LIST_SEPARATOR = '; '
+
+ARTIST_PATH_PATTERN = re.compile(r'/artists/\d+')
+ON_TOUR_PATTERN = re.compile(r'On tour\s*:?\s*(yes|no)', re.IGNORECASE)
+
+
+def find_artist_url(page, page_url, artist=None):
+    """
+    Find the artist's page link on a concert or festival page.
+
+    Args:
+        page: BeautifulSoup document (or raw HTML)
+        page_url (str): URL the page was fetched from
+        artist (str): Artist name; a link with matching text is preferred
+            over the first artist link on the page
+
+    Returns:
+        str: Absolute artist page URL, or None if not found
+    """
+    if not isinstance(page, BeautifulSoup):
+        page = BeautifulSoup(page, 'html.parser')
+    links = page.find_all('a', href=ARTIST_PATH_PATTERN)
+    if not links:
+        return None
+    target = normalize_text(artist)
+    best = next((link for link in links if target and normalize_text(link.get_text()) == target), links[0])
+    return urljoin(page_url, best['href'].split('?')[0])
+
+
+def _json_ld_objects(page):
+    """
+    Yield the JSON-LD objects embedded in a page.
+    """
+    for script in page.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string or '')
+        except (TypeError, ValueError):
+            continue
+        for item in data if isinstance(data, list) else [data]:
+            if isinstance(item, dict):
+                yield item
+
+
+def _unique(values, limit):
+    seen = []
+    for value in values:
+        value = value.strip()
+        if value and value not in seen:
+            seen.append(value)
+    return seen[:limit]
+
+
+def parse_artist_page(page):
+    """
+    Parse genres, on-tour status and similar artists from an artist page.
+
+    Structured data (JSON-LD MusicGroup) is used when present, falling back
+    to the page's labelled sections.
+
+    Args:
+        page: BeautifulSoup document (or raw HTML)
+
+    Returns:
+        dict: 'genres', 'on_tour' and 'similar_artists'
+    """
+    if not isinstance(page, BeautifulSoup):
+        page = BeautifulSoup(page, 'html.parser')
+
+    genres = []
+    for item in _json_ld_objects(page):
+        if item.get('@type') == 'MusicGroup':
+            genre = item.get('genre') or []
+            genres.extend([genre] if isinstance(genre, str) else genre)
+    if not genres:
+        label = page.find(string=re.compile(r'^\s*Genres?\s*:?\s*$', re.IGNORECASE))
+        container = label.find_parent(['div', 'li', 'p', 'dl', 'section']) if label else None
+        if container:
+            genres = [link.get_text() for link in container.find_all('a')]
+
+    on_tour = None
+    match = ON_TOUR_PATTERN.search(page.get_text(' '))
+    if match:
+        on_tour = match.group(1).lower() == 'yes'
+
+    similar = []
+    heading = page.find(['h2', 'h3', 'h4'], string=re.compile(r'similar artists', re.IGNORECASE))
+    section = heading.find_parent(['div', 'section']) if heading else page.find(class_='related-artists')
+    if section:
+        similar = [link.get_text() for link in section.find_all('a', href=ARTIST_PATH_PATTERN)]
+
+    return {
+        'genres': _unique(genres, MAX_GENRES),
+        'on_tour': on_tour,
+        'similar_artists': _unique(similar, MAX_SIMILAR_ARTISTS)
+    }
+
+
+class ArtistEnricher:
+    """
+    Fetch and cache artist page data for events.
+    """
+
+    def __init__(self, session, cache_path=CACHE_FILE, ttl_days=CACHE_TTL_DAYS, max_workers=MAX_WORKERS):
+        self.session = session
+        self.cache_path = cache_path
+        self.ttl = timedelta(days=ttl_days)
+        self.error_ttl = timedelta(days=min(ttl_days, ERROR_TTL_DAYS))
+        self.max_workers = max_workers
+        self.cache = {}
+        self.fetched = 0
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r') as f:
+                    self.cache = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.cache = {}
+
+    def is_fresh(self, entry, now=None):
+        """
+        Check whether a cache entry is still within its TTL.
+        """
+        if not entry or 'fetched_at' not in entry:
+            return False
+        try:
+            fetched_at = datetime.fromisoformat(entry['fetched_at'])
+        except ValueError:
+            return False
+        ttl = self.error_ttl if entry.get('error') else self.ttl
+        return (now or datetime.now()) - fetched_at < ttl
+
+    def fetch_artist(self, artist, link):
+        """
+        Fetch one artist's data, following a concert link to the artist page.
+
+        Returns:
+            dict: Cache entry for the artist
+        """
+        entry = {'artist': artist, 'artist_url': None, 'genres': [], 'on_tour': None,
+                 'similar_artists': [], 'fetched_at': datetime.now().isoformat(timespec='seconds')}
+        try:
+            artist_url = link if ARTIST_PATH_PATTERN.search(link) else None
+            if artist_url is None:
+                response = self.session.get(link, timeout=30)
+                response.raise_for_status()
+                artist_url = find_artist_url(response.content, link, artist)
+            if artist_url is None:
+                entry['error'] = 'artist page link not found'
+                return entry
+
+            response = self.session.get(artist_url, timeout=30)
+            response.raise_for_status()
+            entry['artist_url'] = artist_url
+            entry.update(parse_artist_page(response.content))
+        except Exception as e:
+            logging.warning(f"Failed to enrich {artist}: {str(e)}")
+            entry['error'] = str(e)
+        return entry
+
+    def enrich_artists(self, artists):
+        """
+        Make sure every artist has a fresh cache entry.
+
+        Args:
+            artists: Iterable of (artist name, Songkick link) pairs
+
+        Returns:
+            int: Number of artists fetched
+        """
+        now = datetime.now()
+        pending = {}
+        for artist, link in artists:
+            key = normalize_text(artist)
+            if not key or key in pending or not link or link != link:
+                continue
+            if not self.is_fresh(self.cache.get(key), now):
+                pending[key] = (artist, urljoin(SONGKICK_BASE_URL, link))
+
+        if not pending:
+            return 0
+        logging.info(f"Enriching {len(pending)} artists ({len(self.cache)} cached)")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            entries = executor.map(lambda item: self.fetch_artist(*item), pending.values())
+            for done, (key, entry) in enumerate(zip(pending, entries), 1):
+                self.cache[key] = entry
+                # Save as we go so an interrupted run keeps what it fetched
+                if done % CACHE_SAVE_INTERVAL == 0:
+                    self.save()
+        self.fetched += len(pending)
+        return len(pending)
+
+    def lookup(self, artist):
+        """
+        Return the enrichment columns for an artist from the cache.
+
+        Returns:
+            dict: Column name -> value (lists joined into strings)
+        """
+        entry = self.cache.get(normalize_text(artist)) or {}
+        return {
+            ENRICHMENT_COLUMNS['genres']: LIST_SEPARATOR.join(entry.get('genres') or []) or None,
+            ENRICHMENT_COLUMNS['on_tour']: entry.get('on_tour'),
+            ENRICHMENT_COLUMNS['similar_artists']: LIST_SEPARATOR.join(entry.get('similar_artists') or []) or None
+        }
+
+    def enrich_rows(self, rows, link='Artist Link'):
+        """
+        Add enrichment fields to a batch of row dicts in place.
+
+        Returns:
+            list: The same rows
+        """
+        self.enrich_artists((row.get('Artist'), row.get(link)) for row in rows)
+        for row in rows:
+            row.update(self.lookup(row.get('Artist')))
+        return rows
+
+    def enrich_dataframe(self, df, link='Artist Link'):
+        """
+        Add enrichment columns to an events DataFrame.
+
+        Returns:
+            pandas.DataFrame: Events with Genres, On_Tour and Similar_Artists
+        """
+        links = df[link] if link in df.columns else [None] * len(df)
+        self.enrich_artists(zip(df['Artist'], links))
+        values = [self.lookup(artist) for artist in df['Artist']]
+        for column in ENRICHMENT_COLUMNS.values():
+            df[column] = [value[column] for value in values]
+        return df
+
+    def save(self):
+        """
+        Write the cache atomically.
+        """
+        if not self.cache_path:
+            return
+        temp_path = self.cache_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.cache, f, indent=1, ensure_ascii=False)
+        os.replace(temp_path, self.cache_path)
+
+
+def main():
+    """
+    Enrich an events CSV in place from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Add artist genres, tour status and similar artists to events')
+    parser.add_argument('csv', nargs='?', default='lexington_events_time_imperial_modified.csv',
+                        help='events CSV to enrich')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='concurrent artist lookups')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    df = pd.read_csv(args.csv)
+    link = 'Artist_Link' if 'Artist_Link' in df.columns else 'Artist Link'
+
+    enricher = ArtistEnricher(create_session(), max_workers=args.workers)
+    enricher.enrich_dataframe(df, link)
+    enricher.save()
+    df.to_csv(args.csv, index=False)
+    print(f"🎸 Fetched {enricher.fetched} artists, {len(enricher.cache)} cached")
+    print(f"📁 Enriched data saved to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,41 @@ Designed to run weekly to keep the Lexington Gig Map updated.
 """
 
 import os
+import argparse
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import geopandas as gpd
 from datetime import datetime, timedelta
 import logging
 import time
 import json
+from urllib.parse import parse_qs, urlsplit
+
+from event_extraction import (
+    iter_event_records, records_to_dataframe, split_datetime_columns,
+    convert_to_imperial, clean_location_column
+)
+from streaming_pipeline import run_streaming_pipeline
+from history_archive import append_run, append_csv
+from dedup import EventDeduplicator
+from event_sources import EventSource, SOURCES_FILE, iter_source_records, load_sources
+from image_variants import generate_variants
+from image_store import ImageStore
+from http_client import create_session
+from artist_enrichment import ArtistEnricher
+from precache_manifest import write_manifest as write_precache_manifest
+from checkpoint import RunCheckpoint
+from map_index import write_index as write_map_index
+from marker_clusters import write_clusters
+from time_index import write_time_index
+from search_index import write_search_index
+from snapshot_deltas import publish_snapshot
+from venue_registry import open_registry
+from event_schema import format_for_export, read_events_csv, to_category, to_dates
+from data_quality import profile_events, load_rules, load_previous_report, save_report, REPORT_FILE
+from stage_runner import Stage, StageRunner, STAGE_CACHE_DIR
+from fix_geojson import fix_geojson
+from test_geojson import test_geojson
 
 # Set up logging
 logging.basicConfig(
@@ -25,13 +52,54 @@ logging.basicConfig(
     ]
 )
 
-class LexingtonEventScraper:
-    def __init__(self):
-        self.base_url = "https://www.songkick.com/metro-areas/24580-us-lexington"
-        self.session = requests.Session()
+EVENTS_CSV = 'lexington_events_time_imperial_modified.csv'
+GEOJSON_FILE = 'shp/merged_venues_events.geojson'
+
+# Files the venue registry is built from (see venue_registry.open_registry)
+VENUE_SOURCES = ('shp/venues.shp', 'shp/venues.dbf', 'shp/venues.shx', 'shp/venues.prj',
+                 'missing_venue_coordinates.json')
+
+# Intermediate frames of the staged pipeline
+SCRAPED_FRAME = os.path.join(STAGE_CACHE_DIR, 'scraped_events.parquet')
+DATED_FRAME = os.path.join(STAGE_CACHE_DIR, 'dated_events.parquet')
+LOCATED_FRAME = os.path.join(STAGE_CACHE_DIR, 'located_events.parquet')
+
+# Front-end files written by the publish stage
+PUBLISHED_FILES = ('shp/version.json', 'shp/map_index.json', 'shp/clusters/index.json',
+                   'shp/time_index.json', 'shp/search_index.json', 'precache-manifest.json')
+
+# Save the checkpoint after this many image downloads
+IMAGE_CHECKPOINT_INTERVAL = 10
+
+# Output columns for scraped events, keyed by EventRecord attribute
+EVENT_COLUMNS = {
+    'artist': 'Artist',
+    'location': 'Location',
+    'datetime': 'Datetime',
+    'artist_link': 'Artist Link',
+    'image_path': 'Artist Image'
+}
+
+# Songkick metro-area listing for Lexington
+METRO_AREA_URL = "https://www.songkick.com/metro-areas/24580-us-lexington"
+
+class LexingtonEventScraper(EventSource):
+    """
+    Songkick metro-area listing source, and the pipeline that runs it
+    together with any extra sources from event_sources.json
+    """
+    
+    required = True
+    
+    def __init__(self, base_url=METRO_AREA_URL, sources=None):
+        super().__init__('songkick', create_session())
+        self.base_url = base_url
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        self.image_store = ImageStore()
+        self.checkpoint = None
+        self.sources = load_sources() if sources is None else sources
         
     def calculate_date_range(self, months_ahead=1):
         """
@@ -65,84 +133,67 @@ class LexingtonEventScraper:
         logging.info(f"Built URL: {url}")
         return url
     
+    def parse_date_range(self, url):
+        """
+        Read the date range back from a listing URL built by build_url
+        """
+        filters = parse_qs(urlsplit(url).query)
+        return tuple(
+            datetime.strptime(filters[f'filters[{name}]'][0], '%m/%d/%Y').date()
+            for name in ('minDate', 'maxDate')
+        )
+    
+    def fetch_listing(self, url):
+        """
+        Fetch a listing page and parse its events
+        """
+        logging.info("Fetching webpage content...")
+        response = self.session.get(url, timeout=30)
+        response.raise_for_status()
+        return list(iter_event_records(response.content))
+    
+    def iter_records(self, start_date, end_date):
+        """
+        EventSource interface: events on the listing for a date range
+        """
+        url = self.build_url(start_date.strftime('%m/%d/%Y'), end_date.strftime('%m/%d/%Y'))
+        return iter(self.fetch_listing(url))
+    
+    def collect_records(self, url):
+        """
+        Parse the listing, running the extra event sources at the same time
+        """
+        if not self.sources:
+            return self.fetch_listing(url)
+        start_date, end_date = self.parse_date_range(url)
+        return [record for _, record in iter_source_records([self, *self.sources], start_date, end_date)]
+    
     def scrape_events(self, url):
         """
         Scrape events from the Songkick page
         """
         try:
-            logging.info("Fetching webpage content...")
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Initialize lists to store the extracted data
-            artists = []
-            locations = []
-            dateTimes = []
-            artist_links = []
-            artist_images = []
-            
             # Create a directory for artist images if it doesn't exist
             os.makedirs('artist_images', exist_ok=True)
             
-            # Extract event details
-            events = soup.find_all('li', class_='event-listings-element')
-            logging.info(f"Found {len(events)} events")
+            # A resumed run reuses the events parsed before it was interrupted
+            records = self.checkpoint.load_records() if self.checkpoint else None
+            if records is None:
+                records = self.collect_records(url)
+                if self.checkpoint:
+                    self.checkpoint.save_records(records)
+            logging.info(f"Found {len(records)} events")
             
-            for i, event in enumerate(events):
-                try:
-                    # Extract artist name
-                    artist_tag = event.find('p', class_='artists')
-                    artist_name = artist_tag.strong.get_text(strip=True) if artist_tag else None
-                    
-                    if not artist_name:
-                        logging.warning(f"Event {i}: No artist name found")
-                        continue
-                    
-                    # Extract artist link
-                    artist_link_tag = artist_tag.find('a') if artist_tag else None
-                    artist_link = f"https://www.songkick.com{artist_link_tag['href']}" if artist_link_tag else None
-                    
-                    # Extract event location
-                    locate_tag = event.find('p', class_='location')
-                    locate_name = locate_tag.get_text(strip=True) if locate_tag else None
-                    
-                    # Extract date and time
-                    time_element = event.find('time')
-                    if time_element:
-                        datetime_value = time_element['datetime']
-                        time_text = time_element.get_text(strip=True)
-                    else:
-                        datetime_value = 'N/A'
-                        time_text = 'N/A'
-                    
-                    # Extract and download artist image
-                    image_filename = self.download_artist_image(event, artist_name)
-                    
-                    # Append extracted data to lists
-                    artists.append(artist_name)
-                    locations.append(locate_name)
-                    dateTimes.append(datetime_value)
-                    artist_links.append(artist_link)
-                    artist_images.append(image_filename)
-                    
-                    logging.info(f"Processed event {i+1}: {artist_name} at {locate_name}")
-                    
-                except Exception as e:
-                    logging.error(f"Error processing event {i}: {str(e)}")
-                    continue
+            for i, record in enumerate(records):
+                # Extract and download artist image
+                record.image_path = self.download_artist_image(record.image_url, record.artist)
+                logging.info(f"Processed event {i+1}: {record.artist} at {record.location}")
+                if self.checkpoint and (i + 1) % IMAGE_CHECKPOINT_INTERVAL == 0:
+                    self.save_progress()
+            self.save_progress()
             
             # Create a DataFrame from the extracted data
-            data = {
-                'Artist': artists,
-                'Location': locations,
-                'Datetime': dateTimes,
-                'Artist Link': artist_links,
-                'Artist Image': artist_images
-            }
-            
-            df = pd.DataFrame(data)
+            df = records_to_dataframe(records, EVENT_COLUMNS)
             logging.info(f"Created DataFrame with {len(df)} events")
             return df
             
@@ -153,63 +204,66 @@ class LexingtonEventScraper:
             logging.error(f"Scraping failed: {str(e)}")
             return None
     
-    def download_artist_image(self, event, artist_name):
+    def download_artist_image(self, image_url, artist_name):
         """
-        Download artist image if available
+        Download artist image if available, reusing an identical stored image
         """
+        if not image_url:
+            return None
+        if self.checkpoint:
+            # Already downloaded by the run being resumed
+            stored_path = self.checkpoint.image_for(image_url)
+            if stored_path:
+                return stored_path
         try:
-            image_tag = event.find('a', class_='thumb')
-            if image_tag:
-                img = image_tag.find('img', class_='artist-profile-image')
-                if img and 'data-src' in img.attrs:
-                    image_url = "https:" + img['data-src']
-                    image_filename = f"artist_images/{artist_name.replace(' ', '_').replace('/', '_')}.jpg"
-                    
-                    # Download image
-                    img_response = self.session.get(image_url, timeout=10)
-                    img_response.raise_for_status()
-                    
-                    with open(image_filename, 'wb') as img_file:
-                        img_file.write(img_response.content)
-                    
-                    return image_filename
+            image_filename = f"artist_images/{artist_name.replace(' ', '_').replace('/', '_')}.jpg"
+            
+            # Download image
+            img_response = self.session.get(image_url, timeout=10)
+            img_response.raise_for_status()
+            
+            stored_path = self.image_store.save(img_response.content, artist_name, image_filename)
+            if stored_path is None:
+                logging.warning(f"Image for {artist_name} is not a valid image")
+            elif self.checkpoint:
+                self.checkpoint.record_image(image_url, stored_path)
+            return stored_path
         except Exception as e:
             logging.warning(f"Failed to download image for {artist_name}: {str(e)}")
         
         return None
     
+    def save_progress(self):
+        """
+        Persist the image index and checkpoint so an interrupted run can resume
+        """
+        self.image_store.save_index()
+        if self.checkpoint:
+            self.checkpoint.save()
+    
+    def generate_image_variants(self):
+        """
+        Generate resized and WebP variants of downloaded artist images
+        """
+        try:
+            generate_variants()
+            return True
+        except Exception as e:
+            logging.warning(f"Failed to generate image variants: {str(e)}")
+            return False
+    
     def process_datetime(self, df):
         """
         Process datetime data and convert to imperial time format
         """
         logging.info("Processing datetime data...")
         
-        def split_datetime(row):
-            if pd.isna(row['Datetime']) or row['Datetime'] == 'N/A':
-                return pd.Series([None, None])
-            
-            if 'T' in str(row['Datetime']):
-                date_time = str(row['Datetime']).split('T')[0]
-                time_part = str(row['Datetime']).split('T')[1][:5]
-            else:
-                date_time = str(row['Datetime'])
-                time_part = None
-            return pd.Series([date_time, time_part])
-        
-        def convert_to_imperial(time_str):
-            if pd.isna(time_str) or time_str is None:
-                return None
-            try:
-                time_obj = pd.to_datetime(time_str, format='%H:%M')
-                return time_obj.strftime('%I:%M %p')
-            except:
-                return time_str
-        
-        # Apply the function to split Datetime into Date and Time columns
-        df[['Date', 'Time']] = df.apply(split_datetime, axis=1)
+        # Split Datetime into Date and Time columns
+        dates, times = split_datetime_columns(df['Datetime'])
+        df['Date'] = to_dates(dates)
         
         # Convert Time to imperial format
-        df['Time'] = df['Time'].apply(convert_to_imperial)
+        df['Time'] = to_category(convert_to_imperial(times))
         
         return df
     
@@ -218,43 +272,70 @@ class LexingtonEventScraper:
         Clean location data by removing city/state suffixes
         """
         logging.info("Cleaning location data...")
-        
-        suffixes_to_remove = [
-            ',Lexington, KY, US',
-            ',Georgetown, KY, US',
-            ',London, KY, US',
-            ',North Lexington, KY, US',
-            ',Richmond, KY, US'
-        ]
-        
-        for suffix in suffixes_to_remove:
-            df['Location'] = df['Location'].str.replace(suffix, '', regex=False)
-        
+        df['Location'] = clean_location_column(df['Location'])
+        return df
+    
+    def deduplicate(self, df, source):
+        """
+        Remove repeated events by concert identity
+        """
+        deduplicator = EventDeduplicator()
+        df = deduplicator.dedupe_dataframe(df, source)
+        deduplicator.save()
+        if deduplicator.duplicates:
+            logging.info(f"Removed {deduplicator.duplicates} duplicate events")
+        return df
+    
+    def enrich_artists(self, df):
+        """
+        Add genres, tour status and similar artists from cached artist pages
+        """
+        enricher = ArtistEnricher(self.session)
+        try:
+            df = enricher.enrich_dataframe(df)
+            logging.info(f"Artist enrichment: {enricher.fetched} fetched, {len(enricher.cache)} cached")
+        except Exception as e:
+            logging.warning(f"Artist enrichment failed: {str(e)}")
+        finally:
+            enricher.save()
         return df
     
     def merge_with_venues(self, df):
         """
-        Merge events data with venues shapefile
+        Merge events data with venue points from the venue registry
         """
         try:
-            logging.info("Loading venues shapefile...")
-            shapefile_path = 'shp/venues.shp'
+            logging.info("Loading venue registry...")
+            with open_registry() as registry:
+                venue_points = registry.points()
             
-            if not os.path.exists(shapefile_path):
-                logging.error(f"Venues shapefile not found: {shapefile_path}")
+            if not venue_points:
+                logging.error("Venue registry is empty; is shp/venues.shp missing?")
                 return None
             
-            venues_gdf = gpd.read_file(shapefile_path)
-            
             logging.info("Merging events with venues...")
-            merged_gdf = venues_gdf.merge(df, left_on='Venue', right_on='Location', how='inner')
+            events = df[df['Location'].isin(list(venue_points))].reset_index(drop=True)
+            points = [venue_points[name] for name in events['Location']]
+            events.insert(0, 'id', [venue_id for venue_id, _ in points])
+            events.insert(1, 'Venue', events['Location'])
+            merged_gdf = gpd.GeoDataFrame(
+                events,
+                geometry=gpd.points_from_xy([lon for _, (lon, _) in points], [lat for _, (_, lat) in points]),
+                crs='EPSG:4326'
+            )
             
             # Rename columns for consistency
             merged_gdf = merged_gdf.rename(columns={
                 'Artist Link': 'ArtistLink',
-                'Artist Image': 'ArtistImage'
+                'Artist Image': 'ArtistImage',
+                'Event_Key': 'EventKey',
+                'On_Tour': 'OnTour',
+                'Similar_Artists': 'SimilarArtists'
             })
             
+            # GeoJSON properties are plain strings (dates as YYYY-MM-DD)
+            format_for_export(merged_gdf)
+            
             logging.info(f"Merged data contains {len(merged_gdf)} events")
             return merged_gdf
             
@@ -274,6 +355,39 @@ class LexingtonEventScraper:
             logging.error(f"Error saving {filename}: {str(e)}")
             return False
     
+    def archive_run(self, df=None, csv_filename=None):
+        """
+        Append this run's events to the Parquet history archive
+        """
+        try:
+            if df is not None:
+                path = append_run(df)
+            else:
+                path = append_csv(csv_filename)
+            logging.info(f"Run archived to {path}")
+            return True
+        except Exception as e:
+            logging.error(f"Error archiving run: {str(e)}")
+            return False
+    
+    def check_data_quality(self, df):
+        """
+        Profile the processed events against the data-quality rules
+        """
+        rules = load_rules(overrides={'image_column': 'Artist Image'})
+        profile = profile_events(df, rules, load_previous_report())
+        
+        for result in profile['checks']:
+            if not result['passed']:
+                logging.warning(f"Quality check failed: {result['name']} = {result['value']} "
+                                f"(threshold: {result['threshold']})")
+        
+        # Saved either way: the next run's event-drop baseline includes this run
+        save_report(profile)
+        if profile['passed']:
+            logging.info("Data quality checks passed")
+        return profile['passed']
+    
     def save_geojson(self, gdf, filename):
         """
         Save GeoDataFrame to GeoJSON file
@@ -286,9 +400,58 @@ class LexingtonEventScraper:
             logging.error(f"Error saving GeoJSON {filename}: {str(e)}")
             return False
     
-    def run_complete_pipeline(self, months_ahead=1):
+    def update_snapshots(self):
+        """
+        Version the map GeoJSON and write deltas so clients only download changes
+        """
+        try:
+            pointer = publish_snapshot()
+            logging.info(f"Map data version {pointer['version']}: "
+                         f"{len(pointer['deltas'])} deltas available")
+            return True
+        except Exception as e:
+            logging.warning(f"Failed to publish map data snapshot: {str(e)}")
+            return False
+    
+    def update_map_index(self):
+        """
+        Precompute the date and venue groupings, the zoom-level marker
+        clusters, the time index and the search index the map front end uses
+        """
+        try:
+            index = write_map_index()
+            logging.info(f"Map index updated: {len(index['dates'])} dates, "
+                         f"{len(index['venue_groups'])} venue groups")
+            clusters = write_clusters(index=index)
+            logging.info(f"Marker clusters updated for zoom {clusters['min_zoom']}-{clusters['max_zoom']}")
+            times = write_time_index()
+            logging.info(f"Time index updated: {len(times['epochs'])} dated events")
+            search = write_search_index()
+            logging.info(f"Search index updated: {len(search['entries'])} artists and venues")
+            return True
+        except Exception as e:
+            logging.warning(f"Failed to update map index: {str(e)}")
+            return False
+    
+    def update_precache_manifest(self):
+        """
+        Rehash the site assets so the service worker re-fetches changed files
+        """
+        try:
+            manifest = write_precache_manifest()
+            logging.info(f"Precache manifest updated: {len(manifest['entries'])} entries, "
+                         f"version {manifest['version']}")
+            return True
+        except Exception as e:
+            logging.warning(f"Failed to update precache manifest: {str(e)}")
+            return False
+    
+    def run_complete_pipeline(self, months_ahead=1, enrich=False, fresh=False):
         """
         Run the complete scraping and processing pipeline
+        
+        Progress is checkpointed, so an interrupted run with the same date
+        range resumes where it stopped unless fresh is set.
         """
         logging.info("Starting Lexington events scraping pipeline...")
         
@@ -297,21 +460,49 @@ class LexingtonEventScraper:
         
         # Build URL
         url = self.build_url(start_date, end_date)
+        self.checkpoint = RunCheckpoint(f"batch:{url}", resume=not fresh)
         
-        # Scrape events
-        df = self.scrape_events(url)
-        if df is None or df.empty:
-            logging.error("No events found or scraping failed")
-            return False
-        
-        # Process datetime
-        df = self.process_datetime(df)
+        if self.checkpoint.stage_done('csv_saved'):
+            # Scraping and processing finished before the interruption
+            df = read_events_csv(EVENTS_CSV)
+            logging.info(f"Resumed with {len(df)} processed events from {EVENTS_CSV}")
+        else:
+            # Scrape events
+            df = self.scrape_events(url)
+            if df is None or df.empty:
+                logging.error("No events found or scraping failed")
+                return False
+            
+            # Generate thumbnails and WebP variants for new or changed images
+            self.generate_image_variants()
+            
+            # Process datetime
+            df = self.process_datetime(df)
+            
+            # Clean locations
+            df = self.clean_locations(df)
+            
+            # Drop repeated concerts (same event listed on several pages/windows)
+            df = self.deduplicate(df, url)
+            
+            # Optionally add artist page data for the map popups
+            if enrich:
+                df = self.enrich_artists(df)
+            
+            # Save raw data
+            if not self.save_data(df, EVENTS_CSV):
+                return False
+            self.checkpoint.mark_stage('csv_saved')
         
-        # Clean locations
-        df = self.clean_locations(df)
+        # Append this run to the history archive (once per run, even if resumed)
+        if not self.checkpoint.stage_done('archived') and self.archive_run(df):
+            self.checkpoint.mark_stage('archived')
         
-        # Save raw data
-        self.save_data(df, 'lexington_events_time_imperial_modified.csv')
+        # Stop before publishing map data if quality regressed
+        if not self.check_data_quality(df):
+            logging.error("Data quality checks failed; map data not updated")
+            self.checkpoint.clear()
+            return False
         
         # Merge with venues
         merged_gdf = self.merge_with_venues(df)
@@ -323,20 +514,208 @@ class LexingtonEventScraper:
         success = self.save_geojson(merged_gdf, 'shp/merged_venues_events.geojson')
         
         if success:
+            self.update_snapshots()
+            self.update_map_index()
+            self.update_precache_manifest()
+            self.checkpoint.clear()
             logging.info("Pipeline completed successfully!")
             return True
         else:
             logging.error("Pipeline failed at GeoJSON save step")
             return False
 
+    def pipeline_stages(self, months_ahead=1, enrich=False):
+        """
+        Define the batch pipeline as stages for stage_runner.StageRunner
+        
+        The GeoJSON follow-up scripts run as stages too: fix_geojson after
+        the merge and test_geojson before publishing. add_missing_venues is
+        not needed, since the merge already places every registry venue.
+        """
+        start_date, end_date = self.calculate_date_range(months_ahead)
+        url = self.build_url(start_date, end_date)
+        
+        def save_frame(df, path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            df.to_parquet(path, index=False)
+        
+        def scrape():
+            df = self.scrape_events(url)
+            if df is None or df.empty:
+                logging.error("No events found or scraping failed")
+                return False
+            # Generate thumbnails and WebP variants for new or changed images
+            self.generate_image_variants()
+            save_frame(df, SCRAPED_FRAME)
+        
+        def process_dates():
+            save_frame(self.process_datetime(pd.read_parquet(SCRAPED_FRAME)), DATED_FRAME)
+        
+        def process_locations():
+            df = self.clean_locations(pd.read_parquet(DATED_FRAME))
+            save_frame(self.deduplicate(df, url), LOCATED_FRAME)
+        
+        def save_csv():
+            df = pd.read_parquet(LOCATED_FRAME)
+            if enrich:
+                df = self.enrich_artists(df)
+            return self.save_data(df, EVENTS_CSV)
+        
+        def archive():
+            return self.archive_run(csv_filename=EVENTS_CSV)
+        
+        def quality():
+            if not self.check_data_quality(read_events_csv(EVENTS_CSV)):
+                logging.error("Data quality checks failed; map data not updated")
+                return False
+        
+        def merge():
+            merged_gdf = self.merge_with_venues(read_events_csv(EVENTS_CSV))
+            if merged_gdf is None or not self.save_geojson(merged_gdf, GEOJSON_FILE):
+                return False
+            return fix_geojson()
+        
+        def validate():
+            return test_geojson()
+        
+        def publish():
+            results = [self.update_snapshots(), self.update_map_index(), self.update_precache_manifest()]
+            return all(results)
+        
+        return [
+            Stage('scrape', scrape, outputs=[SCRAPED_FRAME], inputs=[SOURCES_FILE], config={'url': url},
+                  volatile=True, description='Fetch the listing and artist images'),
+            Stage('datetime', process_dates, deps=['scrape'], outputs=[DATED_FRAME],
+                  inputs=['event_extraction.py', 'event_schema.py'],
+                  description='Split Date and Time, convert to 12-hour times'),
+            Stage('locations', process_locations, deps=['datetime'], outputs=[LOCATED_FRAME],
+                  inputs=['event_extraction.py', 'dedup.py'],
+                  description='Clean venue names and drop repeated events'),
+            Stage('csv', save_csv, deps=['locations'], outputs=[EVENTS_CSV], config={'enrich': enrich},
+                  description='Write the events CSV'),
+            Stage('archive', archive, deps=['csv'],
+                  description='Append the run to the history archive'),
+            Stage('quality', quality, deps=['csv'], outputs=[REPORT_FILE], inputs=['data_quality.py'],
+                  description='Check the events against the data-quality rules'),
+            Stage('merge', merge, deps=['quality'], outputs=[GEOJSON_FILE],
+                  inputs=[EVENTS_CSV, *VENUE_SOURCES],
+                  description='Place events at registry venues and write the GeoJSON'),
+            Stage('validate', validate, deps=['merge'],
+                  description='Check the GeoJSON parses (test_geojson.py)'),
+            Stage('publish', publish, deps=['validate'], outputs=list(PUBLISHED_FILES),
+                  inputs=[GEOJSON_FILE, 'index.html', 'styles.css', 'script.js', 'artist_images/manifest.json'],
+                  description='Version the map data and rebuild the front-end indexes'),
+        ]
+    
+    def run_staged_pipeline(self, months_ahead=1, enrich=False, stages=None, force=False):
+        """
+        Run the batch pipeline through the stage runner, skipping stages
+        whose inputs and config have not changed since their last run
+        
+        Naming stages reruns them and everything downstream without
+        touching the stages before them (e.g. stages=['merge'] after editing
+        shp/venues.shp).
+        """
+        logging.info("Starting Lexington events staged pipeline...")
+        runner = StageRunner(self.pipeline_stages(months_ahead, enrich))
+        try:
+            result = runner.run(stages, force=force)
+        except ValueError as e:
+            logging.error(str(e))
+            return False
+        
+        if result['failed']:
+            logging.error(f"Staged pipeline failed at: {', '.join(result['failed'])}")
+            return False
+        logging.info("Staged pipeline completed successfully!")
+        return True
+
+    def run_streaming_pipeline(self, months_ahead=1, max_pages=None, enrich=False, fresh=False):
+        """
+        Run the pipeline page by page, appending CSV rows and GeoJSON
+        features as each listing page is processed
+        
+        Each written page is checkpointed; an interrupted crawl resumes from
+        the next page unless fresh is set.
+        """
+        logging.info("Starting Lexington events streaming pipeline...")
+        
+        start_date, end_date = self.calculate_date_range(months_ahead)
+        url = self.build_url(start_date, end_date)
+        self.checkpoint = RunCheckpoint(f"stream:{url}", resume=not fresh)
+        
+        os.makedirs('artist_images', exist_ok=True)
+        
+        try:
+            stats = run_streaming_pipeline(
+                self.session, url,
+                EVENTS_CSV,
+                'shp/merged_venues_events.geojson',
+                download_image=self.download_artist_image,
+                max_pages=max_pages,
+                deduplicator=EventDeduplicator(),
+                enricher=ArtistEnricher(self.session) if enrich else None,
+                checkpoint=self.checkpoint
+            )
+        except Exception as e:
+            logging.error(f"Streaming pipeline failed: {str(e)}")
+            return False
+        finally:
+            self.image_store.save_index()
+        
+        if stats['events'] == 0:
+            logging.error("No events found or scraping failed")
+            return False
+        
+        # Generate thumbnails and WebP variants for new or changed images
+        self.generate_image_variants()
+        
+        # Append this run to the history archive (once per run, even if resumed)
+        if not self.checkpoint.stage_done('archived') and self.archive_run(csv_filename=EVENTS_CSV):
+            self.checkpoint.mark_stage('archived')
+        
+        # Version and regroup the map data and let the service worker pick up the changes
+        self.update_snapshots()
+        self.update_map_index()
+        self.update_precache_manifest()
+        self.checkpoint.clear()
+        
+        logging.info(f"Streaming pipeline completed: {stats['events']} events "
+                     f"from {stats['pages']} pages, {stats['mapped']} mapped")
+        return True
+
 def main():
     """
     Main function to run the scraper
     """
+    parser = argparse.ArgumentParser(description='Scrape Lexington events from Songkick')
+    parser.add_argument('--stream', action='store_true',
+                        help='write CSV rows and GeoJSON features page by page')
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help='stop after this many listing pages (streaming mode)')
+    parser.add_argument('--enrich', action='store_true',
+                        help='add genres, tour status and similar artists from artist pages')
+    parser.add_argument('--fresh', action='store_true',
+                        help='ignore the checkpoint of an interrupted run and start over')
+    parser.add_argument('--staged', action='store_true',
+                        help='run the batch pipeline as stages, skipping unchanged ones')
+    parser.add_argument('--stage', action='append', dest='stages', metavar='NAME',
+                        help='rerun this stage and the stages after it (implies --staged; repeatable)')
+    parser.add_argument('--force', action='store_true',
+                        help='rerun the selected stages even if their inputs are unchanged')
+    args = parser.parse_args()
+    
     scraper = LexingtonEventScraper()
     
     # Run the complete pipeline - fetch data through December
-    success = scraper.run_complete_pipeline(months_ahead=2)
+    if args.staged or args.stages:
+        success = scraper.run_staged_pipeline(months_ahead=2, enrich=args.enrich,
+                                              stages=args.stages, force=args.force)
+    elif args.stream:
+        success = scraper.run_streaming_pipeline(months_ahead=2, max_pages=args.max_pages,
+                                                 enrich=args.enrich, fresh=args.fresh)
+    else:
+        success = scraper.run_complete_pipeline(months_ahead=2, enrich=args.enrich, fresh=args.fresh)
     
     if success:
         print("✅ Scraping completed successfully!")
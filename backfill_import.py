@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Bulk Backfill of Historical CSV Snapshots into the Event History
+
+The history archive (history_archive.py) only holds runs made since it was
+added, while older scrapes survive as CSV exports in three shapes:
+
+    raw         lexington_events2.csv                Location is "Venue,City, ST, US",
+                                                     only the raw Datetime column
+    split       lexington_events_time_imperial.csv   raw Location, Date and Time split out
+    processed   lexington_events_time_imperial_modified.csv
+                                                     cleaned Location, Date and Time
+
+and in either link column convention ("Artist Link" or "Artist_Link").
+This module detects each file's schema from its header and first rows, then
+reads it in chunks and normalizes every chunk with whole-column operations:
+the datetime is split and converted to 12-hour time only where the file
+lacks Date/Time, locations are cleaned, and event keys are derived from the
+links in one regex pass (dedup.event_keys). Each file becomes one archive
+run, so memory is bounded by the chunk size however many years are loaded.
+
+A snapshot's scrape time is not recorded in the file, so it is taken as
+midnight of the earliest event date it lists (a scrape lists upcoming
+events), unless given with --scraped-at. Runs are named after the file's
+content hash (run id backfill-<hash>), so importing the same file again is
+a no-op:
+
+    history/scrape_date=2025-07-04/backfill-1f2e3d4c5b6a.parquet
+
+Usage:
+    python backfill_import.py [paths or globs ...] [--history-dir history]
+    python backfill_import.py old_exports/*.csv --dry-run
+"""
+
+import argparse
+import glob
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from event_extraction import clean_location_column, convert_to_imperial, split_datetime_columns
+from event_schema import to_dates
+from history_archive import ARCHIVE_SCHEMA, COLUMN_ALIASES, HISTORY_DIR, partition_dir, to_archive_table
+from image_variants import file_hash
+
+DEFAULT_PATTERNS = ('lexington_events*.csv',)
+
+# Rows read and converted at a time
+CHUNK_SIZE = 50000
+
+# Columns every snapshot needs (after COLUMN_ALIASES), one of each group
+REQUIRED_COLUMNS = ('Artist', 'Location', ('Datetime', 'Date'))
+
+RUN_PREFIX = 'backfill-'
+
+
+def detect_schema(path):
+    """
+    Work out which export format a CSV snapshot uses.
+
+    Args:
+        path (str): CSV snapshot
+
+    Returns:
+        dict: columns (archive names), label ('raw', 'split' or 'processed'),
+        and whether the file has Date/Time columns, event keys and raw
+        "Venue,City, ST, US" locations
+
+    Raises:
+        ValueError: If the file lacks the columns an event needs
+    """
+    sample = pd.read_csv(path, nrows=200, dtype=str).rename(columns=COLUMN_ALIASES)
+    columns = list(sample.columns)
+    for required in REQUIRED_COLUMNS:
+        options = required if isinstance(required, tuple) else (required,)
+        if not any(option in columns for option in options):
+            raise ValueError(f"{path} has no {' or '.join(options)} column")
+
+    locations = sample['Location'].dropna()
+    raw_locations = bool((clean_location_column(locations) != locations).any())
+    has_date = 'Date' in columns
+    if not has_date:
+        label = 'raw'
+    elif raw_locations:
+        label = 'split'
+    else:
+        label = 'processed'
+    return {
+        'columns': columns,
+        'label': label,
+        'has_date': has_date,
+        'has_time': 'Time' in columns,
+        'has_event_key': 'Event_Key' in columns,
+        'raw_locations': raw_locations
+    }
+
+
+def normalize_chunk(chunk, schema):
+    """
+    Bring one chunk of a snapshot to the processed CSV layout.
+
+    Every step is a whole-column operation and is safe on values that are
+    already normalized, so a file mixing raw and cleaned rows comes out clean.
+
+    Args:
+        chunk (pandas.DataFrame): Rows as read from the CSV (strings)
+        schema (dict): Result of detect_schema for the file
+
+    Returns:
+        pandas.DataFrame: Chunk with archive column names, Date, 12-hour Time
+        and cleaned Location
+    """
+    chunk = chunk.rename(columns=COLUMN_ALIASES)
+    if not schema['has_date'] or not schema['has_time']:
+        dates, times = split_datetime_columns(chunk['Datetime'])
+        if not schema['has_date']:
+            chunk['Date'] = dates
+        if not schema['has_time']:
+            chunk['Time'] = times
+    chunk['Time'] = convert_to_imperial(chunk['Time'])
+    chunk['Location'] = clean_location_column(chunk['Location'])
+    return chunk
+
+
+def earliest_event_date(path, schema):
+    """
+    Earliest event date in a snapshot, reading only its date column.
+
+    Returns:
+        datetime: Midnight of the earliest date, or None if no row has one
+    """
+    column = 'Date' if schema['has_date'] else 'Datetime'
+    earliest = None
+    for chunk in pd.read_csv(path, usecols=[column], chunksize=CHUNK_SIZE * 4, dtype=str):
+        values = chunk[column] if schema['has_date'] else split_datetime_columns(chunk[column])[0]
+        first = to_dates(values).min()
+        if pd.notna(first) and (earliest is None or first < earliest):
+            earliest = first
+    return None if earliest is None else earliest.to_pydatetime()
+
+
+def backfill_path(path, scraped_at, history_dir=HISTORY_DIR):
+    """
+    Archive path and run id of a snapshot's backfilled run.
+
+    Returns:
+        tuple: (file path, run id)
+    """
+    run_id = RUN_PREFIX + file_hash(path)[:12]
+    return os.path.join(history_dir, f"scrape_date={scraped_at.date().isoformat()}",
+                        f"{run_id}.parquet"), run_id
+
+
+def already_imported(run_id, history_dir=HISTORY_DIR):
+    """
+    Check whether a run id is in the archive under any scrape date.
+    """
+    return bool(glob.glob(os.path.join(history_dir, 'scrape_date=*', f"{run_id}.parquet")))
+
+
+def import_snapshot(path, history_dir=HISTORY_DIR, scraped_at=None, chunksize=CHUNK_SIZE, dry_run=False):
+    """
+    Backfill one CSV snapshot into the archive as its own run.
+
+    The run is written chunk by chunk to a hidden temporary file (ignored by
+    open_archive) and moved into place once complete, so an interrupted
+    import leaves nothing half-written behind.
+
+    Args:
+        path (str): CSV snapshot
+        history_dir (str): Root of the archive
+        scraped_at (datetime): When the snapshot was scraped (defaults to
+            midnight of its earliest event date)
+        chunksize (int): Rows read per chunk
+        dry_run (bool): Detect and convert, but do not write
+
+    Returns:
+        dict: path, label, rows, run_id, archive path, scraped_at and
+        status ('imported', 'exists', 'empty' or 'dry-run')
+    """
+    schema = detect_schema(path)
+    scraped_at = scraped_at or earliest_event_date(path, schema)
+    result = {'path': path, 'label': schema['label'], 'rows': 0, 'run_id': None,
+              'archive_path': None, 'scraped_at': scraped_at}
+    if scraped_at is None:
+        result['status'] = 'empty'
+        return result
+
+    archive_path, run_id = backfill_path(path, scraped_at, history_dir)
+    result.update(run_id=run_id, archive_path=archive_path)
+    if already_imported(run_id, history_dir):
+        result['status'] = 'exists'
+        return result
+
+    writer = None
+    temp_path = None
+    if not dry_run:
+        temp_path = os.path.join(partition_dir(scraped_at.date(), history_dir), f".{run_id}.parquet.tmp")
+        writer = pq.ParquetWriter(temp_path, ARCHIVE_SCHEMA)
+    try:
+        for chunk in pd.read_csv(path, chunksize=chunksize, dtype=str):
+            table = to_archive_table(normalize_chunk(chunk, schema), scraped_at, run_id)
+            result['rows'] += table.num_rows
+            if writer is not None:
+                writer.write_table(table)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            os.remove(temp_path)
+        raise
+
+    if writer is not None:
+        writer.close()
+        os.replace(temp_path, archive_path)
+    result['status'] = 'dry-run' if dry_run else 'imported'
+    return result
+
+
+def find_snapshots(patterns):
+    """
+    Expand paths and glob patterns to a sorted list of CSV files.
+    """
+    paths = set()
+    for pattern in patterns:
+        paths.update(glob.glob(pattern) if glob.has_magic(pattern) else [pattern])
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def main():
+    """
+    Backfill CSV snapshots into the history archive from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Bulk import historical CSV snapshots into the history archive')
+    parser.add_argument('paths', nargs='*', default=list(DEFAULT_PATTERNS), help='CSV files or glob patterns')
+    parser.add_argument('--history-dir', default=HISTORY_DIR, help='archive directory')
+    parser.add_argument('--scraped-at', help='scrape date (YYYY-MM-DD) to record for every file')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE, help='rows read per chunk')
+    parser.add_argument('--dry-run', action='store_true', help='detect and convert without writing')
+    args = parser.parse_args()
+
+    scraped_at = datetime.strptime(args.scraped_at, '%Y-%m-%d') if args.scraped_at else None
+    paths = find_snapshots(args.paths)
+    if not paths:
+        print("❌ No CSV snapshots found")
+        return
+
+    started = time.perf_counter()
+    imported = 0
+    for path in paths:
+        try:
+            result = import_snapshot(path, args.history_dir, scraped_at, args.chunksize, args.dry_run)
+        except (ValueError, pd.errors.ParserError) as e:
+            print(f"⚠️  Skipped {path}: {e}")
+            continue
+        if result['status'] == 'exists':
+            print(f"⏭️  {path}: already imported as {result['archive_path']}")
+        elif result['status'] == 'empty':
+            print(f"⚠️  {path}: no dated events, nothing to import")
+        else:
+            imported += result['rows']
+            target = 'would be imported' if args.dry_run else f"→ {result['archive_path']}"
+            print(f"✅ {path} ({result['label']}): {result['rows']} events scraped "
+                  f"{result['scraped_at']:%Y-%m-%d} {target}")
+    print(f"📚 {imported} events from {len(paths)} files in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,12 @@
-import json
-import math
-
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two points in miles."""
-    R = 3959  # Earth's radius in miles
-    
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    
-    return R * c
+from venue_registry import distance_miles, open_registry
 
 def check_map_bounds():
     """Check if all venues are within reasonable map bounds."""
     
-    # Read the GeoJSON file
-    with open('shp/merged_venues_events.geojson', 'r') as f:
-        geojson_data = json.load(f)
+    # Read venue points from the venue registry
+    with open_registry() as registry:
+        venues = registry.all()
+        extent = registry.extent()
     
     # Current map center (Lexington)
     lexington_center = [38.0406, -84.5037]
@@ -30,34 +17,21 @@ def check_map_bounds():
     print(f"Current zoom level: 13")
     print()
     
-    # Collect all unique venues with their coordinates
-    venues = {}
-    for feature in geojson_data['features']:
-        venue = feature['properties']['Venue']
-        coords = feature['geometry']['coordinates']
-        if venue not in venues:
-            venues[venue] = {
-                'lat': coords[1],
-                'lon': coords[0],
-                'events': []
-            }
-        venues[venue]['events'].append(feature['properties']['Artist'])
-    
     print("📍 Venue Locations and Distances from Lexington:")
     print("-" * 50)
     
     max_distance = 0
-    for venue, data in venues.items():
-        distance = calculate_distance(
+    for venue in venues:
+        distance = distance_miles(
             lexington_center[0], lexington_center[1],
-            data['lat'], data['lon']
+            venue['lat'], venue['lon']
         )
         max_distance = max(max_distance, distance)
         
-        print(f"{venue}:")
-        print(f"  Coordinates: {data['lat']:.6f}, {data['lon']:.6f}")
+        print(f"{venue['name']}:")
+        print(f"  Coordinates: {venue['lat']:.6f}, {venue['lon']:.6f}")
         print(f"  Distance from Lexington: {distance:.1f} miles")
-        print(f"  Events: {len(data['events'])}")
+        print(f"  Source: {venue['source']}")
         print()
     
     print("📊 Summary:")
@@ -70,18 +44,17 @@ def check_map_bounds():
         print(f"   Consider adjusting the map view to include all venues.")
         
         # Calculate a new center that includes all venues
-        all_lats = [data['lat'] for data in venues.values()]
-        all_lons = [data['lon'] for data in venues.values()]
+        min_lon, min_lat, max_lon, max_lat = extent
         
-        new_center_lat = (min(all_lats) + max(all_lats)) / 2
-        new_center_lon = (min(all_lons) + max(all_lons)) / 2
+        new_center_lat = (min_lat + max_lat) / 2
+        new_center_lon = (min_lon + max_lon) / 2
         
         print(f"\n💡 Suggested new map center: {new_center_lat:.6f}, {new_center_lon:.6f}")
         print(f"   This would center the map to include all venues.")
         
         # Calculate suggested zoom level
-        lat_range = max(all_lats) - min(all_lats)
-        lon_range = max(all_lons) - min(all_lons)
+        lat_range = max_lat - min_lat
+        lon_range = max_lon - min_lon
         max_range = max(lat_range, lon_range)
         
         if max_range > 0.5:
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Checkpoint and Resume for Scrape Runs
+
+scheduler.py kills a run that exceeds its time limit, and a crash part way
+through a long crawl used to throw away every fetched page and downloaded
+image. The pipelines now record their progress in a small JSON checkpoint as
+they go:
+
+    scrape_checkpoint.json
+    {
+        "run_key": "<mode>:<listing URL>",
+        "started_at": "...", "updated_at": "...",
+        "stages": ["csv_saved", "archived"],
+        "pages": [{"url": "...", "events": 50, "mapped": 48}],
+        "next_url": "...",
+        "records": [...],
+        "event_keys": [...],
+        "unmapped_venues": [...],
+        "images": {"<image URL>": "artist_images/..."}
+    }
+
+A new run with the same run key (same mode and date range) resumes from the
+checkpoint: pages already fetched are not fetched again, images already
+downloaded are reused, and completed stages (such as appending to the
+history archive) are skipped. The checkpoint is removed when a run finishes.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from event_extraction import EventRecord
+
+CHECKPOINT_FILE = 'scrape_checkpoint.json'
+
+# Checkpoints older than this are discarded instead of resumed
+MAX_AGE_HOURS = 24
+
+
+def record_to_dict(record):
+    """
+    Serialize an EventRecord for the checkpoint.
+    """
+    return {slot: getattr(record, slot) for slot in EventRecord.__slots__}
+
+
+def record_from_dict(data):
+    """
+    Rebuild an EventRecord from its checkpoint form.
+    """
+    return EventRecord(**{slot: data.get(slot) for slot in EventRecord.__slots__ if slot in data})
+
+
+class RunCheckpoint:
+    """
+    Progress of one scrape run, persisted to a JSON file.
+    """
+
+    def __init__(self, run_key, path=CHECKPOINT_FILE, max_age_hours=MAX_AGE_HOURS, resume=True):
+        self.run_key = run_key
+        self.path = path
+        self.state = self._new_state()
+        self.resumed = False
+
+        previous = self._load() if resume else None
+        if previous is None:
+            return
+        if previous.get('run_key') != run_key:
+            logging.info("Ignoring checkpoint from a different run")
+            return
+        try:
+            updated_at = datetime.fromisoformat(previous['updated_at'])
+        except (KeyError, ValueError):
+            return
+        if datetime.now() - updated_at > timedelta(hours=max_age_hours):
+            logging.info("Ignoring stale checkpoint")
+            return
+
+        self.state.update(previous)
+        self.resumed = True
+        logging.info(f"Resuming run from checkpoint: stages {self.state['stages']}, "
+                     f"{len(self.state['pages'])} pages, {len(self.state['images'])} images")
+
+    def _new_state(self):
+        now = datetime.now().isoformat(timespec='seconds')
+        return {
+            'run_key': self.run_key,
+            'started_at': now,
+            'updated_at': now,
+            'stages': [],
+            'pages': [],
+            'next_url': None,
+            'records': None,
+            'event_keys': [],
+            'unmapped_venues': [],
+            'images': {}
+        }
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    # Stages
+
+    def stage_done(self, stage):
+        """
+        Check whether a stage completed in this run (or the run it resumes).
+        """
+        return stage in self.state['stages']
+
+    def mark_stage(self, stage):
+        """
+        Record a completed stage and save.
+        """
+        if stage not in self.state['stages']:
+            self.state['stages'].append(stage)
+        self.save()
+
+    # Listing pages
+
+    @property
+    def pages(self):
+        return self.state['pages']
+
+    @property
+    def next_url(self):
+        return self.state['next_url']
+
+    def record_page(self, url, next_url, events=0, mapped=0, event_keys=(), unmapped_venues=()):
+        """
+        Record a listing page whose output has been written, and save.
+
+        Args:
+            url (str): Page URL
+            next_url (str): Following page URL, or None if this was the last
+            events (int): Events written from the page
+            mapped (int): Events written to the GeoJSON
+            event_keys: Keys of the page's events, for deduplication on resume
+            unmapped_venues: Venues on the page without point locations
+        """
+        self.state['pages'].append({'url': url, 'events': events, 'mapped': mapped})
+        self.state['next_url'] = next_url
+        self.state['event_keys'].extend(key for key in event_keys if key)
+        unmapped = set(self.state['unmapped_venues'])
+        unmapped.update(str(venue) for venue in unmapped_venues)
+        self.state['unmapped_venues'] = sorted(unmapped)
+        self.save()
+
+    # Parsed events (batch mode)
+
+    def save_records(self, records):
+        """
+        Store the parsed events of a fetched page, and save.
+        """
+        self.state['records'] = [record_to_dict(record) for record in records]
+        self.save()
+
+    def load_records(self):
+        """
+        Return the stored events, or None if the page was not fetched yet.
+        """
+        if self.state['records'] is None:
+            return None
+        return [record_from_dict(data) for data in self.state['records']]
+
+    # Images
+
+    def image_for(self, image_url):
+        """
+        Return the local path of an image downloaded earlier in this run.
+        """
+        path = self.state['images'].get(image_url)
+        return path if path and os.path.exists(path) else None
+
+    def record_image(self, image_url, path):
+        """
+        Record a downloaded image (saved with the next checkpoint write).
+        """
+        if image_url and path:
+            self.state['images'][image_url] = path
+
+    # Persistence
+
+    def save(self):
+        """
+        Write the checkpoint atomically.
+        """
+        self.state['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.state, f, indent=1, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+    def clear(self):
+        """
+        Remove the checkpoint after a completed run.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Data Quality Profiler for Scraped Events
+
+Computes every data-quality check for an events DataFrame from a single set of
+column statistics (null counts, duplicate keys, parsed dates, image coverage
+and per-venue counts), then evaluates declarative rules against them.
+
+Rules are plain dicts so they can be kept in a JSON file:
+
+    {
+        "null_thresholds": {"Artist": 0.0, "Location": 0.0},
+        "duplicate_keys": ["Artist", "Location", "Date"],
+        "max_duplicates": 0,
+        "date_bounds": {"min_days_from_today": -1, "max_days_from_today": 730},
+        "image_column": "Artist_Image",
+        "min_image_coverage": 0.5,
+        "min_events": 1,
+        "max_event_drop": 0.5,
+        "event_drop_window": 3
+    }
+
+The result is machine-readable and includes an overall `passed` flag, so a
+scheduled run can fail when quality regresses.
+
+Every run's report is saved, passing or not, with the row counts of the
+last few runs (`recent_runs`). The event-drop check compares against the
+median of those, so one bad scrape does not move the baseline, but after a
+genuine drop the baseline settles at the new level within a few runs and
+the check passes again.
+
+Usage:
+    python data_quality.py [events.csv] [--rules rules.json] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+from time_index import TimeIndex
+
+DEFAULT_RULES = {
+    # Maximum fraction of missing values allowed per column
+    'null_thresholds': {'Artist': 0.0, 'Location': 0.0, 'Date': 0.05},
+    # Columns that identify a concert; rows sharing them are duplicates
+    'duplicate_keys': ['Artist', 'Location', 'Date'],
+    'max_duplicates': 0,
+    # Event dates must fall within this window around the run date
+    'date_bounds': {'min_days_from_today': -1, 'max_days_from_today': 730},
+    'image_column': 'Artist_Image',
+    'min_image_coverage': 0.5,
+    'min_events': 1,
+    # Fail if the event count drops by more than this fraction below the
+    # median count of the last event_drop_window runs
+    'max_event_drop': 0.5,
+    'event_drop_window': 3
+}
+
+REPORT_FILE = 'data_quality_report.json'
+
+
+def load_rules(path=None, overrides=None):
+    """
+    Build a rule set from the defaults, an optional JSON file and overrides.
+
+    Args:
+        path (str): Optional JSON file with rule overrides
+        overrides (dict): Optional rule overrides applied last
+
+    Returns:
+        dict: Complete rule set
+    """
+    rules = dict(DEFAULT_RULES)
+    if path:
+        with open(path, 'r') as f:
+            rules.update(json.load(f))
+    if overrides:
+        rules.update(overrides)
+    return rules
+
+
+def load_previous_report(path=REPORT_FILE):
+    """
+    Load the last saved quality report, if any.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def profile_events(df, rules=None, previous_report=None, today=None, time_index=None):
+    """
+    Profile an events DataFrame and evaluate quality rules.
+
+    Every statistic is computed once: one null mask over the frame, one
+    duplicate hash over the key columns, one time index and one value count
+    per venue. The rule checks only read those results; the date range and
+    date bounds are binary searches on the time index.
+
+    Args:
+        df (pandas.DataFrame): Events to profile
+        rules (dict): Rule set (defaults to DEFAULT_RULES)
+        previous_report (dict): Last saved report, used for regression checks
+        today (datetime): Reference date for date bounds (defaults to now)
+        time_index (TimeIndex): Time index of df, if the caller built one
+
+    Returns:
+        dict: Statistics, individual check results and overall `passed` flag
+    """
+    rules = rules or DEFAULT_RULES
+    today = pd.Timestamp(today or datetime.now()).normalize()
+    total = len(df)
+
+    # Column statistics, each computed in one pass
+    null_counts = df.isna().sum()
+    key_columns = [column for column in rules.get('duplicate_keys', []) if column in df.columns]
+    duplicates = int(df.duplicated(subset=key_columns).sum()) if key_columns and total else 0
+    time_index = time_index if time_index is not None else TimeIndex.from_frame(df)
+    venue_counts = df['Location'].value_counts() if 'Location' in df.columns else pd.Series(dtype=int)
+    # Categorical columns also count venues that no longer have rows
+    venue_counts = venue_counts[venue_counts > 0]
+    image_column = rules.get('image_column')
+    images = int(total - null_counts[image_column]) if image_column in df.columns else None
+
+    profile = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'row_count': total,
+        'null_counts': {column: int(count) for column, count in null_counts.items()},
+        'duplicates': duplicates,
+        'date_min': None,
+        'date_max': None,
+        'image_count': images,
+        'image_coverage': (images / total) if images is not None and total else None,
+        'venue_counts': {str(venue): int(count) for venue, count in venue_counts.items()},
+        'checks': []
+    }
+
+    if len(time_index):
+        profile['date_min'] = time_index.first_date()
+        profile['date_max'] = time_index.last_date()
+
+    def check(name, passed, value, threshold):
+        profile['checks'].append({
+            'name': name,
+            'passed': bool(passed),
+            'value': value,
+            'threshold': threshold
+        })
+
+    # Rule checks
+    check('min_events', total >= rules.get('min_events', 0), total, rules.get('min_events', 0))
+
+    for column, max_fraction in rules.get('null_thresholds', {}).items():
+        if column not in df.columns:
+            check(f'null_fraction:{column}', False, None, max_fraction)
+            continue
+        fraction = (int(null_counts[column]) / total) if total else 0.0
+        check(f'null_fraction:{column}', fraction <= max_fraction, round(fraction, 4), max_fraction)
+
+    if 'max_duplicates' in rules:
+        check('duplicates', duplicates <= rules['max_duplicates'], duplicates, rules['max_duplicates'])
+
+    bounds = rules.get('date_bounds')
+    if bounds and len(time_index):
+        earliest = today + pd.Timedelta(days=bounds.get('min_days_from_today', -36500))
+        latest = today + pd.Timedelta(days=bounds.get('max_days_from_today', 36500))
+        # Events on the latest day itself are in range
+        out_of_range = (time_index.count(None, earliest.to_pydatetime())
+                        + time_index.count((latest + pd.Timedelta(days=1)).to_pydatetime(), None))
+        check('date_bounds', out_of_range == 0, out_of_range,
+              [earliest.date().isoformat(), latest.date().isoformat()])
+
+    if 'min_image_coverage' in rules and profile['image_coverage'] is not None:
+        coverage = profile['image_coverage']
+        check('image_coverage', coverage >= rules['min_image_coverage'],
+              round(coverage, 4), rules['min_image_coverage'])
+
+    window = max(1, rules.get('event_drop_window', 1))
+    recent_runs = (previous_report or {}).get('recent_runs', [])
+    # Reports saved before recent_runs was added only hold their own count
+    if not recent_runs and previous_report and previous_report.get('row_count') is not None:
+        recent_runs = [{'generated_at': previous_report.get('generated_at'),
+                        'row_count': previous_report['row_count'],
+                        'passed': previous_report.get('passed', True)}]
+    recent_runs = recent_runs[-window:]
+    baseline = float(pd.Series([run['row_count'] for run in recent_runs]).median()) if recent_runs else 0
+    if 'max_event_drop' in rules and baseline:
+        drop = max(0.0, (baseline - total) / baseline)
+        check('event_drop', drop <= rules['max_event_drop'], round(drop, 4), rules['max_event_drop'])
+    profile['event_drop_baseline'] = baseline or None
+
+    profile['passed'] = all(result['passed'] for result in profile['checks'])
+    profile['recent_runs'] = (recent_runs + [{'generated_at': profile['generated_at'], 'row_count': total,
+                                              'passed': profile['passed']}])[-window:]
+    return profile
+
+
+def save_report(profile, path=REPORT_FILE):
+    """
+    Save a quality report as JSON, atomically.
+    """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(profile, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def print_report(profile):
+    """
+    Print a quality report in the same style as the scraper summaries.
+    """
+    total = profile['row_count']
+    print(f"\n📋 Missing data summary:")
+    for column, missing_count in profile['null_counts'].items():
+        percentage = (missing_count / total) * 100 if total else 0
+        print(f"  {column}: {missing_count} ({percentage:.1f}%)")
+
+    print(f"\n🔄 Duplicate events: {profile['duplicates']}")
+
+    if profile['date_min']:
+        print(f"\n📅 Date range: {profile['date_min']} to {profile['date_max']}")
+
+    if profile['image_coverage'] is not None:
+        print(f"\n🖼️ Image download success rate: {profile['image_coverage'] * 100:.1f}% "
+              f"({profile['image_count']}/{total})")
+
+    print(f"\n✔️ Checks:")
+    for result in profile['checks']:
+        status = "✅" if result['passed'] else "❌"
+        print(f"  {status} {result['name']}: {result['value']} (threshold: {result['threshold']})")
+
+
+def main():
+    """
+    Profile an events CSV and exit non-zero if any rule fails.
+    """
+    parser = argparse.ArgumentParser(description='Profile scraped events and check data quality rules')
+    parser.add_argument('csv', nargs='?', default='lexington_events_time_imperial_modified.csv',
+                        help='events CSV to profile')
+    parser.add_argument('--rules', default=None, help='JSON file with rule overrides')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--save', action='store_true', help=f'save the report to {REPORT_FILE}')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    rules = load_rules(args.rules)
+    if rules.get('image_column') not in df.columns and 'Artist Image' in df.columns:
+        rules['image_column'] = 'Artist Image'
+
+    profile = profile_events(df, rules, load_previous_report())
+
+    if args.json:
+        print(json.dumps(profile, indent=2))
+    else:
+        print_report(profile)
+
+    if args.save:
+        save_report(profile)
+
+    sys.exit(0 if profile['passed'] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Concert Deduplication for Scraped Events
+
+When a crawl spans several listing pages or overlapping date windows, the same
+concert can be scraped more than once, which duplicates rows in the CSV and
+stacks markers in the GeoJSON. This module gives every event a stable key and
+drops repeats with a hash-set check as events stream past.
+
+Keys are taken from the Songkick link when possible:
+
+    /concerts/42611701-deeohgee-at-burl                      -> concert:42611701
+    /festivals/3729645-fourth-on-four-mile/id/42590287-...   -> festival:42590287
+
+Otherwise a normalized artist + venue + date key is hashed. The winning
+(first-seen) entry for each key is recorded in a small JSON registry, so the
+same concert keeps the same winner across runs.
+"""
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from datetime import datetime, timedelta
+
+from event_schema import date_text
+
+REGISTRY_FILE = 'seen_events.json'
+
+# Registry entries for events older than this are pruned on save
+REGISTRY_RETENTION_DAYS = 365
+
+CONCERT_ID_PATTERN = re.compile(r'/concerts/(\d+)')
+FESTIVAL_ID_PATTERN = re.compile(r'/festivals/\d+[^/]*/id/(\d+)')
+
+
+def normalize_text(value):
+    """
+    Normalize a name for key comparison: strip accents, casefold and
+    collapse punctuation and whitespace.
+    """
+    if value is None or value != value:  # None or NaN
+        return ''
+    value = unicodedata.normalize('NFKD', str(value))
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return re.sub(r'[^0-9a-z]+', ' ', value.casefold()).strip()
+
+
+def concert_id(link):
+    """
+    Parse the concert or festival ID from a Songkick link.
+
+    Returns:
+        str: 'concert:<id>' or 'festival:<id>', or None if the link has no ID
+    """
+    if not link or link != link:
+        return None
+    match = FESTIVAL_ID_PATTERN.search(link)
+    if match:
+        return f"festival:{match.group(1)}"
+    match = CONCERT_ID_PATTERN.search(link)
+    if match:
+        return f"concert:{match.group(1)}"
+    return None
+
+
+def event_key(link, artist, venue, date):
+    """
+    Build the identity key for an event.
+
+    Args:
+        link (str): Songkick concert/festival link
+        artist (str): Artist name
+        venue (str): Cleaned venue name
+        date: Event date (YYYY-MM-DD string, date or Timestamp)
+
+    Returns:
+        str: Concert/festival ID key, or a hashed artist+venue+date key
+    """
+    key = concert_id(link)
+    if key:
+        return key
+    fallback = '|'.join((normalize_text(artist), normalize_text(venue), date_text(date)))
+    return 'event:' + hashlib.blake2b(fallback.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def event_keys(links, artists, venues, dates):
+    """
+    Build identity keys for whole columns (vectorized event_key).
+
+    IDs are parsed from the links with one regex pass per pattern; only rows
+    without an ID are hashed one by one.
+
+    Args:
+        links (pandas.Series): Songkick links, or None if there are none
+        artists (pandas.Series): Artist names
+        venues (pandas.Series): Cleaned venue names
+        dates (pandas.Series): Event dates
+
+    Returns:
+        pandas.Series: Keys (object dtype), aligned with links
+    """
+    if links is None:
+        keys = artists.astype(object)
+        keys[:] = [event_key(None, artist, venue, date) for artist, venue, date in zip(artists, venues, dates)]
+        return keys
+
+    text = links.astype('string')
+    festivals = text.str.extract(FESTIVAL_ID_PATTERN.pattern, expand=False)
+    concerts = text.str.extract(CONCERT_ID_PATTERN.pattern, expand=False)
+    keys = ('festival:' + festivals).fillna('concert:' + concerts).astype(object)
+
+    missing = keys.isna().to_numpy()
+    if missing.any():
+        keys[missing] = [
+            event_key(None, artist, venue, date)
+            for artist, venue, date in zip(artists[missing], venues[missing], dates[missing])
+        ]
+    return keys
+
+
+class EventDeduplicator:
+    """
+    Drop repeated events by key and record which source entry won.
+
+    Keys seen in the current run are kept in a set; winners are persisted to
+    a JSON registry so they are stable across runs.
+    """
+
+    def __init__(self, registry_path=REGISTRY_FILE):
+        self.registry_path = registry_path
+        self.registry = {}
+        self.run_keys = set()
+        self.duplicates = 0
+        if registry_path and os.path.exists(registry_path):
+            try:
+                with open(registry_path, 'r') as f:
+                    self.registry = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.registry = {}
+
+    def check(self, key, source, artist=None, date=None):
+        """
+        Register an event and report whether it is new in this run.
+
+        Args:
+            key (str): Event key from event_key()
+            source (str): Where this entry came from (e.g. a page URL)
+            artist (str): Artist name, stored with the winning entry
+            date (str): Event date, used to prune old registry entries
+
+        Returns:
+            bool: True if the event should be kept, False if it is a repeat
+        """
+        if key in self.run_keys:
+            self.duplicates += 1
+            return False
+        self.run_keys.add(key)
+
+        today = datetime.now().date().isoformat()
+        entry = self.registry.get(key)
+        if entry is None:
+            self.registry[key] = {'source': source, 'artist': artist, 'date': date_text(date) or None,
+                                  'first_seen': today, 'last_seen': today}
+        else:
+            entry['last_seen'] = today
+        return True
+
+    def winner(self, key):
+        """
+        Return the registry entry that won for a key, if any.
+        """
+        return self.registry.get(key)
+
+    def filter_rows(self, rows, source, link='Artist Link'):
+        """
+        Yield rows whose event key has not been seen in this run.
+
+        Args:
+            rows: Iterable of normalized row dicts (Artist, Location, Date, link)
+            source (str): Where the rows came from
+            link (str): Name of the Songkick link field in the rows
+
+        Yields:
+            dict: Unique rows, with an 'Event_Key' field added
+        """
+        for row in rows:
+            key = event_key(row.get(link), row.get('Artist'), row.get('Location'), row.get('Date'))
+            if self.check(key, source, row.get('Artist'), row.get('Date')):
+                row['Event_Key'] = key
+                yield row
+
+    def dedupe_dataframe(self, df, source, link='Artist Link'):
+        """
+        Drop repeated events from a DataFrame, keeping the first entry.
+
+        Args:
+            df (pandas.DataFrame): Processed events
+            source (str): Where the rows came from
+            link (str): Name of the Songkick link column
+
+        Returns:
+            pandas.DataFrame: Unique events with an Event_Key column
+        """
+        keys = event_keys(df.get(link), df['Artist'], df['Location'], df['Date'])
+        keep = [
+            self.check(key, source, artist, date)
+            for key, artist, date in zip(keys, df['Artist'], df['Date'])
+        ]
+        df['Event_Key'] = keys
+        # Only filter (and copy) when something was dropped
+        return df if all(keep) else df[keep]
+
+    def save(self):
+        """
+        Persist the registry, pruning events that are long past.
+        """
+        if not self.registry_path:
+            return
+        cutoff = (datetime.now() - timedelta(days=REGISTRY_RETENTION_DAYS)).date().isoformat()
+        self.registry = {
+            key: entry for key, entry in self.registry.items()
+            if not entry.get('date') or str(entry['date']) >= cutoff
+        }
+        temp_path = self.registry_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.registry, f, indent=1)
+        os.replace(temp_path, self.registry_path)
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Shared Event Extraction for the Songkick Scrapers
+
+Both automated_scraper.py and songkick_scraper_enhanced.py parse the same
+Songkick `event-listings-element` markup. This module holds the single copy
+of that parsing logic, the artist image URL handling and the datetime/location
+cleanup, so fixes only need to happen once.
+
+Events are parsed into compact EventRecord objects (one small slotted object per
+event instead of a dict or several parallel lists) and converted to DataFrame
+columns in bulk.
+"""
+
+from datetime import datetime
+from operator import attrgetter
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+import pandas as pd
+
+from event_schema import apply_event_schema
+
+SONGKICK_BASE_URL = 'https://www.songkick.com'
+
+# Common location suffixes to remove from "Venue,City, ST, US" strings
+LOCATION_SUFFIXES = [
+    ',Lexington, KY, US',
+    ',Georgetown, KY, US',
+    ',London, KY, US',
+    ',North Lexington, KY, US',
+    ',Richmond, KY, US',
+    ',Nicholasville, KY, US',
+    ',Winchester, KY, US'
+]
+
+
+class EventRecord:
+    """
+    A single event parsed from a Songkick listing page.
+
+    Uses __slots__ so that large crawls do not allocate a dict per event.
+    """
+
+    __slots__ = ('artist', 'location', 'datetime', 'artist_link',
+                 'image_url', 'image_path', 'time_text')
+
+    def __init__(self, artist, location=None, datetime='N/A', artist_link=None,
+                 image_url=None, image_path=None, time_text='N/A'):
+        self.artist = artist
+        self.location = location
+        self.datetime = datetime
+        self.artist_link = artist_link
+        self.image_url = image_url
+        self.image_path = image_path
+        self.time_text = time_text
+
+    def __repr__(self):
+        return f"EventRecord({self.artist!r} at {self.location!r} on {self.datetime!r})"
+
+
+def extract_image_url(event_element):
+    """
+    Extract the artist image URL from an event element.
+
+    Args:
+        event_element: BeautifulSoup element containing event data
+
+    Returns:
+        str: Image URL or None if not found
+    """
+    thumb_link = event_element.find('a', class_='thumb')
+    if not thumb_link:
+        return None
+
+    img_tag = thumb_link.find('img', class_='artist-profile-image')
+    if not img_tag:
+        return None
+
+    # Check for data-src attribute (lazy loading) before src
+    image_url = img_tag.get('data-src') or img_tag.get('src')
+    if not image_url:
+        return None
+
+    # Ensure URL has protocol
+    if image_url.startswith('//'):
+        image_url = 'https:' + image_url
+    elif not image_url.startswith('http'):
+        image_url = 'https://' + image_url
+
+    return image_url
+
+
+def parse_event(event_element):
+    """
+    Parse a single `event-listings-element` into an EventRecord.
+
+    Args:
+        event_element: BeautifulSoup <li> element for one event
+
+    Returns:
+        EventRecord: Parsed event, or None if no artist name was found
+    """
+    # Extract artist name
+    artist_tag = event_element.find('p', class_='artists')
+    if not artist_tag or not artist_tag.strong:
+        return None
+    artist_name = artist_tag.strong.get_text(strip=True)
+    if not artist_name:
+        return None
+
+    # Extract artist link
+    artist_link = None
+    artist_link_tag = artist_tag.find('a')
+    if artist_link_tag and 'href' in artist_link_tag.attrs:
+        artist_link = urljoin(SONGKICK_BASE_URL, artist_link_tag['href'])
+
+    # Extract event location
+    location_tag = event_element.find('p', class_='location')
+    location_name = location_tag.get_text(strip=True) if location_tag else None
+
+    # Extract date and time
+    datetime_value = 'N/A'
+    time_text = 'N/A'
+    time_element = event_element.find('time')
+    if time_element:
+        datetime_value = time_element.get('datetime', 'N/A')
+        time_text = time_element.get_text(strip=True)
+
+    return EventRecord(
+        artist=artist_name,
+        location=location_name,
+        datetime=datetime_value,
+        artist_link=artist_link,
+        image_url=extract_image_url(event_element),
+        time_text=time_text
+    )
+
+
+def find_event_elements(page):
+    """
+    Find all event listing elements on a page.
+
+    Args:
+        page: BeautifulSoup document, or raw HTML as str/bytes
+
+    Returns:
+        list: BeautifulSoup <li> elements, one per event
+    """
+    if not isinstance(page, BeautifulSoup):
+        page = BeautifulSoup(page, 'html.parser')
+    return page.find_all('li', class_='event-listings-element')
+
+
+def iter_event_records(page):
+    """
+    Yield an EventRecord for every parseable event on a page.
+
+    Events without an artist name are skipped.
+
+    Args:
+        page: BeautifulSoup document, or raw HTML as str/bytes
+
+    Yields:
+        EventRecord: Parsed events in page order
+    """
+    for event_element in find_event_elements(page):
+        record = parse_event(event_element)
+        if record is not None:
+            yield record
+
+
+def find_next_page_url(page, current_url):
+    """
+    Find the URL of the next listing page, if there is one.
+
+    Args:
+        page: BeautifulSoup document for the current page
+        current_url (str): URL the page was fetched from
+
+    Returns:
+        str: Absolute URL of the next page, or None on the last page
+    """
+    next_link = page.find('a', rel='next') or page.find('a', class_='next_page')
+    if next_link and next_link.get('href'):
+        return urljoin(current_url, next_link['href'])
+    return None
+
+
+def records_to_columns(records, columns):
+    """
+    Convert EventRecords to a dict of column lists in one pass.
+
+    Args:
+        records (list): EventRecord objects
+        columns (dict): Mapping of EventRecord attribute -> output column name
+
+    Returns:
+        dict: Output column name -> list of values
+    """
+    fields = list(columns)
+    if not records:
+        return {columns[field]: [] for field in fields}
+
+    getter = attrgetter(*fields)
+    if len(fields) == 1:
+        values = [[getter(record) for record in records]]
+    else:
+        values = zip(*map(getter, records))
+    return {columns[field]: list(column) for field, column in zip(fields, values)}
+
+
+def records_to_dataframe(records, columns):
+    """
+    Build a DataFrame from EventRecords, typed with the event schema.
+
+    Args:
+        records (list): EventRecord objects
+        columns (dict): Mapping of EventRecord attribute -> output column name
+
+    Returns:
+        pandas.DataFrame: One row per record, columns in mapping order
+    """
+    df = pd.DataFrame(records_to_columns(records, columns), columns=list(columns.values()))
+    return apply_event_schema(df)
+
+
+def split_datetime_value(datetime_value):
+    """
+    Split a single Songkick datetime string into date and 24-hour time.
+
+    Scalar counterpart of split_datetime_columns, used when rows are
+    processed one at a time.
+
+    Args:
+        datetime_value (str): Raw datetime value
+
+    Returns:
+        tuple: (date, HH:MM time), with None where missing
+    """
+    if not datetime_value or datetime_value == 'N/A':
+        return None, None
+    date_part, _, time_part = str(datetime_value).partition('T')
+    return date_part, (time_part[:5] or None)
+
+
+def imperial_time(time_value):
+    """
+    Convert a single 24-hour HH:MM time to 12-hour format.
+
+    Args:
+        time_value (str): Time in HH:MM format
+
+    Returns:
+        str: Time in '%I:%M %p' format, or the input if it cannot be parsed
+    """
+    if not time_value:
+        return None
+    try:
+        return datetime.strptime(time_value, '%H:%M').strftime('%I:%M %p')
+    except ValueError:
+        return time_value
+
+
+def clean_location(location):
+    """
+    Remove city/state suffixes and stray commas from a single location.
+
+    Args:
+        location (str): Raw location string
+
+    Returns:
+        str: Cleaned venue name
+    """
+    if location is None:
+        return None
+    for suffix in LOCATION_SUFFIXES:
+        location = location.replace(suffix, '')
+    return location.strip().rstrip(',')
+
+
+def split_datetime_columns(datetimes):
+    """
+    Split Songkick datetime strings into date and 24-hour time columns.
+
+    Handles ISO values (2025-07-24T19:00:00-0500), date-only values and
+    missing ('N/A') values in vectorized string operations.
+
+    Args:
+        datetimes (pandas.Series): Raw Datetime column
+
+    Returns:
+        tuple: (date Series, HH:MM time Series), with None where missing
+    """
+    raw = datetimes.astype(object).where(datetimes.notna() & (datetimes != 'N/A'))
+    parts = raw.str.partition('T')
+    dates = parts[0].where(raw.notna())
+    times = parts[2].str[:5]
+    times = times.where(raw.notna() & (times != ''))
+    return dates.astype(object).where(dates.notna(), None), times.astype(object).where(times.notna(), None)
+
+
+def convert_to_imperial(times):
+    """
+    Convert a column of 24-hour HH:MM times to 12-hour format.
+
+    Values that cannot be parsed are passed through unchanged.
+
+    Args:
+        times (pandas.Series): Times in HH:MM format
+
+    Returns:
+        pandas.Series: Times in '%I:%M %p' format
+    """
+    parsed = pd.to_datetime(times, format='%H:%M', errors='coerce')
+    imperial = parsed.dt.strftime('%I:%M %p').astype(object)
+    return imperial.where(parsed.notna(), times.astype(object))
+
+
+def clean_location_column(locations):
+    """
+    Remove city/state suffixes and stray commas from a Location column.
+
+    A categorical column is cleaned once per distinct location and stays
+    categorical.
+
+    Args:
+        locations (pandas.Series): Raw location strings
+
+    Returns:
+        pandas.Series: Cleaned venue names
+    """
+    if isinstance(locations.dtype, pd.CategoricalDtype):
+        categories = locations.cat.categories
+        mapping = dict(zip(categories, clean_location_column(pd.Series(categories, dtype=object))))
+        return locations.map(mapping).astype('category')
+
+    cleaned = locations
+    for suffix in LOCATION_SUFFIXES:
+        cleaned = cleaned.str.replace(suffix, '', regex=False)
+    return cleaned.str.strip().str.rstrip(',')
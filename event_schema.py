@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Typed, Memory-Compact Event Schema
+
+Event DataFrames used to hold every column as Python object strings, although
+most of them repeat on every row: a few dozen venues, a handful of show times
+and the same artists across every scrape of a multi-year history. The scrapers
+now give each column an explicit type:
+
+    categorical   Location, Venue, Time, Time_Text
+    datetime64    Date
+    interned str  Artist, Artist Link / Artist_Link, Artist Image /
+                  Artist_Image, Event_Key
+
+Categoricals store one small integer code per row plus each distinct value
+once; interned strings share one object per distinct value. (String columns
+that pandas already stores in Arrow buffers, the default from pandas 3, are
+compact as they are and are not interned.) Stages convert columns in place
+(no whole-frame copies), and apply_event_schema is idempotent, so any stage
+can call it on what it receives.
+
+Date columns are written back as YYYY-MM-DD text where the output is JSON or
+GeoJSON (see format_for_export and date_text).
+
+Usage:
+    python event_schema.py --benchmark [--years 3] [--history-dir history]
+"""
+
+import argparse
+import random
+import sys
+from bisect import bisect_left
+from datetime import date, timedelta
+
+import pandas as pd
+
+CATEGORY_COLUMNS = ('Location', 'Venue', 'Time', 'Time_Text')
+DATE_COLUMNS = ('Date',)
+INTERNED_COLUMNS = ('Artist', 'Artist Link', 'Artist_Link', 'Artist Image', 'Artist_Image', 'Event_Key')
+
+DATE_FORMAT = '%Y-%m-%d'
+
+# pandas dtypes for reading an events CSV straight into the schema
+CSV_DTYPES = {column: 'category' for column in CATEGORY_COLUMNS}
+
+
+def date_text(value):
+    """
+    Format an event date (string, date or Timestamp) as YYYY-MM-DD.
+
+    Returns:
+        str: The date, or '' for missing values (None, NaN, NaT)
+    """
+    if value is None or value != value:
+        return ''
+    if hasattr(value, 'strftime'):
+        return value.strftime(DATE_FORMAT)
+    return str(value)
+
+
+def intern_strings(values):
+    """
+    Intern the strings in a column so repeated values share one object.
+
+    Returns:
+        list: Values with strings interned and everything else unchanged
+    """
+    return [sys.intern(value) if type(value) is str else value for value in values]
+
+
+def to_dates(values):
+    """
+    Parse a column of YYYY-MM-DD dates to datetime64; invalid dates are NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, format=DATE_FORMAT, errors='coerce')
+
+
+def to_category(values):
+    """
+    Convert a column to categorical (unchanged if it already is).
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values
+    return values.astype('category')
+
+
+def apply_event_schema(df):
+    """
+    Convert an events DataFrame's columns to the schema, in place.
+
+    Columns that are absent are skipped, and columns that already have their
+    schema type are left alone.
+
+    Args:
+        df (pandas.DataFrame): Events (either CSV column convention)
+
+    Returns:
+        pandas.DataFrame: The same DataFrame
+    """
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = to_category(df[column])
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = to_dates(df[column])
+    for column in INTERNED_COLUMNS:
+        if column in df.columns and df[column].dtype == object:
+            df[column] = pd.Series(intern_strings(df[column]), index=df.index, dtype=object)
+    return df
+
+
+def read_events_csv(path, **kwargs):
+    """
+    Read an events CSV directly into the schema.
+
+    Args:
+        path (str): CSV path
+        **kwargs: Passed to pandas.read_csv
+
+    Returns:
+        pandas.DataFrame: Typed events
+    """
+    dtypes = dict(CSV_DTYPES)
+    dtypes.update(kwargs.pop('dtype', {}))
+    return apply_event_schema(pd.read_csv(path, dtype=dtypes, **kwargs))
+
+
+def format_for_export(df):
+    """
+    Turn schema columns back into plain values for JSON/GeoJSON output, in place.
+
+    Dates become YYYY-MM-DD strings (None where missing) and categoricals
+    become object columns.
+
+    Returns:
+        pandas.DataFrame: The same DataFrame
+    """
+    for column in DATE_COLUMNS:
+        if column in df.columns and pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime(DATE_FORMAT).astype(object).where(df[column].notna(), None)
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(object).where(df[column].notna(), None)
+    return df
+
+
+def column_memory(values):
+    """
+    Bytes used by a column, counting shared string objects once.
+
+    pandas' deep memory usage counts a string once per row even when rows
+    share the object, which hides the effect of interning.
+    """
+    if values.dtype != object:
+        return int(values.memory_usage(deep=True, index=False))
+    unique_objects = {id(value): value for value in values}
+    return int(values.memory_usage(deep=False, index=False)) + sum(
+        sys.getsizeof(value) for value in unique_objects.values())
+
+
+def frame_memory(df):
+    """
+    Bytes used per column (see column_memory).
+
+    Returns:
+        dict: Column name -> bytes
+    """
+    return {column: column_memory(df[column]) for column in df.columns}
+
+
+def synthetic_history(years=3, scrapes_per_week=1, seed=0):
+    """
+    Generate the rows a multi-year archive of weekly scrapes would hold.
+
+    Each scrape lists roughly the next two months of events, so most events
+    appear in several scrapes, as in the real archive. Values are built as
+    fresh string objects per row, as when read from CSV.
+
+    Returns:
+        pandas.DataFrame: Events with object columns, in CSV column names
+    """
+    rng = random.Random(seed)
+    venues = [f"Venue {number}" for number in range(40)]
+    artists = [f"Artist {number}" for number in range(3000)]
+    times = ['06:00 PM', '07:00 PM', '07:30 PM', '08:00 PM', '09:00 PM', None]
+    start = date.today() - timedelta(days=365 * years)
+
+    # One event every few hours across the whole period
+    events = []
+    for day in range(365 * years + 60):
+        for _ in range(rng.randint(2, 8)):
+            events.append((start + timedelta(days=day), rng.choice(artists), rng.choice(venues),
+                           rng.choice(times), 40000000 + len(events)))
+
+    rows = {column: [] for column in ('Artist', 'Location', 'Datetime', 'Artist Link',
+                                      'Artist Image', 'Date', 'Time', 'Event_Key')}
+    event_days = [event[0] for event in events]
+    interval = max(1, 7 // scrapes_per_week)
+    for scrape_day in range(0, 365 * years, interval):
+        scrape_date = start + timedelta(days=scrape_day)
+        first = bisect_left(event_days, scrape_date)
+        last = bisect_left(event_days, scrape_date + timedelta(days=60))
+        for event_date, artist, venue, time_text, concert in events[first:last]:
+            # ''.join() makes a fresh copy of each string, as a CSV reader does
+            day_text = event_date.isoformat()
+            rows['Artist'].append(''.join(artist))
+            rows['Location'].append(''.join(venue))
+            rows['Datetime'].append(f"{day_text}T20:00:00-0500")
+            rows['Artist Link'].append(f"https://www.songkick.com/concerts/{concert}-{artist.lower().replace(' ', '-')}")
+            rows['Artist Image'].append(f"artist_images/{artist.replace(' ', '_')}.jpg")
+            rows['Date'].append(''.join(day_text))
+            rows['Time'].append(None if time_text is None else ''.join(time_text))
+            rows['Event_Key'].append(f"concert:{concert}")
+    return pd.DataFrame(rows, dtype=object)
+
+
+def run_benchmark(years=3, history_dir=None):
+    """
+    Measure memory per column before and after applying the schema.
+
+    Args:
+        years (int): Years of synthetic weekly scrapes
+        history_dir (str): Use this Parquet history archive instead
+
+    Returns:
+        dict: Row count and per-column bytes before and after
+    """
+    if history_dir:
+        from history_archive import open_archive
+        df = open_archive(history_dir).to_table().to_pandas()
+        df['Date'] = df['Date'].astype(str).where(df['Date'].notna(), None)
+        df = df.drop(columns=[column for column in ('Scraped_At', 'scrape_date') if column in df.columns])
+    else:
+        df = synthetic_history(years)
+
+    before = frame_memory(df)
+    apply_event_schema(df)
+    after = frame_memory(df)
+    return {'rows': len(df), 'before': before, 'after': after,
+            'dtypes': {column: str(dtype) for column, dtype in df.dtypes.items()}}
+
+
+def main():
+    """
+    Run the memory benchmark from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Typed event schema tools')
+    parser.add_argument('--benchmark', action='store_true', help='measure memory savings of the schema')
+    parser.add_argument('--years', type=int, default=3, help='years of synthetic scrape history')
+    parser.add_argument('--history-dir', default=None, help='benchmark the Parquet history archive instead')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+        return
+
+    result = run_benchmark(args.years, args.history_dir)
+    source = args.history_dir or f"{args.years} years of synthetic weekly scrapes"
+    print(f"🧮 Event schema memory benchmark: {result['rows']:,} rows ({source})")
+    print(f"  {'Column':<14} {'dtype':<15} {'Before':>12} {'After':>12} {'Saved':>7}")
+    for column, before in result['before'].items():
+        after = result['after'][column]
+        saved = (1 - after / before) * 100 if before else 0.0
+        print(f"  {column:<14} {result['dtypes'][column]:<15} {before / 1e6:>10.2f}MB "
+              f"{after / 1e6:>10.2f}MB {saved:>6.1f}%")
+    total_before = sum(result['before'].values())
+    total_after = sum(result['after'].values())
+    print(f"  {'Total':<30} {total_before / 1e6:>10.2f}MB {total_after / 1e6:>10.2f}MB "
+          f"{(1 - total_after / total_before) * 100 if total_before else 0.0:>6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
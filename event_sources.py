@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Pluggable Event Sources
+
+The pipeline used to know only Songkick's metro-area listing. Event sources
+are now adapters with one method, iter_records(start_date, end_date), that
+yields EventRecords (the same normalized record the Songkick parser
+produces). LexingtonEventScraper is the Songkick adapter; this module adds
+adapters for other calendars:
+
+    ics       an iCalendar export (file path or URL), one VEVENT per show
+    jsonld    a venue calendar page (file path or URL) that embeds
+              schema.org Event / MusicEvent JSON-LD, as most ticketing and
+              venue sites do
+
+Extra sources are configured in event_sources.json (optional):
+
+    [
+        {"type": "ics", "name": "burl", "location": "exports/the_burl.ics",
+         "venue": "The Burl"},
+        {"type": "jsonld", "name": "manchester",
+         "location": "https://example.com/calendar", "venue": "Manchester Music Hall",
+         "rate": 0.5, "burst": 1}
+    ]
+
+`venue` fixes the venue name for single-venue calendars; otherwise the
+event's own location is used. `rate` and `burst` set the request rate for the
+source's host in the shared rate limiter, so every source has its own token
+bucket and a slow venue site never holds up the Songkick crawl.
+
+iter_source_records runs all sources at once, one thread each, and merges
+their records into one stream. The first source's records stream through as
+they arrive; a later source's records are held until the sources before it
+have finished, so the same show listed by two sources (same artist, venue and
+date) is always kept from the source listed first. Fetching is still fully
+concurrent, so the total time is that of the slowest source. Repeats within
+a source are left to EventDeduplicator.
+
+Usage:
+    python event_sources.py [--config event_sources.json] [--days 60]
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import re
+import threading
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit
+from zoneinfo import ZoneInfo
+
+from bs4 import BeautifulSoup
+
+from dedup import normalize_text
+from event_extraction import EventRecord, clean_location, split_datetime_value
+from http_client import create_session
+from time_index import LOCAL_TIMEZONE
+
+SOURCES_FILE = 'event_sources.json'
+
+# Records buffered between the source threads and the consumer
+QUEUE_SIZE = 1000
+
+# Seconds a source thread waits on a full queue before checking for a stop
+PUT_TIMEOUT = 0.5
+
+# schema.org types treated as events in JSON-LD
+JSONLD_EVENT_TYPES = {'Event', 'MusicEvent', 'Festival', 'ComedyEvent', 'TheaterEvent'}
+
+ICS_ESCAPES = {'\\n': '\n', '\\N': '\n', '\\,': ',', '\\;': ';', '\\\\': '\\'}
+
+
+class EventSource:
+    """
+    Base class for event source adapters.
+
+    Subclasses implement iter_records(start_date, end_date). A source marked
+    required fails the whole merged stream if it fails; other sources are
+    logged and skipped.
+    """
+
+    required = False
+
+    def __init__(self, name, session=None, rate=None, burst=None):
+        """
+        Args:
+            name (str): Source name, recorded as the source of its events
+            session: Rate-limited session for fetching (created if None)
+            rate (float): Requests per second for this source's host
+            burst (int): Burst size for this source's host
+        """
+        self.name = name
+        self.session = session or create_session()
+        self.rate = rate
+        self.burst = burst
+
+    def iter_records(self, start_date, end_date):
+        """
+        Yield EventRecords for events from start_date to end_date (inclusive).
+        """
+        raise NotImplementedError
+
+    def set_host_rate(self, url):
+        """
+        Give the URL's host this source's rate in the session's limiter.
+        """
+        if self.rate and getattr(self.session, 'limiter', None) is not None:
+            self.session.limiter.set_host_rate(urlsplit(url).hostname or '', self.rate, self.burst or 1)
+
+    def read(self, location):
+        """
+        Read a local file, or fetch a URL through the rate-limited session.
+        """
+        if urlsplit(location).scheme in ('http', 'https'):
+            self.set_host_rate(location)
+            response = self.session.get(location, timeout=30)
+            response.raise_for_status()
+            return response.text
+        with open(location, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+
+def record_date(record):
+    """
+    Event date of a record as a date, or None if it has none.
+    """
+    date_part, _ = split_datetime_value(record.datetime)
+    try:
+        return datetime.strptime(date_part, '%Y-%m-%d').date() if date_part else None
+    except ValueError:
+        return None
+
+
+def local_datetime_text(value, timezone=LOCAL_TIMEZONE):
+    """
+    Format a datetime as local wall-clock ISO text, like Songkick's listing.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(ZoneInfo(timezone)).replace(tzinfo=None)
+    return value.strftime('%Y-%m-%dT%H:%M:%S')
+
+
+# iCalendar
+
+def unescape_ics(value):
+    return re.sub(r'\\[nN,;\\]', lambda match: ICS_ESCAPES[match.group(0)], value)
+
+
+def parse_ics_events(text):
+    """
+    Parse the VEVENTs of an iCalendar document.
+
+    Returns:
+        list: One dict per event, property name -> (value, parameters)
+    """
+    # Lines starting with a space or tab continue the previous line
+    lines = re.sub(r'\r?\n[ \t]', '', text).splitlines()
+    events = []
+    current = None
+    for line in lines:
+        if line == 'BEGIN:VEVENT':
+            current = {}
+        elif line == 'END:VEVENT' and current is not None:
+            events.append(current)
+            current = None
+        elif current is not None and ':' in line:
+            head, _, value = line.partition(':')
+            name, *params = head.split(';')
+            current[name.upper()] = (value, dict(param.partition('=')[::2] for param in params))
+    return events
+
+
+def parse_ics_datetime(value, params, timezone=LOCAL_TIMEZONE):
+    """
+    Convert a DTSTART value to local ISO text (date only for all-day events).
+    """
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        return datetime.strptime(value[:8], '%Y%m%d').strftime('%Y-%m-%d')
+    moment = datetime.strptime(value.rstrip('Z')[:15], '%Y%m%dT%H%M%S')
+    if value.endswith('Z'):
+        moment = moment.replace(tzinfo=ZoneInfo('UTC'))
+    elif params.get('TZID'):
+        moment = moment.replace(tzinfo=ZoneInfo(params['TZID']))
+    return local_datetime_text(moment, timezone)
+
+
+class IcsSource(EventSource):
+    """
+    Events from an iCalendar export.
+    """
+
+    def __init__(self, name, location, venue=None, **kwargs):
+        super().__init__(name, **kwargs)
+        self.location = location
+        self.venue = venue
+
+    def iter_records(self, start_date, end_date):
+        for event in parse_ics_events(self.read(self.location)):
+            if 'SUMMARY' not in event or 'DTSTART' not in event:
+                continue
+            location = unescape_ics(event['LOCATION'][0]) if 'LOCATION' in event else None
+            try:
+                datetime_value = parse_ics_datetime(*event['DTSTART'])
+            except (ValueError, KeyError):
+                continue
+            yield EventRecord(
+                artist=unescape_ics(event['SUMMARY'][0]).strip(),
+                # A street address follows the venue name in most exports
+                location=self.venue or (location.split(',')[0].strip() if location else None),
+                datetime=datetime_value,
+                artist_link=event['URL'][0] if 'URL' in event else None
+            )
+
+
+# schema.org JSON-LD
+
+def iter_jsonld_events(data):
+    """
+    Find event objects in parsed JSON-LD, including inside @graph lists.
+    """
+    if isinstance(data, list):
+        for item in data:
+            yield from iter_jsonld_events(item)
+    elif isinstance(data, dict):
+        types = data.get('@type')
+        types = set(types) if isinstance(types, list) else {types}
+        if types & JSONLD_EVENT_TYPES:
+            yield data
+        elif '@graph' in data:
+            yield from iter_jsonld_events(data['@graph'])
+
+
+def jsonld_name(value):
+    """
+    Name of a JSON-LD thing, or the names of a list of things joined by commas.
+    """
+    if isinstance(value, list):
+        return ', '.join(filter(None, map(jsonld_name, value))) or None
+    if isinstance(value, dict):
+        return value.get('name')
+    return value or None
+
+
+def jsonld_image(value):
+    if isinstance(value, list):
+        return jsonld_image(value[0]) if value else None
+    if isinstance(value, dict):
+        return value.get('url') or value.get('contentUrl')
+    return value or None
+
+
+class JsonLdSource(EventSource):
+    """
+    Events from a calendar page with schema.org Event JSON-LD.
+    """
+
+    def __init__(self, name, location, venue=None, **kwargs):
+        super().__init__(name, **kwargs)
+        self.location = location
+        self.venue = venue
+
+    def iter_records(self, start_date, end_date):
+        page = BeautifulSoup(self.read(self.location), 'html.parser')
+        for script in page.find_all('script', type='application/ld+json'):
+            try:
+                data = json.loads(script.string or '')
+            except json.JSONDecodeError:
+                continue
+            for event in iter_jsonld_events(data):
+                artist = jsonld_name(event.get('performer')) or event.get('name')
+                start = event.get('startDate')
+                if not artist or not start:
+                    continue
+                try:
+                    datetime_value = local_datetime_text(datetime.fromisoformat(start)) if 'T' in start else start[:10]
+                except ValueError:
+                    continue
+                yield EventRecord(
+                    artist=artist.strip(),
+                    location=self.venue or jsonld_name(event.get('location')),
+                    datetime=datetime_value,
+                    artist_link=event.get('url'),
+                    image_url=jsonld_image(event.get('image'))
+                )
+
+
+SOURCE_TYPES = {'ics': IcsSource, 'jsonld': JsonLdSource}
+
+
+def load_sources(path=SOURCES_FILE):
+    """
+    Build the extra sources listed in the config file.
+
+    Returns:
+        list: EventSource instances (empty if the file does not exist)
+
+    Raises:
+        ValueError: If an entry has an unknown type or no location
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+
+    sources = []
+    for entry in entries:
+        source_class = SOURCE_TYPES.get(entry.get('type'))
+        if source_class is None:
+            raise ValueError(f"Unknown event source type {entry.get('type')!r} in {path} "
+                             f"(types: {', '.join(SOURCE_TYPES)})")
+        if not entry.get('location'):
+            raise ValueError(f"Event source {entry.get('name')!r} in {path} has no location")
+        sources.append(source_class(
+            entry.get('name') or entry['location'], entry['location'],
+            venue=entry.get('venue'), rate=entry.get('rate'), burst=entry.get('burst')
+        ))
+    return sources
+
+
+# Concurrent merge
+
+_DONE = object()
+
+
+def iter_source_records(sources, start_date, end_date, queue_size=QUEUE_SIZE):
+    """
+    Run sources concurrently and merge their records into one stream.
+
+    Records outside the date range are dropped, as are shows already
+    delivered by an earlier source in the list (same normalized artist,
+    venue and date). Records come out in source order.
+
+    Args:
+        sources (list): EventSource instances
+        start_date (date): First event date
+        end_date (date): Last event date (inclusive)
+        queue_size (int): Records buffered between threads and consumer
+
+    Yields:
+        tuple: (source name, EventRecord)
+
+    Raises:
+        Exception: The error of a required source that failed, once the
+        other sources have finished
+    """
+    records = queue.Queue(maxsize=queue_size)
+    errors = {}
+    # Set when the consumer stops early, so blocked source threads exit
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                records.put(item, timeout=PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce(position, source):
+        try:
+            for record in source.iter_records(start_date, end_date):
+                if not put((position, record)):
+                    return
+        except Exception as e:
+            errors[position] = e
+            logging.error(f"Event source {source.name} failed: {str(e)}")
+        finally:
+            put((position, _DONE))
+
+    for position, source in enumerate(sources):
+        threading.Thread(target=produce, args=(position, source), name=f"source-{source.name}",
+                         daemon=True).start()
+
+    first_source = {}
+    counts = [0] * len(sources)
+    duplicates = 0
+
+    def accept(position, record):
+        nonlocal duplicates
+        event_date = record_date(record)
+        if event_date is not None and not start_date <= event_date <= end_date:
+            return False
+        identity = (normalize_text(record.artist), normalize_text(clean_location(record.location)),
+                    event_date)
+        if first_source.setdefault(identity, position) != position:
+            duplicates += 1
+            return False
+        counts[position] += 1
+        return True
+
+    # Records of sources after the current one wait until it has finished
+    held = [[] for _ in sources]
+    finished = set()
+    current = 0
+    try:
+        while current < len(sources):
+            position, record = records.get()
+            if record is _DONE:
+                finished.add(position)
+            elif position == current:
+                if accept(position, record):
+                    yield sources[position].name, record
+            else:
+                held[position].append(record)
+
+            while current in finished:
+                current += 1
+                if current < len(sources):
+                    for record in held[current]:
+                        if accept(current, record):
+                            yield sources[current].name, record
+                    held[current] = []
+    finally:
+        stopped.set()
+
+    logging.info(f"Event sources: {', '.join(f'{source.name} {count}' for source, count in zip(sources, counts))}"
+                 f"{f'; {duplicates} listed by more than one source' if duplicates else ''}")
+    for position, source in enumerate(sources):
+        if source.required and position in errors:
+            raise errors[position]
+
+
+def main():
+    """
+    Fetch the configured extra sources and list their events.
+    """
+    parser = argparse.ArgumentParser(description='Fetch events from the configured extra sources')
+    parser.add_argument('--config', default=SOURCES_FILE, help='event source config file')
+    parser.add_argument('--days', type=int, default=60, help='number of days ahead to include')
+    args = parser.parse_args()
+
+    sources = load_sources(args.config)
+    if not sources:
+        print(f"📭 No extra event sources configured in {args.config}")
+        return
+
+    start_date = date.today()
+    end_date = start_date + timedelta(days=args.days)
+    print(f"📡 Fetching {len(sources)} sources: {', '.join(source.name for source in sources)}")
+    for name, record in iter_source_records(sources, start_date, end_date):
+        print(f"  - [{name}] {record.datetime}  {record.artist} @ {record.location}")
+
+
+if __name__ == "__main__":
+    main()
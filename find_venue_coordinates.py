@@ -1,6 +1,12 @@
-import requests
-import time
 import json
+import os
+
+from event_schema import read_events_csv
+from http_client import create_session
+from venue_registry import GEOCODED_PATH, open_registry
+
+# Nominatim allows 1 request/second; the session's limiter enforces it
+session = create_session({'User-Agent': 'GigMap Venue Geocoder'})
 
 def geocode_venue(venue_name, city="Lexington, KY"):
     """Geocode a venue name to get coordinates."""
@@ -23,9 +29,7 @@ def geocode_venue(venue_name, city="Lexington, KY"):
                 'addressdetails': 1
             }
             
-            response = requests.get(url, params=params, headers={
-                'User-Agent': 'GigMap Venue Geocoder'
-            })
+            response = session.get(url, params=params, timeout=10)
             
             if response.status_code == 200:
                 results = response.json()
@@ -48,9 +52,6 @@ def geocode_venue(venue_name, city="Lexington, KY"):
                         'address': display_name
                     }
             
-            # Be respectful to the geocoding service
-            time.sleep(1)
-            
         except Exception as e:
             print(f"❌ Error geocoding '{venue_name}': {e}")
             continue
@@ -58,13 +59,34 @@ def geocode_venue(venue_name, city="Lexington, KY"):
     print(f"❌ Could not find coordinates for '{venue_name}'")
     return None
 
+def find_unlocated_venues(csv_path='lexington_events_time_imperial_modified.csv'):
+    """Return event venues the venue registry can't place."""
+    df = read_events_csv(csv_path, usecols=['Location'])
+    with open_registry() as registry:
+        return sorted(venue for venue in df['Location'].dropna().unique()
+                      if registry.get(venue) is None)
+
+def save_results(results, path=GEOCODED_PATH):
+    """Merge geocoding results into the JSON file, replacing entries for the same venue."""
+    entries = []
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            entries = json.load(f)
+    found = {result['venue'] for result in results}
+    entries = [entry for entry in entries if entry['venue'] not in found] + results
+    
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(entries, f, indent=2)
+    os.replace(temp_path, path)
+
 def main():
-    """Find coordinates for missing venues."""
+    """Find coordinates for venues missing from the venue registry."""
     
-    missing_venues = [
-        "Al's Bar of Lexington",
-        "Dreaming Creek Brewery"
-    ]
+    missing_venues = find_unlocated_venues()
+    if not missing_venues:
+        print("✅ Every event venue is in the venue registry.")
+        return
     
     print("🔍 Finding coordinates for missing venues...")
     print("=" * 50)
@@ -77,12 +99,13 @@ def main():
         if result:
             results.append(result)
     
-    # Save results to a file
+    # Save results to the file and the venue registry
     if results:
-        with open('missing_venue_coordinates.json', 'w') as f:
-            json.dump(results, f, indent=2)
+        save_results(results)
+        with open_registry() as registry:
+            registry.import_json(GEOCODED_PATH)
         
-        print("\n📁 Results saved to 'missing_venue_coordinates.json'")
+        print(f"\n📁 Results saved to '{GEOCODED_PATH}' and the venue registry")
         print("\n📋 COORDINATES SUMMARY:")
         for result in results:
             print(f"  {result['venue']}:")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Event History Archive for the Lexington Gig Map
+
+Every scrape overwrites lexington_events_time_imperial_modified.csv, so older
+snapshots are lost unless someone copies them by hand. This module appends
+each run to a date-partitioned Parquet archive with typed columns:
+
+    history/scrape_date=2025-08-14/run-20250814T144834-3f9c1a2b.parquet
+
+Queries over the archive (e.g. events per venue per month over the last year)
+run as columnar scans that only read the columns and partitions they need.
+
+Usage:
+    python history_archive.py venue-months [--months 12]
+"""
+
+import argparse
+import os
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from dedup import event_keys
+from event_schema import to_dates
+
+HISTORY_DIR = 'history'
+
+# Typed schema for archived events (scrape_date is the partition key)
+ARCHIVE_SCHEMA = pa.schema([
+    ('Artist', pa.string()),
+    ('Location', pa.string()),
+    ('Datetime', pa.string()),
+    ('Artist_Link', pa.string()),
+    ('Artist_Image', pa.string()),
+    ('Date', pa.date32()),
+    ('Time', pa.string()),
+    ('Event_Key', pa.string()),
+    ('Scraped_At', pa.timestamp('s')),
+    ('Run_Id', pa.string())
+])
+
+PARTITIONING = ds.partitioning(pa.schema([('scrape_date', pa.date32())]), flavor='hive')
+
+# Column names used by the different CSV outputs -> archive column names
+COLUMN_ALIASES = {
+    'Artist Link': 'Artist_Link',
+    'Artist Image': 'Artist_Image',
+    'ArtistLink': 'Artist_Link',
+    'ArtistImage': 'Artist_Image'
+}
+
+
+def to_archive_table(df, scraped_at, run_id):
+    """
+    Convert an events DataFrame to an Arrow table with the archive schema.
+
+    Columns are converted whole (no per-row Python loop), except for hashing
+    the keys of events without a Songkick ID.
+
+    Args:
+        df (pandas.DataFrame): Processed events (either CSV column convention)
+        scraped_at (datetime): When the scrape ran
+        run_id (str): Identifier of the scrape run
+
+    Returns:
+        pyarrow.Table: Events in the archive schema
+    """
+    df = df.rename(columns=COLUMN_ALIASES)
+    missing = pd.Series(None, index=df.index, dtype=object)
+    arrays = []
+    for field in ARCHIVE_SCHEMA:
+        if field.name == 'Scraped_At':
+            arrays.append(pa.repeat(pa.scalar(scraped_at, type=field.type), len(df)))
+        elif field.name == 'Run_Id':
+            arrays.append(pa.repeat(pa.scalar(run_id, type=field.type), len(df)))
+        elif field.name == 'Event_Key' and 'Event_Key' not in df:
+            keys = event_keys(df.get('Artist_Link', missing), df['Artist'], df['Location'],
+                              df.get('Date', missing))
+            arrays.append(pa.array(keys, type=field.type))
+        elif field.name == 'Date':
+            dates = to_dates(df['Date']) if 'Date' in df else pd.Series(pd.NaT, index=df.index)
+            arrays.append(pa.array(dates.dt.normalize(), from_pandas=True).cast(field.type))
+        elif field.name in df:
+            values = df[field.name].astype('string')
+            arrays.append(pa.array(values, from_pandas=True).cast(field.type))
+        else:
+            arrays.append(pa.nulls(len(df), type=field.type))
+    return pa.Table.from_arrays(arrays, schema=ARCHIVE_SCHEMA)
+
+
+def partition_dir(scrape_date, history_dir=HISTORY_DIR):
+    """
+    Directory of a scrape date's partition, created if needed.
+    """
+    path = os.path.join(history_dir, f"scrape_date={scrape_date.isoformat()}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def run_path(scraped_at, history_dir=HISTORY_DIR):
+    """
+    Build the Parquet file path for a run.
+
+    The run id is the scrape time plus a random suffix, so two runs in the
+    same second get separate files.
+
+    Args:
+        scraped_at (datetime): When the scrape ran
+        history_dir (str): Root of the archive
+
+    Returns:
+        tuple: (file path, run id)
+    """
+    run_id = f"{scraped_at.strftime('%Y%m%dT%H%M%S')}-{uuid4().hex[:8]}"
+    return os.path.join(partition_dir(scraped_at.date(), history_dir), f"run-{run_id}.parquet"), run_id
+
+
+def append_run(df, history_dir=HISTORY_DIR, scraped_at=None):
+    """
+    Append one scrape's events to the archive.
+
+    Args:
+        df (pandas.DataFrame): Processed events
+        history_dir (str): Root of the archive
+        scraped_at (datetime): When the scrape ran (defaults to now)
+
+    Returns:
+        str: Path of the written Parquet file
+    """
+    scraped_at = (scraped_at or datetime.now()).replace(microsecond=0)
+    path, run_id = run_path(scraped_at, history_dir)
+    pq.write_table(to_archive_table(df, scraped_at, run_id), path)
+    return path
+
+
+def append_csv(csv_path, history_dir=HISTORY_DIR, scraped_at=None, chunksize=50000):
+    """
+    Append a CSV export to the archive in chunks.
+
+    Args:
+        csv_path (str): CSV with processed events
+        history_dir (str): Root of the archive
+        scraped_at (datetime): When the scrape ran (defaults to now)
+        chunksize (int): Rows read per chunk
+
+    Returns:
+        str: Path of the written Parquet file
+    """
+    scraped_at = (scraped_at or datetime.now()).replace(microsecond=0)
+    path, run_id = run_path(scraped_at, history_dir)
+    with pq.ParquetWriter(path, ARCHIVE_SCHEMA) as writer:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize, dtype=str):
+            writer.write_table(to_archive_table(chunk, scraped_at, run_id))
+    return path
+
+
+def open_archive(history_dir=HISTORY_DIR):
+    """
+    Open the archive as a partitioned Arrow dataset.
+
+    Args:
+        history_dir (str): Root of the archive
+
+    Returns:
+        pyarrow.dataset.Dataset: All archived runs
+    """
+    return ds.dataset(history_dir, format='parquet', partitioning=PARTITIONING, schema=ARCHIVE_SCHEMA.append(
+        pa.field('scrape_date', pa.date32())))
+
+
+def events_per_venue_per_month(history_dir=HISTORY_DIR, months=12):
+    """
+    Count distinct events per venue per month over recent scrapes.
+
+    The same concert appears in every scrape until it happens, so events are
+    counted by distinct Event_Key (the concert/festival identity).
+
+    Args:
+        history_dir (str): Root of the archive
+        months (int): How many months of scrapes to include
+
+    Returns:
+        pandas.DataFrame: Location, Month, Events sorted by month and venue
+    """
+    since = (datetime.now() - timedelta(days=months * 31)).date()
+    table = open_archive(history_dir).to_table(
+        columns=['Location', 'Date', 'Event_Key'],
+        filter=(ds.field('scrape_date') >= pa.scalar(since, pa.date32())) & ds.field('Date').is_valid()
+    )
+
+    table = pa.table({
+        'Location': table['Location'],
+        'Month': pc.strftime(table['Date'], format='%Y-%m'),
+        'Event_Key': table['Event_Key']
+    })
+    counts = table.group_by(['Location', 'Month']).aggregate([('Event_Key', 'count_distinct')])
+    counts = counts.select(['Location', 'Month', 'Event_Key_count_distinct'])
+    result = counts.rename_columns(['Location', 'Month', 'Events']).to_pandas()
+    return result.sort_values(['Month', 'Location']).reset_index(drop=True)
+
+
+def main():
+    """
+    Run archive queries from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Query the scrape history archive')
+    parser.add_argument('query', choices=['venue-months'], help='query to run')
+    parser.add_argument('--months', type=int, default=12, help='months of history to include')
+    parser.add_argument('--history-dir', default=HISTORY_DIR, help='archive directory')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.history_dir):
+        print(f"❌ No history archive found at {args.history_dir}/")
+        return
+
+    if args.query == 'venue-months':
+        result = events_per_venue_per_month(args.history_dir, args.months)
+        print(f"📈 Events per venue per month (last {args.months} months):")
+        print(result.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
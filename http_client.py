@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Client
+
+Builds the session every scraper uses for Songkick pages, artist images and
+geocoding:
+
+- keep-alive connection pools per host, sized for the number of concurrent
+  requests, so images reuse the listing page's TCP/TLS connection
+- compressed responses (gzip/deflate, plus br/zstd when the decoders are
+  installed)
+- the per-host rate limiter from rate_limiter.py, which handles 429/503 and
+  Retry-After, and retries idempotent requests on connection errors,
+  timeouts and 500/502/504 responses
+
+Retries are left to the session rather than the urllib3 adapter, so each
+one waits for the host's token bucket and backs it off; adapter-level
+retries would go out unthrottled.
+
+Usage:
+    from http_client import create_session
+
+    session = create_session({'User-Agent': '...'})
+    response = session.get(url, timeout=30)
+"""
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from rate_limiter import RateLimitedSession
+
+# Connections kept open per host; matches the largest worker pool that fetches
+POOL_SIZE = 10
+# Number of distinct hosts with cached pools (Songkick, image CDN, geocoder)
+POOL_HOSTS = 4
+
+MAX_RETRIES = 3
+
+
+def create_session(headers=None, pool_size=POOL_SIZE, max_retries=MAX_RETRIES, limiter=None):
+    """
+    Create a pooled, retrying, rate-limited session.
+
+    Args:
+        headers (dict): Default headers (e.g. User-Agent)
+        pool_size (int): Connections kept open per host
+        max_retries (int): Retries for throttling, connection errors and 5xx responses
+        limiter (RateLimiter): Per-host limiter (defaults to the shared one)
+
+    Returns:
+        RateLimitedSession: Configured session
+    """
+    session = RateLimitedSession(limiter=limiter, max_retries=max_retries)
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    if headers:
+        session.headers.update(headers)
+    return session
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Deduplicating Artist Image Store
+
+Many artist images are the same picture saved under different names: festival
+listings and artists without a photo all get Songkick's placeholder, and some
+artists share a promo shot. This store hashes every image as it is downloaded
+and collapses identical or near-identical images onto one stored file (blob):
+
+- a SHA-256 content hash catches byte-identical downloads
+- a 64-bit difference hash (dHash) catches re-encoded or resized copies,
+  compared by Hamming distance
+
+The dHash only sees brightness edges, so flat or plain-background images
+(solid colours, simple gradients) all hash to nearly 0 or nearly all ones
+whatever their colour. Those low-detail images are only collapsed when their
+bytes are identical.
+
+The first file saved for an image becomes the blob; later duplicates are not
+written, and the event's Artist_Image points at the blob instead. Content that
+is not a decodable image (e.g. an HTML error page) is rejected.
+
+The index lives in artist_images/image_index.json:
+
+    {
+        "blobs": {"<sha256>": {"path": "...", "dhash": "<16 hex>", "artists": [...]}},
+        "aliases": {"<duplicate path>": "<blob path>"}
+    }
+
+Usage:
+    python image_store.py --rebuild [--prune]
+"""
+
+import argparse
+import glob
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+from PIL import Image
+
+ARTIST_IMAGES_DIR = 'artist_images'
+INDEX_PATH = os.path.join(ARTIST_IMAGES_DIR, 'image_index.json')
+
+# Maximum dHash Hamming distance for two images to count as the same picture
+MAX_HASH_DISTANCE = 4
+
+# dHashes with fewer bits set than this (or fewer bits clear) carry too little
+# detail to tell images apart
+MIN_DETAIL_BITS = 8
+
+
+def difference_hash(image):
+    """
+    Compute a 64-bit difference hash of an image.
+
+    The image is reduced to 9x8 grayscale and each bit records whether a
+    pixel is brighter than its right-hand neighbour.
+
+    Args:
+        image (PIL.Image.Image): Image to hash
+
+    Returns:
+        int: 64-bit perceptual hash
+    """
+    pixels = image.convert('L').resize((9, 8), Image.LANCZOS).tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def hamming_distance(a, b):
+    """
+    Count the differing bits between two hashes.
+    """
+    return bin(a ^ b).count('1')
+
+
+def is_low_detail(dhash):
+    """
+    Check whether a dHash is too uniform for perceptual matching.
+    """
+    bits = bin(dhash).count('1')
+    return bits < MIN_DETAIL_BITS or bits > 64 - MIN_DETAIL_BITS
+
+
+class ImageStore:
+    """
+    Content- and perceptual-hash index over the artist image directory.
+    """
+
+    def __init__(self, index_path=INDEX_PATH, max_distance=MAX_HASH_DISTANCE):
+        self.index_path = index_path
+        self.max_distance = max_distance
+        self.blobs = {}
+        self.aliases = {}
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, 'r') as f:
+                    index = json.load(f)
+                self.blobs = index.get('blobs', {})
+                self.aliases = index.get('aliases', {})
+            except (OSError, json.JSONDecodeError):
+                pass
+        # dHash -> content hash, for the exact-match fast path
+        self.by_dhash = {int(blob['dhash'], 16): sha for sha, blob in self.blobs.items()}
+
+    def find_similar(self, dhash):
+        """
+        Find a stored blob whose dHash is within the distance threshold.
+
+        Low-detail hashes never match (see is_low_detail); such images are
+        only shared when their content hash is the same.
+
+        Returns:
+            str: Content hash of the matching blob, or None
+        """
+        if is_low_detail(dhash):
+            return None
+        if dhash in self.by_dhash:
+            return self.by_dhash[dhash]
+        best_sha, best_distance = None, self.max_distance + 1
+        for known_hash, sha in self.by_dhash.items():
+            if is_low_detail(known_hash):
+                continue
+            distance = hamming_distance(dhash, known_hash)
+            if distance < best_distance:
+                best_sha, best_distance = sha, distance
+        return best_sha
+
+    def _register(self, sha, dhash, path, artist_name):
+        self.blobs[sha] = {'path': path, 'dhash': f"{dhash:016x}", 'artists': [artist_name] if artist_name else []}
+        self.by_dhash[dhash] = sha
+
+    def _link(self, sha, path, artist_name):
+        """
+        Point a duplicate path/artist at an existing blob.
+        """
+        blob = self.blobs[sha]
+        if artist_name and artist_name not in blob['artists']:
+            blob['artists'].append(artist_name)
+        if path != blob['path']:
+            self.aliases[path] = blob['path']
+        return blob['path']
+
+    def save(self, content, artist_name, filename):
+        """
+        Store downloaded image content, collapsing duplicates.
+
+        Args:
+            content (bytes): Downloaded image bytes
+            artist_name (str): Artist the image belongs to
+            filename (str): Path the image would be saved under
+
+        Returns:
+            str: Path of the stored blob, or None if content is not an image
+        """
+        sha = hashlib.sha256(content).hexdigest()
+        if sha in self.blobs and os.path.exists(self.blobs[sha]['path']):
+            return self._link(sha, filename, artist_name)
+
+        try:
+            with Image.open(io.BytesIO(content)) as image:
+                dhash = difference_hash(image)
+        except Exception:
+            return None
+
+        similar = self.find_similar(dhash)
+        if similar and os.path.exists(self.blobs[similar]['path']):
+            return self._link(similar, filename, artist_name)
+
+        # New picture: if the target name already holds another blob, keep both
+        if os.path.exists(filename) and any(blob['path'] == filename for blob in self.blobs.values()):
+            stem, extension = os.path.splitext(filename)
+            filename = f"{stem}-{sha[:8]}{extension}"
+
+        with open(filename, 'wb') as img_file:
+            img_file.write(content)
+        self.aliases.pop(filename, None)
+        self._register(sha, dhash, filename, artist_name)
+        return filename
+
+    def add_existing(self, path):
+        """
+        Index an image already on disk.
+
+        Returns:
+            str: Path of the blob this image maps to, or None if unreadable
+        """
+        with open(path, 'rb') as f:
+            content = f.read()
+        sha = hashlib.sha256(content).hexdigest()
+        artist_name = os.path.splitext(os.path.basename(path))[0].replace('_', ' ')
+        if sha in self.blobs:
+            return self._link(sha, path, artist_name)
+
+        try:
+            with Image.open(io.BytesIO(content)) as image:
+                dhash = difference_hash(image)
+        except Exception:
+            return None
+
+        similar = self.find_similar(dhash)
+        if similar:
+            return self._link(similar, path, artist_name)
+        self._register(sha, dhash, path, artist_name)
+        return path
+
+    def resolve(self, path):
+        """
+        Map an image path to the blob it points to.
+        """
+        if not path or path != path:
+            return path
+        return self.aliases.get(path.replace('\\', '/'), path)
+
+    def save_index(self):
+        """
+        Write the index atomically.
+        """
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'blobs': self.blobs, 'aliases': self.aliases}, f, indent=1, ensure_ascii=False)
+        os.replace(temp_path, self.index_path)
+
+
+def remap_csv(csv_path, store):
+    """
+    Point a CSV's image column at deduplicated blobs.
+
+    Returns:
+        int: Number of rows changed
+    """
+    df = pd.read_csv(csv_path)
+    column = 'Artist_Image' if 'Artist_Image' in df.columns else 'Artist Image'
+    if column not in df.columns:
+        return 0
+    remapped = df[column].map(store.resolve)
+    changed = int((remapped.fillna('') != df[column].fillna('')).sum())
+    if changed:
+        df[column] = remapped
+        df.to_csv(csv_path, index=False)
+    return changed
+
+
+def remap_geojson(geojson_path, store):
+    """
+    Point a GeoJSON's ArtistImage properties at deduplicated blobs.
+
+    Returns:
+        int: Number of features changed
+    """
+    with open(geojson_path, 'r') as f:
+        geojson_data = json.load(f)
+    changed = 0
+    for feature in geojson_data['features']:
+        image = feature['properties'].get('ArtistImage')
+        resolved = store.resolve(image)
+        if resolved != image:
+            feature['properties']['ArtistImage'] = resolved
+            changed += 1
+    if changed:
+        with open(geojson_path, 'w') as f:
+            json.dump(geojson_data, f, indent=2, ensure_ascii=False)
+    return changed
+
+
+def main():
+    """
+    Rebuild the index from the existing image directory.
+    """
+    parser = argparse.ArgumentParser(description='Deduplicate artist images by content and perceptual hash')
+    parser.add_argument('--rebuild', action='store_true', help='index every image already on disk')
+    parser.add_argument('--prune', action='store_true',
+                        help='delete duplicate files after pointing the map data at their blobs')
+    parser.add_argument('--csv', default='lexington_events_time_imperial_modified.csv', help='events CSV to update')
+    parser.add_argument('--geojson', default='shp/merged_venues_events.geojson', help='GeoJSON to update')
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    store = ImageStore()
+    unreadable = []
+    for path in sorted(glob.glob(os.path.join(ARTIST_IMAGES_DIR, '*.jpg'))):
+        path = path.replace('\\', '/')
+        if store.add_existing(path) is None:
+            unreadable.append(path)
+    store.save_index()
+
+    print(f"🖼️  Indexed {len(store.blobs)} unique images, {len(store.aliases)} duplicates")
+    for alias, blob in sorted(store.aliases.items()):
+        print(f"  - {alias} -> {blob}")
+    if unreadable:
+        print(f"⚠️  {len(unreadable)} files are not decodable images:")
+        for path in unreadable:
+            print(f"  - {path}")
+
+    changed_rows = remap_csv(args.csv, store) if os.path.exists(args.csv) else 0
+    changed_features = remap_geojson(args.geojson, store) if os.path.exists(args.geojson) else 0
+    print(f"📝 Updated {changed_rows} CSV rows and {changed_features} GeoJSON features")
+
+    if args.prune:
+        removed = 0
+        for alias in store.aliases:
+            if os.path.exists(alias):
+                os.remove(alias)
+                removed += 1
+        print(f"🗑️  Removed {removed} duplicate files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Responsive Artist Image Variants
+
+Songkick images are stored at whatever size they were served, and the map
+popups download them full size. This post-download stage generates resized
+JPEG thumbnails and WebP variants for each artist image in a process pool,
+and writes a manifest the front end uses to pick the smallest suitable file:
+
+    artist_images/manifest.json
+    {
+        "widths": [80, 300],
+        "images": {
+            "artist_images/King_810.jpg": {
+                "artist": "King 810",
+                "hash": "<sha256 of the source image>",
+                "variants": {
+                    "80": {"jpg": "artist_images/variants/King_810-80.jpg",
+                           "webp": "artist_images/variants/King_810-80.webp"},
+                    ...
+                }
+            }
+        }
+    }
+
+Only images whose content hash changed since the last run are re-rendered.
+
+Usage:
+    python image_variants.py [--workers N]
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PIL import Image, ImageOps
+
+ARTIST_IMAGES_DIR = 'artist_images'
+VARIANTS_DIR = os.path.join(ARTIST_IMAGES_DIR, 'variants')
+MANIFEST_PATH = os.path.join(ARTIST_IMAGES_DIR, 'manifest.json')
+
+# Target widths: small cards in multi-event popups, and full-width popup images
+VARIANT_WIDTHS = (80, 300)
+
+SOURCE_PATTERNS = ('*.jpg', '*.jpeg', '*.png', '*.webp')
+
+
+def file_hash(path):
+    """
+    Compute the SHA-256 of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def to_web_path(path):
+    """
+    Convert an OS path to the forward-slash form used by the front end.
+    """
+    return path.replace(os.sep, '/')
+
+
+def render_variants(source_path, variants_dir=VARIANTS_DIR, widths=VARIANT_WIDTHS):
+    """
+    Render the JPEG and WebP variants of one image.
+
+    Runs in a worker process, so it only takes and returns plain values.
+
+    Args:
+        source_path (str): Path of the source image
+        variants_dir (str): Output directory for variants
+        widths (tuple): Target widths in pixels (images are never upscaled)
+
+    Returns:
+        dict: Width (str) -> {'jpg': path, 'webp': path}
+    """
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    variants = {}
+    rendered = {}
+
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        for width in widths:
+            # Widths at or above the source size all share one full-size variant
+            target_width = min(width, image.width)
+            if target_width not in rendered:
+                if target_width < image.width:
+                    height = max(1, round(image.height * target_width / image.width))
+                    resized = image.resize((target_width, height), Image.LANCZOS)
+                else:
+                    resized = image
+
+                jpg_path = os.path.join(variants_dir, f"{stem}-{target_width}.jpg")
+                webp_path = os.path.join(variants_dir, f"{stem}-{target_width}.webp")
+                resized.save(jpg_path, 'JPEG', quality=80, optimize=True, progressive=True)
+                resized.save(webp_path, 'WEBP', quality=75, method=4)
+                rendered[target_width] = {'jpg': to_web_path(jpg_path), 'webp': to_web_path(webp_path)}
+            variants[str(width)] = rendered[target_width]
+
+    return variants
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """
+    Load the variant manifest, or an empty one if missing or unreadable.
+    """
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            pass
+    return {'widths': list(VARIANT_WIDTHS), 'images': {}}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """
+    Write the variant manifest atomically.
+    """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def find_source_images(images_dir=ARTIST_IMAGES_DIR):
+    """
+    List source images directly in the images directory (not variants).
+    """
+    paths = []
+    for pattern in SOURCE_PATTERNS:
+        paths.extend(glob.glob(os.path.join(images_dir, pattern)))
+    return sorted(paths)
+
+
+def generate_variants(images_dir=ARTIST_IMAGES_DIR, variants_dir=VARIANTS_DIR,
+                      manifest_path=MANIFEST_PATH, widths=VARIANT_WIDTHS, max_workers=None):
+    """
+    Generate variants for new or changed images and update the manifest.
+
+    Args:
+        images_dir (str): Directory with downloaded artist images
+        variants_dir (str): Output directory for variants
+        manifest_path (str): Manifest file path
+        widths (tuple): Target widths in pixels
+        max_workers (int): Process pool size (defaults to CPU count)
+
+    Returns:
+        dict: Counts of rendered, unchanged, failed and removed images
+    """
+    os.makedirs(variants_dir, exist_ok=True)
+    manifest = load_manifest(manifest_path)
+    widths = tuple(widths)
+    if tuple(manifest.get('widths', ())) != widths:
+        # Different sizes requested: every image needs re-rendering
+        manifest = {'widths': list(widths), 'images': {}}
+    images = manifest['images']
+
+    stats = {'rendered': 0, 'unchanged': 0, 'failed': 0, 'removed': 0}
+    sources = {to_web_path(path): path for path in find_source_images(images_dir)}
+
+    # Drop manifest entries for images that no longer exist
+    for key in list(images):
+        if key not in sources:
+            for variant in images.pop(key).get('variants', {}).values():
+                for variant_path in variant.values():
+                    if os.path.exists(variant_path):
+                        os.remove(variant_path)  # shared variants appear twice
+            stats['removed'] += 1
+
+    # Hash every source; only changed content goes to the pool
+    pending = {}
+    for key, path in sources.items():
+        content_hash = file_hash(path)
+        entry = images.get(key)
+        if entry and entry.get('hash') == content_hash and all(
+                os.path.exists(variant['webp']) for variant in entry.get('variants', {}).values()):
+            stats['unchanged'] += 1
+            continue
+        pending[key] = (path, content_hash)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(render_variants, path, variants_dir, widths): (key, content_hash)
+                for key, (path, content_hash) in pending.items()
+            }
+            for future in as_completed(futures):
+                key, content_hash = futures[future]
+                try:
+                    variants = future.result()
+                except Exception as e:
+                    # Remember the hash so unreadable files are not retried every run
+                    logging.warning(f"Failed to render variants for {key}: {str(e)}")
+                    images[key] = {'hash': content_hash, 'variants': {}, 'error': str(e)}
+                    stats['failed'] += 1
+                    continue
+                stem = os.path.splitext(os.path.basename(key))[0]
+                images[key] = {
+                    'artist': stem.replace('_', ' '),
+                    'hash': content_hash,
+                    'variants': variants
+                }
+                stats['rendered'] += 1
+
+    save_manifest(manifest, manifest_path)
+    logging.info(f"Image variants: {stats['rendered']} rendered, {stats['unchanged']} unchanged, "
+                 f"{stats['failed']} failed, {stats['removed']} removed")
+    return stats
+
+
+def main():
+    """
+    Generate image variants from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Generate thumbnail and WebP variants of artist images')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    stats = generate_variants(max_workers=args.workers)
+    print(f"🖼️  {stats['rendered']} rendered, {stats['unchanged']} unchanged, "
+          f"{stats['failed']} failed, {stats['removed']} removed")
+    print(f"📁 Manifest written to {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Scraper Load Test Against the Local Songkick Stand-in
+
+Starts songkick_standin.py in-process and runs the real scrapers against it:
+
+    batch     LexingtonEventScraper.scrape_events (first listing page + images)
+    stream    LexingtonEventScraper's session through run_streaming_pipeline
+              (every page, images, venue join)
+    enhanced  songkick_scraper_enhanced.scrape_songkick_events
+
+For each scraper it reports total time, requests per second as seen by the
+server, the faults the server injected (429s, hung requests) and how many
+events and images made it through, so changes to concurrency, rate limiting
+and retries can be measured locally. Output files are written to a temporary
+directory.
+
+The client uses the project's rate limiter; --client-rate raises the limit
+for the stand-in host to measure the scraper itself rather than the limiter.
+
+Usage:
+    python load_test.py [--scrapers batch stream enhanced] [--client-rate 50]
+                        [--pages 3] [--events-per-page 20] [--throttle-rate 0.05]
+                        [--timeout-rate 0.02 --hang 11] [--malformed-rate 0.05]
+                        [--output load_test_report.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import songkick_scraper_enhanced
+from automated_scraper import LexingtonEventScraper
+from rate_limiter import DEFAULT_BURST, DEFAULT_LIMITER, DEFAULT_RATE
+from songkick_standin import StandinServer, add_config_arguments, config_from_args
+from streaming_pipeline import run_streaming_pipeline
+from venue_registry import GEOCODED_PATH, REGISTRY_PATH, SHAPEFILE_PATH, open_registry
+
+SCRAPERS = ('batch', 'stream', 'enhanced')
+# Scenarios run in a temporary directory, so venue files are resolved up front
+VENUE_REGISTRY = os.path.abspath(REGISTRY_PATH)
+VENUES_SHAPEFILE = os.path.abspath(SHAPEFILE_PATH)
+GEOCODED_VENUES = os.path.abspath(GEOCODED_PATH)
+
+
+def expected_images(server, pages=None):
+    """
+    Count listed events whose entry has a usable image and artist.
+    """
+    return sum(1 for page in server.pages[:pages] for event in page
+               if event['malformed'] not in ('no_image', 'no_artist'))
+
+
+def run_batch(server):
+    """
+    Scrape the first listing page with LexingtonEventScraper.
+    """
+    scraper = LexingtonEventScraper(server.metro_area_url)
+    url = scraper.build_url(*scraper.calculate_date_range(2))
+    df = scraper.scrape_events(url)
+    scraper.image_store.save_index()
+    if df is None:
+        return {'failed': True, 'events': 0, 'images': 0, 'pages': 1}
+    return {'failed': False, 'events': len(df), 'images': int(df['Artist Image'].notna().sum()), 'pages': 1}
+
+
+def run_stream(server):
+    """
+    Crawl every listing page through the streaming pipeline.
+    """
+    scraper = LexingtonEventScraper(server.metro_area_url)
+    url = scraper.build_url(*scraper.calculate_date_range(2))
+    os.makedirs('artist_images', exist_ok=True)
+    try:
+        with open_registry(VENUE_REGISTRY, VENUES_SHAPEFILE, GEOCODED_VENUES) as registry:
+            stats = run_streaming_pipeline(
+                scraper.session, url, 'stream_events.csv', 'stream_events.geojson',
+                registry=registry,
+                download_image=scraper.download_artist_image
+            )
+    except Exception as e:
+        logging.error(f"Streaming pipeline failed: {str(e)}")
+        return {'failed': True, 'events': 0, 'images': 0, 'pages': None}
+    finally:
+        scraper.image_store.save_index()
+    images = int(pd.read_csv('stream_events.csv')['Artist Image'].notna().sum()) if stats['events'] else 0
+    return {'failed': False, 'events': stats['events'], 'images': images,
+            'mapped': stats['mapped'], 'pages': None}
+
+
+def run_enhanced(server):
+    """
+    Scrape the first listing page with the enhanced scraper.
+    """
+    df = songkick_scraper_enhanced.scrape_songkick_events(server.metro_area_url)
+    if df.empty:
+        return {'failed': True, 'events': 0, 'images': 0, 'pages': 1}
+    return {'failed': False, 'events': len(df), 'images': int(df['Artist_Image'].notna().sum()), 'pages': 1}
+
+
+RUNNERS = {'batch': run_batch, 'stream': run_stream, 'enhanced': run_enhanced}
+
+
+def run_scenario(name, server, client_rate=None, verbose=False):
+    """
+    Run one scraper against the stand-in and measure it.
+
+    Args:
+        name (str): 'batch', 'stream' or 'enhanced'
+        server (StandinServer): Running stand-in
+        client_rate (float): Requests/second allowed for the stand-in host
+            (None for the project default)
+        verbose (bool): Show the scraper's own output
+
+    Returns:
+        dict: Timing, server counters and event/image totals
+    """
+    host = server.server_address[0]
+    rate = client_rate or DEFAULT_RATE
+    burst = max(DEFAULT_BURST, int(rate)) if client_rate else DEFAULT_BURST
+    # Fresh bucket, so backoff from a previous scenario doesn't carry over
+    DEFAULT_LIMITER.set_host_rate(host, rate, burst)
+    server.reset_stats()
+
+    output = None if verbose else io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+        result = RUNNERS[name](server)
+    elapsed = time.perf_counter() - started
+
+    stats = server.snapshot_stats()
+    listed, parseable = server.expected_events(result['pages'])
+    requests_served = stats.get('requests', 0)
+    return {
+        'scraper': name,
+        'seconds': round(elapsed, 3),
+        'requests': requests_served,
+        'requests_per_second': round(requests_served / elapsed, 2) if elapsed else None,
+        'listing_requests': stats.get('listing_requests', 0),
+        'image_requests': stats.get('image_requests', 0),
+        'throttled': stats.get('throttled', 0),
+        'hung': stats.get('hung', 0),
+        'client_disconnects': stats.get('client_disconnects', 0),
+        'events_listed': listed,
+        'events_expected': parseable,
+        'events_scraped': result['events'],
+        'images_expected': expected_images(server, result['pages']),
+        'images_saved': result['images'],
+        'mapped': result.get('mapped'),
+        'failed': result['failed']
+    }
+
+
+def print_report(report):
+    """
+    Print one scenario's results.
+    """
+    status = '❌ failed' if report['failed'] else '✅ completed'
+    print(f"\n🚦 {report['scraper']}: {status} in {report['seconds']:.2f}s")
+    print(f"  Requests: {report['requests']} ({report['listing_requests']} pages, "
+          f"{report['image_requests']} images), {report['requests_per_second']} req/s")
+    print(f"  Injected: {report['throttled']} throttled (429), {report['hung']} hung, "
+          f"{report['client_disconnects']} client disconnects")
+    print(f"  Events: {report['events_scraped']}/{report['events_expected']} parseable "
+          f"({report['events_listed']} listed)")
+    print(f"  Images: {report['images_saved']}/{report['images_expected']} saved")
+    if report['mapped'] is not None:
+        print(f"  Mapped: {report['mapped']}")
+
+
+def main():
+    """
+    Run the load test from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Load-test the scrapers against a local Songkick stand-in')
+    parser.add_argument('--scrapers', nargs='+', choices=SCRAPERS, default=list(SCRAPERS),
+                        help='scrapers to run')
+    parser.add_argument('--client-rate', type=float, default=None,
+                        help=f'client requests/second for the stand-in host (default {DEFAULT_RATE:g})')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--verbose', action='store_true', help="show the scrapers' own output")
+    add_config_arguments(parser)
+    parser.set_defaults(pages=3, events_per_page=20)
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    config = config_from_args(args)
+    reports = []
+    with StandinServer(config) as server, tempfile.TemporaryDirectory() as workdir:
+        print(f"🎤 Stand-in at {server.metro_area_url}")
+        print(f"⚙️  {json.dumps(config.to_dict())}")
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            for name in args.scrapers:
+                report = run_scenario(name, server, args.client_rate, args.verbose)
+                print_report(report)
+                reports.append(report)
+        finally:
+            os.chdir(cwd)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'config': config.to_dict(), 'client_rate': args.client_rate or DEFAULT_RATE,
+                       'results': reports}, f, indent=2)
+        print(f"\n📁 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
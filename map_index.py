@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Precomputed Map Index
+
+On every page load script.js used to walk all GeoJSON features to group them
+by date, then again to group them by venue coordinates, then build the
+legend's date list. Those groupings only change when the scraper runs, so the
+pipeline computes them once and writes them next to the GeoJSON:
+
+    shp/map_index.json
+    {
+        "feature_count": 15,
+        "first": {"Date": "...", "EventKey": "..."},
+        "last": {"Date": "...", "EventKey": "..."},
+        "dates": ["2025-09-01", ...],
+        "by_date": {"2025-09-01": [3, 7], ...},
+        "legend": [{"date": "2025-09-01", "count": 2}, ...],
+        "venue_groups": [
+            {"key": "-84.49,38.04", "venue": "The Burl",
+             "coordinates": [-84.49, 38.04], "features": [3, 9]}
+        ],
+        "venues": {"The Burl": [3, 9], ...}
+    }
+
+Feature lists are offsets into the GeoJSON `features` array, sorted by date.
+`feature_count`, `first` and `last` let the front end check that the index
+matches the GeoJSON it loaded, and fall back to grouping itself if not.
+
+Usage:
+    python map_index.py [geojson] [--output shp/map_index.json]
+"""
+
+import argparse
+import json
+import os
+
+GEOJSON_PATH = 'shp/merged_venues_events.geojson'
+INDEX_PATH = 'shp/map_index.json'
+
+
+def coordinate_key(coordinates):
+    """
+    Key a point by its coordinates, matching "lon,lat" as written in JS.
+    """
+    return ','.join(repr(float(value)).removesuffix('.0') for value in coordinates[:2])
+
+
+def feature_fingerprint(feature):
+    """
+    Date and event key of a feature, used to match an index to its GeoJSON.
+    """
+    properties = feature.get('properties') or {}
+    return {'Date': properties.get('Date'), 'EventKey': properties.get('EventKey')}
+
+
+def build_index(geojson_data):
+    """
+    Group features by date and venue in one pass.
+
+    Args:
+        geojson_data (dict): FeatureCollection as loaded from the GeoJSON
+
+    Returns:
+        dict: Map index (see module docstring)
+    """
+    features = geojson_data.get('features', [])
+    by_date = {}
+    groups = {}
+    venues = {}
+
+    for offset, feature in enumerate(features):
+        properties = feature.get('properties') or {}
+        date = properties.get('Date')
+        by_date.setdefault(date, []).append(offset)
+
+        geometry = feature.get('geometry') or {}
+        coordinates = geometry.get('coordinates')
+        if coordinates:
+            key = coordinate_key(coordinates)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
+                    'key': key,
+                    'venue': properties.get('Venue'),
+                    'coordinates': list(coordinates[:2]),
+                    'features': []
+                }
+            group['features'].append(offset)
+
+        venues.setdefault(properties.get('Venue'), []).append(offset)
+
+    def date_of(offset):
+        return (features[offset].get('properties') or {}).get('Date') or ''
+
+    dates = sorted(date for date in by_date if date)
+    for group in groups.values():
+        group['features'].sort(key=date_of)
+    for offsets in venues.values():
+        offsets.sort(key=date_of)
+
+    return {
+        'feature_count': len(features),
+        'first': feature_fingerprint(features[0]) if features else None,
+        'last': feature_fingerprint(features[-1]) if features else None,
+        'dates': dates,
+        'by_date': {date: by_date[date] for date in dates},
+        'legend': [{'date': date, 'count': len(by_date[date])} for date in dates],
+        'venue_groups': list(groups.values()),
+        'venues': {str(venue): offsets for venue, offsets in venues.items() if venue}
+    }
+
+
+def write_index(geojson_path=GEOJSON_PATH, index_path=INDEX_PATH):
+    """
+    Build the index for a GeoJSON file and write it atomically.
+
+    Returns:
+        dict: The index that was written
+    """
+    with open(geojson_path, 'r', encoding='utf-8') as f:
+        geojson_data = json.load(f)
+    index = build_index(geojson_data)
+
+    temp_path = index_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_path, index_path)
+    return index
+
+
+def main():
+    """
+    Rebuild the map index from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Precompute date and venue groupings for the map')
+    parser.add_argument('geojson', nargs='?', default=GEOJSON_PATH, help='map GeoJSON')
+    parser.add_argument('--output', default=INDEX_PATH, help='index path')
+    args = parser.parse_args()
+
+    index = write_index(args.geojson, args.output)
+    print(f"🗂️  Indexed {index['feature_count']} features: {len(index['dates'])} dates, "
+          f"{len(index['venue_groups'])} venue groups")
+    print(f"📁 Index written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
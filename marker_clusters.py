@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Precomputed Zoom-Level Marker Clusters
+
+script.js used to put one marker per venue on the map at every zoom level,
+so with several metros and a long horizon the browser was placing thousands
+of markers at once. The pipeline now clusters venue points for each zoom
+level (a supercluster-style greedy grid clustering in Web Mercator pixel
+space) and writes one small file per zoom:
+
+    shp/clusters/index.json
+    {
+        "feature_count": 15, "first": {...}, "last": {...},
+        "min_zoom": 5, "max_zoom": 17, "radius": 40,
+        "levels": {"5": "shp/clusters/z5.json", ...}
+    }
+
+    shp/clusters/z12.json
+    {
+        "zoom": 12,
+        "venues": ["-84.49,38.04", ...],
+        "clusters": [[lon, lat, events, venues, expansion_zoom], ...]
+    }
+
+`venues` are venue group keys from map_index.json that stand alone at that
+zoom (the front end draws its usual venue marker for them); `clusters` are
+groups of nearby venues drawn as one count badge, which zoom to
+`expansion_zoom` (the first zoom where they split) when clicked. Each level
+is built from the one above it, so clusters nest across zoom levels. Above
+max_zoom every venue is drawn on its own.
+
+`feature_count`, `first` and `last` match map_index.json, so the front end can
+check that the clusters were built from the GeoJSON it loaded.
+
+Usage:
+    python marker_clusters.py [geojson] [--output-dir shp/clusters]
+                              [--min-zoom 5] [--max-zoom 17] [--radius 40]
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+
+from map_index import GEOJSON_PATH, build_index
+
+CLUSTER_DIR = 'shp/clusters'
+CLUSTER_INDEX_NAME = 'index.json'
+
+MIN_ZOOM = 5
+MAX_ZOOM = 17
+
+# Venues closer than this many screen pixels are merged at a zoom level
+RADIUS_PX = 40
+TILE_SIZE = 256
+
+COORDINATE_PRECISION = 6
+
+
+def project(lon, lat):
+    """
+    Project a point to Web Mercator world coordinates in [0, 1].
+    """
+    sin_lat = math.sin(math.radians(max(min(lat, 85.05112878), -85.05112878)))
+    x = lon / 360 + 0.5
+    y = 0.5 - 0.25 * math.log((1 + sin_lat) / (1 - sin_lat)) / math.pi
+    return x, y
+
+
+def unproject(x, y):
+    """
+    Inverse of project: world coordinates back to (lon, lat).
+    """
+    lon = (x - 0.5) * 360
+    lat = math.degrees(2 * math.atan(math.exp((0.5 - y) * 2 * math.pi)) - math.pi / 2)
+    return lon, lat
+
+
+def venue_points(index):
+    """
+    Turn map index venue groups into points to cluster.
+
+    Only events with a date are counted, matching the markers the front end
+    draws.
+
+    Args:
+        index (dict): Map index (see map_index.build_index)
+
+    Returns:
+        list: Points as dicts with key, x, y, events
+    """
+    dated = set()
+    for offsets in index['by_date'].values():
+        dated.update(offsets)
+
+    points = []
+    for group in index['venue_groups']:
+        events = sum(1 for offset in group['features'] if offset in dated)
+        if events:
+            x, y = project(*group['coordinates'])
+            points.append({'key': group['key'], 'x': x, 'y': y, 'events': events, 'venues': 1})
+    return points
+
+
+def cluster_level(items, zoom, radius=RADIUS_PX):
+    """
+    Greedily merge items within `radius` pixels of each other at a zoom.
+
+    Items are visited from the most events down, so the busiest venue of a
+    neighbourhood anchors its cluster. A grid with cells one radius wide
+    limits each neighbour search to the 3x3 cells around an item.
+
+    Args:
+        items (list): Points or clusters from the zoom level above
+        zoom (int): Zoom level being built
+        radius (int): Cluster radius in screen pixels
+
+    Returns:
+        list: Items at this zoom; merged ones are new clusters with an
+        expansion_zoom of zoom + 1
+    """
+    cell_size = radius / (TILE_SIZE * 2 ** zoom)
+    grid = {}
+    for position, item in enumerate(items):
+        cell = (int(item['x'] // cell_size), int(item['y'] // cell_size))
+        grid.setdefault(cell, []).append(position)
+
+    order = sorted(range(len(items)), key=lambda position: (-items[position]['events'],
+                                                            items[position]['x'], items[position]['y']))
+    merged = [False] * len(items)
+    level = []
+    for position in order:
+        if merged[position]:
+            continue
+        merged[position] = True
+        item = items[position]
+        cell_x, cell_y = int(item['x'] // cell_size), int(item['y'] // cell_size)
+
+        neighbours = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other in grid.get((cell_x + dx, cell_y + dy), ()):
+                    if merged[other]:
+                        continue
+                    candidate = items[other]
+                    if math.hypot(candidate['x'] - item['x'], candidate['y'] - item['y']) <= cell_size:
+                        neighbours.append(other)
+
+        if not neighbours:
+            level.append(item)
+            continue
+
+        members = [item] + [items[other] for other in neighbours]
+        for other in neighbours:
+            merged[other] = True
+        events = sum(member['events'] for member in members)
+        level.append({
+            'key': None,
+            # Event-weighted centre, so the badge sits near the busiest venues
+            'x': sum(member['x'] * member['events'] for member in members) / events,
+            'y': sum(member['y'] * member['events'] for member in members) / events,
+            'events': events,
+            'venues': sum(member['venues'] for member in members),
+            'expansion_zoom': zoom + 1
+        })
+    return level
+
+
+def build_clusters(index, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM, radius=RADIUS_PX):
+    """
+    Cluster venue points for every zoom level.
+
+    Args:
+        index (dict): Map index (see map_index.build_index)
+        min_zoom (int): Lowest zoom level
+        max_zoom (int): Highest zoom level (every venue is separate above it)
+        radius (int): Cluster radius in screen pixels
+
+    Returns:
+        dict: Zoom -> level (see module docstring)
+    """
+    levels = {}
+    items = venue_points(index)
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+        items = cluster_level(items, zoom, radius)
+        venues = []
+        clusters = []
+        for item in items:
+            if item['key'] is not None:
+                venues.append(item['key'])
+                continue
+            lon, lat = unproject(item['x'], item['y'])
+            clusters.append([round(lon, COORDINATE_PRECISION), round(lat, COORDINATE_PRECISION),
+                             item['events'], item['venues'], item['expansion_zoom']])
+        levels[zoom] = {'zoom': zoom, 'venues': sorted(venues), 'clusters': clusters}
+    return levels
+
+
+def _write_json(path, data):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+
+def write_clusters(geojson_path=GEOJSON_PATH, cluster_dir=CLUSTER_DIR, index=None,
+                   min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM, radius=RADIUS_PX):
+    """
+    Build per-zoom cluster files for a GeoJSON file and write them atomically.
+
+    Args:
+        geojson_path (str): Map GeoJSON (read only if no index is given)
+        cluster_dir (str): Directory for the cluster files
+        index (dict): Map index already built for the GeoJSON
+        min_zoom (int): Lowest zoom level
+        max_zoom (int): Highest zoom level
+        radius (int): Cluster radius in screen pixels
+
+    Returns:
+        dict: The cluster index that was written
+    """
+    if index is None:
+        with open(geojson_path, 'r', encoding='utf-8') as f:
+            index = build_index(json.load(f))
+
+    os.makedirs(cluster_dir, exist_ok=True)
+    levels = build_clusters(index, min_zoom, max_zoom, radius)
+    paths = {}
+    for zoom, level in levels.items():
+        path = os.path.join(cluster_dir, f"z{zoom}.json")
+        _write_json(path, level)
+        paths[str(zoom)] = path.replace(os.sep, '/')
+
+    # Levels outside the new zoom range would otherwise linger
+    for path in glob.glob(os.path.join(cluster_dir, 'z*.json')):
+        if path.replace(os.sep, '/') not in paths.values():
+            os.remove(path)
+
+    cluster_index = {
+        'feature_count': index['feature_count'],
+        'first': index['first'],
+        'last': index['last'],
+        'min_zoom': min_zoom,
+        'max_zoom': max_zoom,
+        'radius': radius,
+        'levels': {zoom: paths[zoom] for zoom in sorted(paths, key=int)}
+    }
+    _write_json(os.path.join(cluster_dir, CLUSTER_INDEX_NAME), cluster_index)
+    return cluster_index
+
+
+def main():
+    """
+    Rebuild the cluster files from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Precompute zoom-level marker clusters for the map')
+    parser.add_argument('geojson', nargs='?', default=GEOJSON_PATH, help='map GeoJSON')
+    parser.add_argument('--output-dir', default=CLUSTER_DIR, help='directory for the cluster files')
+    parser.add_argument('--min-zoom', type=int, default=MIN_ZOOM, help='lowest zoom level')
+    parser.add_argument('--max-zoom', type=int, default=MAX_ZOOM, help='highest zoom level')
+    parser.add_argument('--radius', type=int, default=RADIUS_PX, help='cluster radius in pixels')
+    args = parser.parse_args()
+
+    cluster_index = write_clusters(args.geojson, args.output_dir, min_zoom=args.min_zoom,
+                                   max_zoom=args.max_zoom, radius=args.radius)
+    print(f"🔵 Clustered {cluster_index['feature_count']} features for zoom "
+          f"{cluster_index['min_zoom']}-{cluster_index['max_zoom']}")
+    for zoom, path in cluster_index['levels'].items():
+        with open(path, 'r', encoding='utf-8') as f:
+            level = json.load(f)
+        print(f"  z{zoom}: {len(level['venues'])} venues, {len(level['clusters'])} clusters")
+    print(f"📁 Cluster files written to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
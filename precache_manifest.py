@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Service Worker Precache Manifest
+
+sw.js used to cache a hand-maintained file list under a hand-bumped cache
+name, so after a scrape clients either kept stale map data or threw the whole
+cache away. This module writes a manifest with a content hash (revision) for
+every asset the map needs; the service worker compares it with the manifest
+it cached last time and only re-fetches entries whose revision changed.
+
+    precache-manifest.json
+    {
+        "version": "<hash of all revisions>",
+        "generated_at": "2025-09-01T06:00:00",
+        "entries": [
+            {"url": "./script.js", "revision": "<first 16 hex of sha256>"},
+            ...
+        ]
+    }
+
+Precached assets are the app shell (HTML/CSS/JS/fonts), the map index, time
+index and marker cluster files, the image variant manifest and the images of
+the events currently on the map.
+The map GeoJSON is left out: the page caches it itself and updates it from
+small deltas (see snapshot_deltas.py).
+
+Usage:
+    python precache_manifest.py
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from image_variants import MANIFEST_PATH as IMAGE_MANIFEST_PATH
+from image_variants import file_hash, load_manifest
+
+MANIFEST_FILE = 'precache-manifest.json'
+GEOJSON_PATH = 'shp/merged_venues_events.geojson'
+MAP_INDEX_PATH = 'shp/map_index.json'
+CLUSTER_PATTERN = 'shp/clusters/*.json'
+TIME_INDEX_PATH = 'shp/time_index.json'
+SEARCH_INDEX_PATH = 'shp/search_index.json'
+
+# App shell files, relative to the site root
+SHELL_FILES = (
+    'index.html',
+    'styles.css',
+    'script.js',
+    'cassander_birthday.jpg',
+)
+SHELL_PATTERNS = ('fonts/*.ttf',)
+
+REVISION_LENGTH = 16
+
+
+def revision(path):
+    """
+    Content revision of a file: a truncated SHA-256 of its bytes.
+    """
+    return file_hash(path)[:REVISION_LENGTH]
+
+
+def event_image_paths(geojson_path=GEOJSON_PATH, image_manifest_path=IMAGE_MANIFEST_PATH):
+    """
+    List the image files the map shows for the current events.
+
+    Images with variants contribute their variant files (the front end never
+    loads the original); images without variants contribute the original.
+
+    Returns:
+        list: Image paths relative to the site root
+    """
+    if not os.path.exists(geojson_path):
+        return []
+    with open(geojson_path, 'r') as f:
+        geojson_data = json.load(f)
+    images = load_manifest(image_manifest_path)['images']
+
+    paths = set()
+    for feature in geojson_data['features']:
+        image = feature['properties'].get('ArtistImage')
+        if not image:
+            continue
+        image = image.replace('\\', '/')
+        variants = images.get(image, {}).get('variants')
+        if variants:
+            for variant in variants.values():
+                paths.update(variant.values())
+        else:
+            paths.add(image)
+    return sorted(path for path in paths if os.path.exists(path))
+
+
+def build_manifest(geojson_path=GEOJSON_PATH, image_manifest_path=IMAGE_MANIFEST_PATH):
+    """
+    Hash every precached asset.
+
+    Returns:
+        dict: Manifest with a `version` and one entry per asset
+    """
+    paths = [path for path in SHELL_FILES if os.path.exists(path)]
+    for pattern in SHELL_PATTERNS:
+        paths.extend(sorted(path.replace(os.sep, '/') for path in glob.glob(pattern)))
+    # The GeoJSON itself is not precached: the page keeps its own copy and
+    # patches it with deltas (snapshot_deltas.py)
+    for path in (MAP_INDEX_PATH, TIME_INDEX_PATH, SEARCH_INDEX_PATH, image_manifest_path):
+        if os.path.exists(path):
+            paths.append(path)
+    paths.extend(sorted(path.replace(os.sep, '/') for path in glob.glob(CLUSTER_PATTERN)))
+    paths.extend(event_image_paths(geojson_path, image_manifest_path))
+
+    entries = [{'url': f"./{path}", 'revision': revision(path)} for path in dict.fromkeys(paths)]
+    if os.path.exists('index.html'):
+        # The site root serves index.html
+        entries.insert(0, {'url': './', 'revision': revision('index.html')})
+
+    version = hashlib.sha256(
+        '\n'.join(f"{entry['url']} {entry['revision']}" for entry in entries).encode('utf-8')
+    ).hexdigest()[:REVISION_LENGTH]
+
+    return {
+        'version': version,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'entries': entries
+    }
+
+
+def write_manifest(path=MANIFEST_FILE, geojson_path=GEOJSON_PATH, image_manifest_path=IMAGE_MANIFEST_PATH):
+    """
+    Build the precache manifest and write it atomically.
+
+    Returns:
+        dict: The manifest that was written
+    """
+    manifest = build_manifest(geojson_path, image_manifest_path)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
+    os.replace(temp_path, path)
+    return manifest
+
+
+def main():
+    """
+    Regenerate the precache manifest from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Write the service worker precache manifest')
+    parser.add_argument('--output', default=MANIFEST_FILE, help='manifest path')
+    parser.add_argument('--geojson', default=GEOJSON_PATH, help='map GeoJSON')
+    args = parser.parse_args()
+
+    manifest = write_manifest(args.output, args.geojson)
+    print(f"📦 {len(manifest['entries'])} precache entries, version {manifest['version']}")
+    print(f"📁 Manifest written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
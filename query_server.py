@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Local Read-Only Events Query Server
+
+The map can only fetch the whole static GeoJSON, and internal tools re-read
+the CSVs from disk for every question. This serves the map's events from
+memory instead, filtered by date, venue and bounding box:
+
+    GET /events?start=2025-11-21&end=2025-12-01     start inclusive, end exclusive
+    GET /events?window=weekend                      tonight, weekend or <N>d
+    GET /events?venue=The+Burl&venue=Al's+Bar       any of the venues
+    GET /events?bbox=-84.52,38.04,-84.49,38.06      min_lon,min_lat,max_lon,max_lat
+    GET /venues                                     venues with points and event counts
+    GET /status                                     data version and counts
+
+Filters combine (all must match) and /events returns a FeatureCollection in
+the GeoJSON's own order, so the map can request only what is visible.
+
+At startup the GeoJSON is loaded into three indexes: a TimeIndex (time_index.py)
+for dates, a dict of feature offsets per normalized venue name, and the
+distinct venue points sorted by longitude, bisected for the bbox's
+longitude range. The file is polled and the indexes are rebuilt and swapped
+in when a scrape rewrites it; a half-written file fails to parse and the
+previous data keeps being served until the next poll.
+
+Responses carry an ETag of the data version and the resolved query (with a
+-gzip suffix for the compressed body), so a client revalidating with
+If-None-Match gets 304 Not Modified until the data changes, and are gzipped
+for clients that accept it.
+
+Usage:
+    python query_server.py [geojson] [--host 127.0.0.1] [--port 8780]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from dedup import normalize_text
+from map_index import GEOJSON_PATH
+from time_index import TimeIndex, to_epoch, window_bounds
+from venue_registry import file_signature
+
+# Seconds between checks of the GeoJSON for changes
+RELOAD_INTERVAL = 2.0
+
+# Smaller bodies are sent uncompressed
+GZIP_MIN_BYTES = 1024
+
+# Encoded responses kept per data version
+RESPONSE_CACHE_SIZE = 128
+
+
+class EventStore:
+    """
+    The map's events with date, venue and bounding-box indexes.
+    """
+
+    def __init__(self, geojson_data, version):
+        """
+        Args:
+            geojson_data (dict): FeatureCollection as loaded from the GeoJSON
+            version (str): Content hash of the file it was loaded from
+        """
+        self.collection = {key: value for key, value in geojson_data.items() if key != 'features'}
+        self.features = geojson_data.get('features', [])
+        self.version = version
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+        self.time_index = TimeIndex.from_features(self.features)
+
+        self.venues = {}
+        points = {}
+        for offset, feature in enumerate(self.features):
+            properties = feature.get('properties') or {}
+            name = properties.get('Venue') or properties.get('Location')
+            key = normalize_text(name)
+            if key:
+                venue = self.venues.setdefault(key, {'name': name, 'features': []})
+                venue['features'].append(offset)
+            coordinates = (feature.get('geometry') or {}).get('coordinates')
+            if coordinates:
+                points.setdefault((coordinates[0], coordinates[1]), []).append(offset)
+
+        self.points = sorted(points.items())
+        self.point_lons = [lon for (lon, _), _ in self.points]
+
+    @classmethod
+    def load(cls, path=GEOJSON_PATH):
+        """
+        Load the store from a GeoJSON file.
+
+        Raises:
+            ValueError: If the file is not valid JSON (e.g. half-written)
+        """
+        with open(path, 'rb') as f:
+            content = f.read()
+        return cls(json.loads(content), hashlib.sha256(content).hexdigest())
+
+    def in_bbox(self, min_lon, min_lat, max_lon, max_lat):
+        """
+        Offsets of the features whose point lies in the box.
+        """
+        first = bisect_left(self.point_lons, min_lon)
+        last = bisect_right(self.point_lons, max_lon, first)
+        offsets = set()
+        for (_, lat), point_offsets in self.points[first:last]:
+            if min_lat <= lat <= max_lat:
+                offsets.update(point_offsets)
+        return offsets
+
+    def at_venues(self, names):
+        """
+        Offsets of the features at any of the named venues.
+        """
+        offsets = set()
+        for name in names:
+            venue = self.venues.get(normalize_text(name))
+            if venue:
+                offsets.update(venue['features'])
+        return offsets
+
+    def query(self, start=None, end=None, venues=None, bbox=None):
+        """
+        Offsets of the features matching every given filter, in file order.
+
+        Args:
+            start: Epoch seconds of the earliest start time (None for open)
+            end: Epoch seconds, exclusive (None for open)
+            venues: Venue names, any of which matches
+            bbox: (min_lon, min_lat, max_lon, max_lat)
+
+        Returns:
+            list: Feature offsets
+        """
+        selected = None
+        if start is not None or end is not None:
+            selected = set(self.time_index.positions(start, end))
+        if venues:
+            matches = self.at_venues(venues)
+            selected = matches if selected is None else selected & matches
+        if bbox:
+            matches = self.in_bbox(*bbox)
+            selected = matches if selected is None else selected & matches
+        return list(range(len(self.features))) if selected is None else sorted(selected)
+
+    def feature_collection(self, offsets):
+        """
+        FeatureCollection of the given features, keeping the file's name and CRS.
+        """
+        return dict(self.collection, features=[self.features[offset] for offset in offsets])
+
+    def venue_list(self):
+        """
+        Venues with their point and number of events, by name.
+        """
+        venues = []
+        for venue in self.venues.values():
+            geometry = self.features[venue['features'][0]].get('geometry') or {}
+            venues.append({'name': venue['name'], 'coordinates': geometry.get('coordinates'),
+                           'events': len(venue['features'])})
+        return sorted(venues, key=lambda venue: normalize_text(venue['name']))
+
+    def status(self):
+        return {
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'features': len(self.features),
+            'dated': len(self.time_index),
+            'venues': len(self.venues),
+            'first_date': self.time_index.first_date(),
+            'last_date': self.time_index.last_date()
+        }
+
+
+def parse_event_query(query):
+    """
+    Resolve /events query parameters into EventStore.query arguments.
+
+    Named windows are resolved to epoch bounds here, so the same request on
+    another day is a different query (and ETag).
+
+    Args:
+        query (dict): Parsed query string (parse_qs)
+
+    Returns:
+        dict: start, end, venues and bbox
+
+    Raises:
+        ValueError: On malformed dates, windows or boxes
+    """
+    start = end = None
+    if 'window' in query:
+        start, end = window_bounds(query['window'][0])
+    for name in ('start', 'end'):
+        if name not in query:
+            continue
+        try:
+            epoch = to_epoch(query[name][0])
+        except ValueError:
+            raise ValueError(f"{name} must be YYYY-MM-DD, got {query[name][0]!r}")
+        if name == 'start':
+            start = epoch if start is None else max(start, epoch)
+        else:
+            end = epoch if end is None else min(end, epoch)
+
+    bbox = None
+    if 'bbox' in query:
+        try:
+            bbox = tuple(float(value) for value in query['bbox'][0].split(','))
+        except ValueError:
+            bbox = ()
+        if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+            raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+
+    venues = sorted(set(query.get('venue', [])), key=normalize_text) or None
+    return {'start': start, 'end': end, 'venues': venues, 'bbox': bbox}
+
+
+class QueryServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding the current EventStore.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, geojson_path=GEOJSON_PATH, host='127.0.0.1', port=0, reload_interval=RELOAD_INTERVAL):
+        super().__init__((host, port), QueryHandler)
+        self.geojson_path = geojson_path
+        self.reload_interval = reload_interval
+        self.lock = threading.Lock()
+        self.responses = OrderedDict()
+        self.signature = file_signature(geojson_path)
+        self.store = EventStore.load(geojson_path)
+        self.stopping = threading.Event()
+        self.threads = []
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reload_if_changed(self):
+        """
+        Rebuild the store if the GeoJSON changed since it was loaded.
+
+        The new store is built before it replaces the old one, so requests
+        never see a partly built index.
+
+        Returns:
+            bool: True if new data was loaded
+        """
+        try:
+            signature = file_signature(self.geojson_path)
+        except OSError:
+            return False
+        if signature == self.signature:
+            return False
+        try:
+            store = EventStore.load(self.geojson_path)
+        except (OSError, ValueError):
+            # Being rewritten; keep serving the old data and retry next poll
+            return False
+        with self.lock:
+            self.signature = signature
+            changed = store.version != self.store.version
+            self.store = store
+            self.responses.clear()
+        return changed
+
+    def watch(self):
+        while not self.stopping.wait(self.reload_interval):
+            if self.reload_if_changed():
+                print(f"🔄 Reloaded {len(self.store.features)} events (version {self.store.version[:12]})")
+
+    def cached_response(self, key, build):
+        """
+        Body of a response, built once per data version and query.
+
+        Args:
+            key: Resolved query
+            build (callable): Returns the JSON-serializable response
+
+        Returns:
+            tuple: (ETag, body, gzipped body or None)
+        """
+        store = self.store
+        key = (store.version, key)
+        with self.lock:
+            if key in self.responses:
+                self.responses.move_to_end(key)
+                return self.responses[key]
+
+        body = json.dumps(build(store), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(json.dumps(key, default=str).encode('utf-8')).hexdigest()
+        compressed = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None
+        response = (f'"{digest[:32]}"', body, compressed)
+        with self.lock:
+            if store is self.store:
+                self.responses[key] = response
+                while len(self.responses) > RESPONSE_CACHE_SIZE:
+                    self.responses.popitem(last=False)
+        return response
+
+    def start(self):
+        """
+        Serve and watch for new data in background threads.
+        """
+        self.threads = [threading.Thread(target=self.serve_forever, daemon=True),
+                        threading.Thread(target=self.watch, daemon=True)]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    Serves /events, /venues and /status from the server's EventStore.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    head_only = False
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+
+        if parts.path == '/events':
+            try:
+                filters = parse_event_query(query)
+            except ValueError as e:
+                self.send_json_error(400, str(e))
+                return
+            key = ('events', tuple(sorted((name, str(value)) for name, value in filters.items())))
+            response = self.server.cached_response(
+                key, lambda store: store.feature_collection(store.query(**filters)))
+            self.send_cached(response, 'application/geo+json')
+        elif parts.path == '/venues':
+            self.send_cached(self.server.cached_response(('venues',), EventStore.venue_list), 'application/json')
+        elif parts.path == '/status':
+            body = json.dumps(self.server.store.status()).encode('utf-8')
+            self.send_body(200, body, 'application/json', {'Cache-Control': 'no-store'})
+        else:
+            self.send_json_error(404, f"Unknown path {parts.path}; use /events, /venues or /status")
+
+    def do_HEAD(self):
+        self.head_only = True
+        try:
+            self.do_GET()
+        finally:
+            self.head_only = False
+
+    def send_cached(self, response, content_type):
+        etag, body, compressed = response
+        headers = {'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        if compressed is not None and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            # Each encoding of a response is a different representation, with its own strong ETag
+            etag = etag[:-1] + '-gzip"'
+            headers['Content-Encoding'] = 'gzip'
+            body = compressed
+        headers['ETag'] = etag
+        matches = [tag.strip().removeprefix('W/') for tag in self.headers.get('If-None-Match', '').split(',')]
+        if etag in matches:
+            headers.pop('Content-Encoding', None)
+            self.send_body(304, b'', None, headers)
+            return
+        self.send_body(200, body, content_type, headers)
+
+    def send_json_error(self, status, message):
+        self.send_body(status, json.dumps({'error': message}).encode('utf-8'), 'application/json')
+
+    def send_body(self, status, body, content_type, headers=None):
+        try:
+            self.send_response(status)
+            if content_type:
+                self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            # Readable from the map when it is served from another local port
+            self.send_header('Access-Control-Allow-Origin', '*')
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            if not self.head_only:
+                self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def main():
+    """
+    Run the query server in the foreground.
+    """
+    parser = argparse.ArgumentParser(description='Serve filtered map events from memory')
+    parser.add_argument('geojson', nargs='?', default=GEOJSON_PATH, help='map GeoJSON')
+    parser.add_argument('--host', default='127.0.0.1', help='address to bind')
+    parser.add_argument('--port', type=int, default=8780, help='port to listen on')
+    parser.add_argument('--reload-interval', type=float, default=RELOAD_INTERVAL,
+                        help='seconds between checks for new data')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.geojson):
+        print(f"❌ {args.geojson} not found; run the scraper first")
+        return
+
+    server = QueryServer(args.geojson, args.host, args.port, args.reload_interval)
+    status = server.store.status()
+    print(f"🗺️  Serving {status['features']} events at {status['venues']} venues "
+          f"({status['first_date']} to {status['last_date']})")
+    print(f"🔗 {server.base_url}/events?window=14d")
+    server.start()
+    try:
+        while server.threads[0].is_alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopped")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
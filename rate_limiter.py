@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Per-Host Rate Limiting for HTTP Requests
+
+Every HTTP caller in the project (Songkick listing pages, artist images and
+the Nominatim geocoder) goes through one shared limiter, instead of sleeping
+a fixed time after each request:
+
+- each host has a token bucket; requests wait only as long as needed to stay
+  within the host's rate, so throughput runs close to the allowed rate
+- 429 and 503 responses block the host for the `Retry-After` time (or a
+  jittered exponential backoff when the header is missing) and the request
+  is retried
+- idempotent requests (GET/HEAD/OPTIONS) are also retried after connection
+  errors, timeouts and 500/502/504 responses, with the same backoff; every
+  retry waits for a token like any other request
+- the rate backs off multiplicatively on throttling and errors and recovers
+  additively on success (AIMD), so a struggling host is given room
+
+Buckets are guarded by locks, so one limiter can be shared across threads.
+
+Usage:
+    from rate_limiter import RateLimitedSession
+
+    session = RateLimitedSession()
+    response = session.get(url, timeout=30)
+"""
+
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+# Requests per second and burst size for hosts without their own entry
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 2
+
+# Host-specific (rate, burst); Nominatim's usage policy allows 1 request/second
+HOST_RATES = {
+    'nominatim.openstreetmap.org': (1.0, 1),
+}
+
+# Responses that mean "slow down" and are retried after the host's backoff
+THROTTLE_STATUSES = (429, 503)
+
+# Server errors and methods that are safe to send again
+RETRY_STATUSES = (500, 502, 504)
+RETRY_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+# Adaptive rate: halve on throttling/errors, recover 10% of the base per success
+BACKOFF_FACTOR = 0.5
+RECOVERY_FRACTION = 0.1
+MIN_RATE_FRACTION = 0.05
+
+# Backoff when a throttling response has no Retry-After header
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 300.0
+
+
+def parse_retry_after(value, now=None):
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value (str): Delay in seconds, or an HTTP date
+        now (datetime): Reference time for HTTP dates (defaults to now)
+
+    Returns:
+        float: Seconds to wait, or None if the value is missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with an adaptive rate and a blocking window.
+    """
+
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.consecutive_failures = 0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """
+        Wait until a request may be sent and take a token.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def record_success(self):
+        """
+        Recover the rate additively after a successful request.
+        """
+        with self.lock:
+            self.consecutive_failures = 0
+            self.rate = min(self.base_rate, self.rate + self.base_rate * RECOVERY_FRACTION)
+
+    def record_failure(self, retry_after=None):
+        """
+        Back off after throttling or an error.
+
+        Without a server-requested delay the backoff uses "full jitter": a
+        random time between zero and the exponential backoff, so clients that
+        failed together don't retry together.
+
+        Args:
+            retry_after (float): Server-requested delay in seconds, if any
+
+        Returns:
+            float: Seconds the host is now blocked for
+        """
+        with self.lock:
+            self.consecutive_failures += 1
+            self.rate = max(self.base_rate * MIN_RATE_FRACTION, self.rate * BACKOFF_FACTOR)
+            if retry_after is None:
+                retry_after = random.uniform(0, BASE_BACKOFF * 2 ** (self.consecutive_failures - 1))
+            delay = min(retry_after, MAX_BACKOFF)
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + delay)
+            # Don't let a burst of saved-up tokens fire as soon as the block lifts
+            self.tokens = min(self.tokens, 1.0)
+            return delay
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by host.
+    """
+
+    def __init__(self, default_rate=DEFAULT_RATE, default_burst=DEFAULT_BURST, host_rates=None):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.host_rates = dict(HOST_RATES if host_rates is None else host_rates)
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def set_host_rate(self, host, rate, burst):
+        """
+        Set a host's rate and burst, replacing its current (adapted) bucket.
+        """
+        with self.lock:
+            self.host_rates[host] = (rate, burst)
+            self.buckets.pop(host, None)
+
+    def bucket(self, url):
+        """
+        Return the bucket for a URL's host, creating it on first use.
+        """
+        host = urlsplit(url).hostname or ''
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                rate, burst = self.host_rates.get(host, (self.default_rate, self.default_burst))
+                bucket = self.buckets[host] = TokenBucket(rate, burst)
+            return bucket
+
+    def acquire(self, url):
+        """
+        Wait for permission to request a URL.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        return self.bucket(url).acquire()
+
+    def record_response(self, url, response):
+        """
+        Adapt the host's rate to a response.
+
+        Returns:
+            float: Backoff delay applied, or 0.0 if the response was fine
+        """
+        bucket = self.bucket(url)
+        if response.status_code in THROTTLE_STATUSES:
+            return bucket.record_failure(parse_retry_after(response.headers.get('Retry-After')))
+        if response.status_code >= 500:
+            return bucket.record_failure()
+        bucket.record_success()
+        return 0.0
+
+    def record_error(self, url):
+        """
+        Back off after a connection error or timeout.
+        """
+        return self.bucket(url).record_failure()
+
+
+# Shared by every session in the process, so all callers respect the same limits
+DEFAULT_LIMITER = RateLimiter()
+
+
+class RateLimitedSession(requests.Session):
+    """
+    requests.Session that waits for the host's rate limit before every
+    request and retries throttled (429/503) responses after backing off.
+    Idempotent requests are also retried on connection errors, timeouts and
+    RETRY_STATUSES.
+    """
+
+    def __init__(self, limiter=None, max_retries=3):
+        super().__init__()
+        self.limiter = limiter or DEFAULT_LIMITER
+        self.max_retries = max_retries
+
+    def request(self, method, url, *args, **kwargs):
+        idempotent = method.upper() in RETRY_METHODS
+        retry_statuses = THROTTLE_STATUSES + RETRY_STATUSES if idempotent else THROTTLE_STATUSES
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(url)
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                delay = self.limiter.record_error(url)
+                if not idempotent or attempt == self.max_retries:
+                    raise
+                logging.info(f"{type(e).__name__} from {urlsplit(url).hostname}; "
+                             f"retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                continue
+
+            delay = self.limiter.record_response(url, response)
+            if response.status_code not in retry_statuses or attempt == self.max_retries:
+                return response
+
+            logging.info(f"{response.status_code} from {urlsplit(url).hostname}; "
+                         f"retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+            response.close()
+        return response
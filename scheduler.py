@@ -22,30 +22,40 @@ logging.basicConfig(
     ]
 )
 
+# A run that times out is retried this many times; each retry resumes from
+# the scraper's checkpoint instead of starting over
+MAX_RESUME_ATTEMPTS = 2
+
 def run_scraper():
     """
     Run the automated scraper
     """
-    try:
-        logging.info("Starting scheduled scraper run...")
-        
-        # Run the scraper script
-        result = subprocess.run([sys.executable, 'automated_scraper.py'], 
-                              capture_output=True, text=True, timeout=300)
-        
-        if result.returncode == 0:
-            logging.info("Scheduled scraper run completed successfully")
-            print("✅ Scheduled scraping completed successfully!")
-        else:
-            logging.error(f"Scheduled scraper run failed: {result.stderr}")
-            print("❌ Scheduled scraping failed. Check scheduler.log for details.")
+    for attempt in range(MAX_RESUME_ATTEMPTS + 1):
+        try:
+            if attempt == 0:
+                logging.info("Starting scheduled scraper run...")
+            else:
+                logging.info(f"Resuming scraper run (attempt {attempt + 1})...")
+            
+            # Run the scraper script
+            result = subprocess.run([sys.executable, 'automated_scraper.py'], 
+                                  capture_output=True, text=True, timeout=300)
             
-    except subprocess.TimeoutExpired:
-        logging.error("Scraper timed out after 5 minutes")
-        print("⏰ Scraper timed out")
-    except Exception as e:
-        logging.error(f"Error running scraper: {str(e)}")
-        print(f"❌ Error: {str(e)}")
+            if result.returncode == 0:
+                logging.info("Scheduled scraper run completed successfully")
+                print("✅ Scheduled scraping completed successfully!")
+            else:
+                logging.error(f"Scheduled scraper run failed: {result.stderr}")
+                print("❌ Scheduled scraping failed. Check scheduler.log for details.")
+            return
+                
+        except subprocess.TimeoutExpired:
+            logging.error("Scraper timed out after 5 minutes; progress is kept in the checkpoint")
+            print("⏰ Scraper timed out")
+        except Exception as e:
+            logging.error(f"Error running scraper: {str(e)}")
+            print(f"❌ Error: {str(e)}")
+            return
 
 def run_once():
     """
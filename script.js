@@ -7,13 +7,31 @@ document.addEventListener('DOMContentLoaded', function () {
         tabletBreakpoint: 1024,
         popupMaxWidth: 300,
         mobilePopupMaxWidth: 250,
-        tabletPopupMaxWidth: 280
+        tabletPopupMaxWidth: 280,
+        geojsonUrl: 'shp/merged_venues_events.geojson',
+        versionUrl: 'shp/version.json',
+        geojsonStorageKey: 'gigmap-geojson',
+        clusterIndexUrl: 'shp/clusters/index.json',
+        timeIndexUrl: 'shp/time_index.json',
+        searchIndexUrl: 'shp/search_index.json',
+        searchResultLimit: 8
     };
 
     // State management
     let map, legend, isMobile, isTablet, currentPopup = null;
     let venuesData = {};
     let colorPalette = [];
+    let imageManifest = null;
+    let mapIndex = null;
+    let allFeatures = [];
+    let clusterIndex = null;
+    let timeIndex = null;
+    let searchIndex = null;
+    let clusterLayer = null;
+    const clusterLevels = {};
+    let venueMarkerSpecs = {};
+    let venueMarkers = {};
+    const supportsWebP = detectWebPSupport();
 
     // Initialize the application
     init();
@@ -139,35 +157,166 @@ document.addEventListener('DOMContentLoaded', function () {
     }
 
     function loadVenuesData() {
-        fetch('shp/merged_venues_events.geojson')
+        // Image variant manifest is optional - fall back to original images without it
+        const manifestRequest = fetch('artist_images/manifest.json')
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null);
+
+        // Precomputed date/venue groupings are optional too - group in the browser without them
+        const indexRequest = fetch('shp/map_index.json')
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null);
+
+        // Zoom-level clusters are optional as well - draw every venue without them
+        const clusterRequest = fetch(config.clusterIndexUrl)
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null);
+
+        // The time index (time_index.py) adds the legend's time window filters
+        const timeIndexRequest = fetch(config.timeIndexUrl)
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null);
+
+        // The search index (search_index.py) enables the artist/venue search box
+        const searchIndexRequest = fetch(config.searchIndexUrl)
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null);
+
+        loadGeoJSON()
+            .then(json => Promise.all([manifestRequest, indexRequest, clusterRequest, timeIndexRequest,
+                searchIndexRequest])
+                .then(([manifest, index, clusters, times, search]) => {
+                    imageManifest = manifest;
+                    processVenuesData(json, index, clusters, times, search);
+                }))
+            .catch(error => {
+                console.error('Error loading venues data:', error);
+                showError('Failed to load venues data. Please refresh the page.');
+            });
+    }
+
+    function fetchGeoJSON(url) {
+        return fetch(url)
             .then(response => {
                 if (!response.ok) {
                     throw new Error(`HTTP error! status: ${response.status}`);
                 }
                 return response.json();
-            })
-            .then(json => {
-                processVenuesData(json);
-            })
-            .catch(error => {
-                console.error('Error loading venues data:', error);
-                showError('Failed to load venues data. Please refresh the page.');
             });
     }
 
-    function processVenuesData(json) {
-        // Group events by date
-        const byDate = {};
-        json.features.forEach(function (feature) {
-            const date = feature.properties.Date;
-            if (!byDate[date]) {
-                byDate[date] = [];
-            }
-            byDate[date].push(feature);
+    function readCachedGeoJSON() {
+        try {
+            const cached = JSON.parse(localStorage.getItem(config.geojsonStorageKey));
+            return cached && cached.data && Array.isArray(cached.data.features) ? cached : null;
+        } catch (error) {
+            return null;
+        }
+    }
+
+    function storeGeoJSON(version, data) {
+        try {
+            localStorage.setItem(config.geojsonStorageKey, JSON.stringify({ version, data }));
+        } catch (error) {
+            // Storage full or unavailable - the next visit downloads the full file
+            localStorage.removeItem(config.geojsonStorageKey);
+        }
+    }
+
+    // Patch a cached copy into the new version (see snapshot_deltas.py)
+    function applyDelta(data, delta) {
+        const byKey = new Map(data.features.map(feature => [feature.properties.EventKey, feature]));
+        delta.removed.forEach(key => byKey.delete(key));
+        delta.added.concat(delta.modified).forEach(feature => {
+            byKey.set(feature.properties.EventKey, feature);
         });
 
+        const features = delta.order.map(key => byKey.get(key));
+        if (features.length !== delta.feature_count || features.some(feature => !feature)) {
+            throw new Error(`Delta ${delta.from}-${delta.to} does not apply to the cached data`);
+        }
+        return Object.assign({}, data, { features });
+    }
+
+    // Use the cached GeoJSON when it is current, patch it when the pipeline
+    // published a delta from its version, and download the full file otherwise
+    function loadGeoJSON() {
+        const cached = readCachedGeoJSON();
+        return fetch(config.versionUrl, { cache: 'no-cache' })
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null)
+            .then(pointer => {
+                if (!pointer) {
+                    // Offline or no versioning: prefer the network, then the cached copy
+                    return fetchGeoJSON(config.geojsonUrl)
+                        .catch(error => cached ? cached.data : Promise.reject(error));
+                }
+                if (cached && cached.version === pointer.version) {
+                    return cached.data;
+                }
+
+                const fetchFull = () => fetchGeoJSON(pointer.geojson || config.geojsonUrl).then(data => {
+                    storeGeoJSON(pointer.version, data);
+                    return data;
+                });
+                const deltaUrl = cached && pointer.deltas && pointer.deltas[String(cached.version)];
+                if (!deltaUrl) {
+                    return fetchFull();
+                }
+                return fetchGeoJSON(deltaUrl)
+                    .then(delta => {
+                        const data = applyDelta(cached.data, delta);
+                        storeGeoJSON(pointer.version, data);
+                        return data;
+                    })
+                    .catch(error => {
+                        console.warn('Falling back to the full GeoJSON:', error);
+                        return fetchFull();
+                    });
+            });
+    }
+
+    // The index is only used if it was built from the GeoJSON that was loaded
+    function isIndexValid(index, features) {
+        if (!index || index.feature_count !== features.length) return false;
+        if (features.length === 0) return true;
+        const matches = (fingerprint, feature) => Boolean(fingerprint) &&
+            fingerprint.Date === feature.properties.Date &&
+            fingerprint.EventKey === (feature.properties.EventKey ?? null);
+        return matches(index.first, features[0]) && matches(index.last, features[features.length - 1]);
+    }
+
+    function processVenuesData(json, index, clusters, times, search) {
+        allFeatures = json.features;
+        mapIndex = isIndexValid(index, allFeatures) ? index : null;
+        clusterIndex = isIndexValid(clusters, allFeatures) ? clusters : null;
+        timeIndex = isIndexValid(times, allFeatures) ? times : null;
+        searchIndex = isIndexValid(search, allFeatures) ? search : null;
+        if (searchIndex) {
+            setupSearch();
+        }
+
+        let byDate = {};
+        let dates;
+        if (mapIndex) {
+            // Groupings precomputed by the pipeline (map_index.py)
+            mapIndex.dates.forEach(date => {
+                byDate[date] = mapIndex.by_date[date].map(offset => allFeatures[offset]);
+            });
+            dates = mapIndex.dates;
+        } else {
+            // Group events by date
+            json.features.forEach(function (feature) {
+                const date = feature.properties.Date;
+                if (!byDate[date]) {
+                    byDate[date] = [];
+                }
+                byDate[date].push(feature);
+            });
+            dates = Object.keys(byDate).sort();
+        }
+
         venuesData = byDate;
-        const dates = Object.keys(byDate).sort();
         colorPalette = generateColorPalette(dates);
 
         addLegend(byDate, dates, colorPalette);
@@ -221,6 +370,11 @@ document.addEventListener('DOMContentLoaded', function () {
             const markerLabel = L.DomUtil.create('span', 'color-label', markerExampleItem);
             markerLabel.textContent = '= # of events';
             
+            // Time window filters for the calendar, when the time index is available
+            if (timeIndex) {
+                addTimeWindowFilters(div);
+            }
+            
             // Create calendar container
             const calendarContainer = L.DomUtil.create('div', 'calendar-container', div);
             
@@ -234,6 +388,7 @@ document.addEventListener('DOMContentLoaded', function () {
             // Create calendar days
             dates.forEach(function (date, index) {
                 const dayDiv = L.DomUtil.create('div', 'calendar-day', calendarContainer);
+                dayDiv.dataset.date = date;
                 const dayNumber = new Date(date).getDate();
                 const dayLabel = L.DomUtil.create('div', 'calendar-day-label', dayDiv);
                 dayLabel.textContent = dayNumber;
@@ -325,6 +480,278 @@ document.addEventListener('DOMContentLoaded', function () {
         legend.addTo(map);
     }
 
+    const timeWindows = [
+        { name: 'all', label: 'All' },
+        { name: 'tonight', label: 'Tonight' },
+        { name: 'weekend', label: 'This Weekend' },
+        { name: '14d', label: 'Next 14 Days' }
+    ];
+
+    function addTimeWindowFilters(container) {
+        const filters = L.DomUtil.create('div', 'time-window-filters', container);
+        timeWindows.forEach(({ name, label }) => {
+            const button = L.DomUtil.create('button', 'time-window-btn', filters);
+            button.type = 'button';
+            button.textContent = label;
+            button.dataset.window = name;
+            if (name === 'all') {
+                button.classList.add('active');
+            }
+            button.addEventListener('click', (e) => {
+                e.stopPropagation();
+                filters.querySelectorAll('.time-window-btn').forEach(other => {
+                    other.classList.toggle('active', other === button);
+                });
+                showCalendarWindow(name === 'all' ? null : datesInWindow(name));
+            });
+        });
+    }
+
+    // Start and end (exclusive) of a named window, as epoch seconds in the
+    // browser's timezone (see window_bounds in time_index.py)
+    function timeWindowBounds(name) {
+        const now = new Date();
+        const start = new Date(now.getFullYear(), now.getMonth(), now.getDate());
+        const end = new Date(start);
+        if (name === 'tonight') {
+            end.setDate(end.getDate() + 1);
+            end.setHours(5);
+        } else if (name === 'weekend') {
+            // From Monday to Thursday look ahead to Friday; the weekend ends on Monday
+            const day = start.getDay();
+            if (day >= 1 && day <= 4) {
+                start.setDate(start.getDate() + 5 - day);
+            }
+            end.setTime(start.getTime());
+            end.setDate(end.getDate() + (8 - start.getDay()) % 7);
+        } else {
+            end.setDate(end.getDate() + parseInt(name, 10));
+        }
+        return [start.getTime() / 1000, end.getTime() / 1000];
+    }
+
+    // First position in a sorted array whose value is not less than `value`
+    function lowerBound(values, value) {
+        let low = 0;
+        let high = values.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (values[mid] < value) {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+        return low;
+    }
+
+    // Dates with events in a window, from two binary searches on the sorted epochs
+    function datesInWindow(name) {
+        const [start, end] = timeWindowBounds(name);
+        const epochs = timeIndex.epochs;
+        const shown = new Set();
+        timeIndex.features.slice(lowerBound(epochs, start), lowerBound(epochs, end)).forEach(offset => {
+            shown.add(allFeatures[offset].properties.Date);
+        });
+        return shown;
+    }
+
+    function showCalendarWindow(shownDates) {
+        const calendarContainer = document.querySelector('.legend .calendar-container');
+        if (!calendarContainer) return;
+        
+        let visibleDays = 0;
+        calendarContainer.querySelectorAll('.calendar-day').forEach(dayDiv => {
+            const visible = !shownDates || shownDates.has(dayDiv.dataset.date);
+            dayDiv.style.display = visible ? '' : 'none';
+            if (visible) visibleDays++;
+        });
+        
+        let emptyMessage = calendarContainer.querySelector('.calendar-empty');
+        if (!emptyMessage) {
+            emptyMessage = L.DomUtil.create('div', 'calendar-empty', calendarContainer);
+            emptyMessage.textContent = 'No shows in this window';
+        }
+        emptyMessage.style.display = visibleDays === 0 ? '' : 'none';
+    }
+
+    // Same normalization as dedup.normalize_text, so queries match the index
+    function normalizeSearchText(value) {
+        return String(value)
+            .normalize('NFKD')
+            .replace(/[\u0300-\u036f]/g, '')
+            .toLowerCase()
+            .replace(/ß/g, 'ss')
+            .replace(/[^0-9a-z]+/g, ' ')
+            .trim();
+    }
+
+    function searchTrigrams(text) {
+        const padded = ` ${text} `;
+        const trigrams = new Set();
+        for (let i = 0; i + 3 <= padded.length; i++) {
+            trigrams.add(padded.slice(i, i + 3));
+        }
+        return trigrams;
+    }
+
+    // Entries with a word starting with `prefix`: one binary search for the
+    // range of matching words (see SearchIndex.prefix_entries in search_index.py)
+    function prefixEntries(prefix) {
+        const tokens = searchIndex.tokens;
+        const matches = new Set();
+        const last = lowerBound(tokens, prefix + '\uffff');
+        for (let i = lowerBound(tokens, prefix); i < last; i++) {
+            searchIndex.token_entries[i].forEach(id => matches.add(id));
+        }
+        return matches;
+    }
+
+    // Entries sharing at least half of the query's trigrams, for typos
+    function fuzzyEntries(query) {
+        const trigrams = searchTrigrams(query);
+        const counts = new Map();
+        trigrams.forEach(trigram => {
+            (searchIndex.trigrams[trigram] || []).forEach(id => counts.set(id, (counts.get(id) || 0) + 1));
+        });
+        const matches = new Set();
+        counts.forEach((count, id) => {
+            if (count >= trigrams.size / 2) matches.add(id);
+        });
+        return matches;
+    }
+
+    // Exact names first, then names starting with the query, then the busiest
+    function searchEntries(query) {
+        query = normalizeSearchText(query);
+        if (!query) return [];
+
+        let matches = null;
+        for (const word of query.split(' ')) {
+            const wordMatches = prefixEntries(word);
+            matches = matches === null ? wordMatches : new Set([...matches].filter(id => wordMatches.has(id)));
+            if (matches.size === 0) break;
+        }
+        if (matches.size === 0 && query.length >= 3) {
+            matches = fuzzyEntries(query);
+        }
+
+        const rank = (id) => {
+            const [name, , features] = searchIndex.entries[id];
+            const key = normalizeSearchText(name);
+            return [key === query ? 0 : 1, key.startsWith(query) ? 0 : 1, -features.length, key];
+        };
+        const compare = (a, b) => {
+            for (let i = 0; i < a.length; i++) {
+                if (a[i] < b[i]) return -1;
+                if (a[i] > b[i]) return 1;
+            }
+            return 0;
+        };
+        return [...matches]
+            .map(id => ({ id, rank: rank(id) }))
+            .sort((a, b) => compare(a.rank, b.rank))
+            .slice(0, config.searchResultLimit)
+            .map(({ id }) => searchIndex.entries[id]);
+    }
+
+    // The entry's next upcoming event, or its latest one if all have passed
+    function nextSearchEvent(features) {
+        const today = new Date();
+        const todayString = `${today.getFullYear()}-${String(today.getMonth() + 1).padStart(2, '0')}-${String(today.getDate()).padStart(2, '0')}`;
+        const offset = features.find(offset => (allFeatures[offset].properties.Date || '') >= todayString);
+        return allFeatures[offset !== undefined ? offset : features[features.length - 1]];
+    }
+
+    function setupSearch() {
+        const container = document.getElementById('map-search');
+        const input = document.getElementById('map-search-input');
+        const results = document.getElementById('map-search-results');
+        if (!container || !input || !results) return;
+
+        container.hidden = false;
+        L.DomEvent.disableClickPropagation(container);
+        L.DomEvent.disableScrollPropagation(container);
+
+        let activeIndex = -1;
+        let currentResults = [];
+
+        const clearResults = () => {
+            results.innerHTML = '';
+            currentResults = [];
+            activeIndex = -1;
+        };
+
+        const highlight = (index) => {
+            activeIndex = index;
+            results.querySelectorAll('.map-search-result').forEach((item, position) => {
+                item.classList.toggle('active', position === index);
+            });
+        };
+
+        const select = (entry) => {
+            const [name, type, features] = entry;
+            const event = nextSearchEvent(features);
+            input.value = name;
+            clearResults();
+            input.blur();
+            if (type === 'artist') {
+                showLegendTooltip(event);
+            } else {
+                flyToEvent(event);
+            }
+        };
+
+        const render = () => {
+            clearResults();
+            currentResults = searchEntries(input.value);
+            if (currentResults.length === 0 && input.value.trim()) {
+                const empty = L.DomUtil.create('li', 'map-search-empty', results);
+                empty.textContent = 'No artists or venues found';
+                return;
+            }
+            currentResults.forEach((entry, position) => {
+                const [name, type, features] = entry;
+                const item = L.DomUtil.create('li', `map-search-result ${type}`, results);
+                item.setAttribute('role', 'option');
+
+                const label = L.DomUtil.create('span', 'map-search-name', item);
+                label.textContent = `${type === 'artist' ? '🎤' : '📍'} ${name}`;
+                const details = L.DomUtil.create('span', 'map-search-details', item);
+                const event = nextSearchEvent(features);
+                const when = event.properties.Date ? formatDate(event.properties.Date) : 'Date TBA';
+                details.textContent = features.length === 1 ? when : `${features.length} shows · ${when}`;
+
+                item.addEventListener('mouseenter', () => highlight(position));
+                item.addEventListener('click', () => select(entry));
+            });
+        };
+
+        input.addEventListener('input', render);
+        input.addEventListener('focus', render);
+        input.addEventListener('keydown', (e) => {
+            if (e.key === 'ArrowDown' && currentResults.length) {
+                e.preventDefault();
+                highlight((activeIndex + 1) % currentResults.length);
+            } else if (e.key === 'ArrowUp' && currentResults.length) {
+                e.preventDefault();
+                highlight((activeIndex - 1 + currentResults.length) % currentResults.length);
+            } else if (e.key === 'Enter' && currentResults.length) {
+                e.preventDefault();
+                select(currentResults[Math.max(activeIndex, 0)]);
+            } else if (e.key === 'Escape') {
+                input.value = '';
+                clearResults();
+                input.blur();
+            }
+        });
+        document.addEventListener('click', (e) => {
+            if (!container.contains(e.target)) {
+                clearResults();
+            }
+        });
+    }
+
     // Desktop tooltip functions
     let desktopTooltip = null;
 
@@ -347,7 +774,7 @@ document.addEventListener('DOMContentLoaded', function () {
             <div class="desktop-tooltip-content">
                 <div class="desktop-tooltip-header">
                     <div class="desktop-tooltip-artist-image">
-                        <img src="${artistImage}" alt="${artist}" onerror="this.style.display='none'">
+                        <img src="${getImageUrl(artistImage, 80)}" alt="${artist}" onerror="this.style.display='none'">
                     </div>
                     <div class="desktop-tooltip-artist-info">
                         <div class="desktop-tooltip-artist-name">${artist}</div>
@@ -395,33 +822,51 @@ document.addEventListener('DOMContentLoaded', function () {
     }
 
     function addGeoJSONLayers(data, dates, colorPalette) {
-        // Collect all markers to fit them to the map view
-        const allMarkers = [];
-        
         // Group all events by venue coordinates to handle overlapping
         const venueGroups = {};
         const allEvents = [];
         
-        // Collect all events with their dates
-        dates.forEach(function (date, index) {
-            data[date].forEach(function (feature) {
-                const coords = feature.geometry.coordinates;
-                const coordKey = coords[0] + ',' + coords[1];
-                
-                if (!venueGroups[coordKey]) {
-                    venueGroups[coordKey] = [];
+        if (mapIndex) {
+            // Venue groups precomputed by the pipeline
+            const dateIndexes = {};
+            dates.forEach((date, index) => { dateIndexes[date] = index; });
+            mapIndex.venue_groups.forEach(group => {
+                const events = group.features
+                    .map(offset => {
+                        const feature = allFeatures[offset];
+                        const date = feature.properties.Date;
+                        const dateIndex = dateIndexes[date];
+                        return { feature: feature, date: date, dateIndex: dateIndex, color: colorPalette[dateIndex] };
+                    })
+                    .filter(event => event.dateIndex !== undefined);
+                if (events.length > 0) {
+                    venueGroups[group.key] = events;
                 }
-                
-                venueGroups[coordKey].push({
-                    feature: feature,
-                    date: date,
-                    dateIndex: index,
-                    color: colorPalette[index]
+            });
+        } else {
+            // Collect all events with their dates
+            dates.forEach(function (date, index) {
+                data[date].forEach(function (feature) {
+                    const coords = feature.geometry.coordinates;
+                    const coordKey = coords[0] + ',' + coords[1];
+                    
+                    if (!venueGroups[coordKey]) {
+                        venueGroups[coordKey] = [];
+                    }
+                    
+                    venueGroups[coordKey].push({
+                        feature: feature,
+                        date: date,
+                        dateIndex: index,
+                        color: colorPalette[index]
+                    });
                 });
             });
-        });
+        }
         
         // Process each venue group
+        venueMarkerSpecs = {};
+        venueMarkers = {};
         Object.keys(venueGroups).forEach(coordKey => {
             const events = venueGroups[coordKey];
             
@@ -443,18 +888,26 @@ document.addEventListener('DOMContentLoaded', function () {
             const eventCount = events.length;
             const radius = eventCount === 1 ? baseRadius : baseRadius + (Math.min(eventCount - 1, 5) * 2); // Max +10px for 6+ events
             
-            // Create single marker with event count
-            const marker = createMarker(events[0].feature, primaryColor, radius, false, 0, eventCount);
-            marker.eventCount = eventCount;
-            marker.allEvents = events.map(e => e.feature);
-            
-            allMarkers.push(marker);
+            // Markers are created when first shown (see getVenueMarker)
+            venueMarkerSpecs[coordKey] = { events: events, color: primaryColor, radius: radius };
         });
         
-        // Fit all markers to the map view with padding
-        if (allMarkers.length > 0) {
-            const group = new L.featureGroup(allMarkers);
-            const bounds = group.getBounds();
+        if (clusterIndex) {
+            // Show only the venues and clusters for the current zoom (marker_clusters.py)
+            clusterLayer = L.layerGroup().addTo(map);
+            map.on('zoomend', renderClusters);
+            renderClusters();
+        } else {
+            Object.keys(venueMarkerSpecs).forEach(coordKey => getVenueMarker(coordKey).addTo(map));
+        }
+        
+        // Fit all venues to the map view with padding
+        const allLatLngs = Object.keys(venueMarkerSpecs).map(coordKey => {
+            const coords = venueMarkerSpecs[coordKey].events[0].feature.geometry.coordinates;
+            return [coords[1], coords[0]];
+        });
+        if (allLatLngs.length > 0) {
+            const bounds = L.latLngBounds(allLatLngs);
             
             map.fitBounds(bounds, {
                 padding: [50, 50],
@@ -556,12 +1009,124 @@ document.addEventListener('DOMContentLoaded', function () {
             autoPanPadding: [50, 50]
         });
 
-        marker.addTo(map);
+        return marker;
+    }
+
+    function getVenueMarker(coordKey) {
+        if (!venueMarkers[coordKey]) {
+            const spec = venueMarkerSpecs[coordKey];
+            const eventCount = spec.events.length;
+            
+            // Create single marker with event count
+            const marker = createMarker(spec.events[0].feature, spec.color, spec.radius, false, 0, eventCount);
+            marker.eventCount = eventCount;
+            marker.allEvents = spec.events.map(e => e.feature);
+            venueMarkers[coordKey] = marker;
+        }
+        return venueMarkers[coordKey];
+    }
+
+    function loadClusterLevel(zoom) {
+        if (!clusterLevels[zoom]) {
+            clusterLevels[zoom] = fetch(clusterIndex.levels[zoom])
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`HTTP error! status: ${response.status}`);
+                    }
+                    return response.json();
+                })
+                .catch(error => {
+                    // Retry on the next zoom
+                    delete clusterLevels[zoom];
+                    throw error;
+                });
+        }
+        return clusterLevels[zoom];
+    }
+
+    // Draw the clusters precomputed for the current zoom; above the highest
+    // clustered zoom every venue gets its own marker
+    function renderClusters() {
+        const zoom = Math.round(map.getZoom());
+        const allVenues = { venues: Object.keys(venueMarkerSpecs), clusters: [] };
+        if (zoom > clusterIndex.max_zoom) {
+            showClusterLevel(allVenues);
+            return;
+        }
+
+        loadClusterLevel(Math.max(zoom, clusterIndex.min_zoom))
+            .then(level => {
+                // Ignore levels that arrive after the user zoomed again
+                if (Math.round(map.getZoom()) === zoom) {
+                    showClusterLevel(level);
+                }
+            })
+            .catch(error => {
+                console.warn('Showing unclustered venues:', error);
+                showClusterLevel(allVenues);
+            });
+    }
+
+    function showClusterLevel(level) {
+        // Venue markers that stay visible are kept, so their open popups stay open
+        const visible = new Set();
+        level.venues.forEach(coordKey => {
+            if (venueMarkerSpecs[coordKey]) {
+                visible.add(getVenueMarker(coordKey));
+            }
+        });
+        clusterLayer.eachLayer(layer => {
+            if (!visible.has(layer)) {
+                clusterLayer.removeLayer(layer);
+            }
+        });
+        visible.forEach(marker => clusterLayer.addLayer(marker));
+        level.clusters.forEach(cluster => clusterLayer.addLayer(createClusterMarker(cluster)));
+    }
+
+    function createClusterMarker([lon, lat, eventCount, venueCount, expansionZoom]) {
+        const size = getMarkerRadius() * 2 + Math.min(String(eventCount).length, 4) * 6;
+        const iconHtml = `
+            <div class="marker-cluster-badge" style="
+                background: #34495e;
+                color: white;
+                border-radius: 50%;
+                width: ${size}px;
+                height: ${size}px;
+                display: flex;
+                align-items: center;
+                justify-content: center;
+                font-size: ${Math.max(10, size * 0.35)}px;
+                font-weight: bold;
+                border: 3px solid rgba(255,255,255,0.85);
+                box-shadow: 0 0 0 4px rgba(52,73,94,0.3), 0 2px 10px rgba(0,0,0,0.4);
+            ">${eventCount}</div>
+        `;
+
+        const marker = L.marker([lat, lon], {
+            icon: L.divIcon({
+                className: 'custom-marker-cluster',
+                html: iconHtml,
+                iconSize: [size, size],
+                iconAnchor: [size / 2, size / 2]
+            }),
+            title: `${eventCount} events at ${venueCount} venues`,
+            keyboard: false
+        });
+
+        // Zoom in until the cluster splits
+        marker.on('click', function (e) {
+            e.originalEvent.stopPropagation();
+            map.flyTo([lat, lon], expansionZoom, {
+                duration: 0.6,
+                easeLinearity: 0.25
+            });
+        });
         return marker;
     }
 
     function createPopupContent(feature) {
-        const { Artist, Venue, Date: eventDate, Time, ArtistImage } = feature.properties;
+        const { Artist, Venue, Date: eventDate, Time, ArtistImage, Genres, OnTour, SimilarArtists } = feature.properties;
         
         // Check if there are multiple events at this venue
         const venueEvents = getVenueEvents(Venue);
@@ -571,13 +1136,15 @@ document.addEventListener('DOMContentLoaded', function () {
             const relDate = formatRelativeDate(eventDate);
             return `
                 <div class="popup-content">
-                    ${ArtistImage ? `<img src="${ArtistImage}" alt="${Artist}" class="popup-image" onerror="this.style.display='none'">` : ''}
+                    ${ArtistImage ? `<img src="${getImageUrl(ArtistImage, 300)}" alt="${Artist}" class="popup-image" onerror="this.style.display='none'">` : ''}
                     <div class="popup-info">
                         <div class="popup-date-badge" style="background-color: ${relDate.color};">${relDate.label}</div>
-                        <div class="popup-artist">${Artist}</div>
+                        <div class="popup-artist">${Artist}${OnTour ? ' <span class="popup-on-tour">On tour</span>' : ''}</div>
+                        ${Genres ? `<div class="popup-genres">🎸 ${Genres}</div>` : ''}
                         <div class="popup-venue">📍 ${Venue}</div>
                         <div class="popup-time">🕐 ${Time || 'TBA'}</div>
                         <div class="popup-full-date">${relDate.full}</div>
+                        ${SimilarArtists ? `<div class="popup-similar">Similar: ${SimilarArtists}</div>` : ''}
                     </div>
                 </div>
             `;
@@ -587,7 +1154,7 @@ document.addEventListener('DOMContentLoaded', function () {
                 .sort((a, b) => new Date(a.Date) - new Date(b.Date))
                 .map(event => {
                     const relDate = formatRelativeDate(event.Date);
-                    const imagePath = event.ArtistImage || '';
+                    const imagePath = event.ArtistImage ? getImageUrl(event.ArtistImage, 80) : '';
                     return `
                         <div class="popup-event-card" style="border-left: 3px solid ${relDate.color};">
                             <div class="popup-event-image-wrapper">
@@ -597,6 +1164,7 @@ document.addEventListener('DOMContentLoaded', function () {
                             <div class="popup-event-details">
                                 <div class="popup-event-date-badge" style="background-color: ${relDate.color};">${relDate.label}</div>
                                 <div class="popup-event-artist">${event.Artist}</div>
+                                ${event.Genres ? `<div class="popup-event-genres">${event.Genres}</div>` : ''}
                                 <div class="popup-event-meta">
                                     <span class="popup-event-time">🕐 ${event.Time || 'TBA'}</span>
                                     <span class="popup-event-full-date">${relDate.full}</span>
@@ -621,6 +1189,9 @@ document.addEventListener('DOMContentLoaded', function () {
     }
     
     function getVenueEvents(venueName) {
+        if (mapIndex) {
+            return (mapIndex.venues[venueName] || []).map(offset => allFeatures[offset].properties);
+        }
         const events = [];
         Object.keys(venuesData).forEach(date => {
             venuesData[date].forEach(feature => {
@@ -842,6 +1413,25 @@ document.addEventListener('DOMContentLoaded', function () {
         }
     }
 
+    function detectWebPSupport() {
+        try {
+            const canvas = document.createElement('canvas');
+            return canvas.toDataURL('image/webp').indexOf('data:image/webp') === 0;
+        } catch (e) {
+            return false;
+        }
+    }
+
+    // Use the variant generated for a display width (WebP when supported)
+    function getImageUrl(path, width) {
+        if (!path) return path;
+        const normalizedPath = path.replace(/\\/g, '/');
+        const entry = imageManifest && imageManifest.images[normalizedPath];
+        const variant = entry && entry.variants && entry.variants[String(width)];
+        if (!variant) return normalizedPath;
+        return supportsWebP ? variant.webp : variant.jpg;
+    }
+
     function getMarkerRadius() {
         return isMobile ? 6 : 8;
     }
@@ -977,7 +1567,7 @@ document.addEventListener('DOMContentLoaded', function () {
         
         // Create image element with better error handling
         // Fix image path by replacing backslashes and encoding spaces
-        const fixedImagePath = artistImage ? artistImage.replace(/\\/g, '/').replace(/ /g, '%20') : null;
+        const fixedImagePath = artistImage ? getImageUrl(artistImage, 80).replace(/ /g, '%20') : null;
         const imageHtml = fixedImagePath ? 
             `<img src="${fixedImagePath}" alt="${artist}" onerror="this.style.display='none'; this.parentElement.innerHTML='<div class=\\"artist-placeholder\\">🎵</div>'">` :
             '<div class="artist-placeholder">🎵</div>';
@@ -1110,7 +1700,7 @@ document.addEventListener('DOMContentLoaded', function () {
         
         // Create image element with better error handling
         // Fix image path by replacing backslashes and encoding spaces
-        const fixedImagePath = artistImage ? artistImage.replace(/\\/g, '/').replace(/ /g, '%20') : null;
+        const fixedImagePath = artistImage ? getImageUrl(artistImage, 80).replace(/ /g, '%20') : null;
         const imageHtml = fixedImagePath ? 
             `<img src="${fixedImagePath}" alt="${artist}" onerror="this.style.display='none'; this.parentElement.innerHTML='<div class=\\"artist-placeholder\\">🎵</div>'">` :
             '<div class="artist-placeholder">🎵</div>';
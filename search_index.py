@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Precomputed Artist and Venue Search Index
+
+Searching the map for an artist or venue in the browser would mean scanning
+every feature's properties on each keystroke. The pipeline instead builds a
+small static index over normalized artist and venue names (see
+dedup.normalize_text):
+
+    shp/search_index.json
+    {
+        "feature_count": 15, "first": {...}, "last": {...},
+        "entries": [["Al's Bar", "venue", [3, 9], ["2025-11-21", ...]], ...],
+        "tokens": ["al", "bar", ...],
+        "token_entries": [[0, 4], [0], ...],
+        "trigrams": {"al ": [0, 4], ...}
+    }
+
+`entries` are the distinct names with their type, GeoJSON feature offsets
+(sorted by date) and event dates. `tokens` is the sorted list of words in
+all names and `token_entries` the entries containing each word, so a prefix
+lookup is a binary search for the range of words starting with the prefix.
+A query matches the entries that have a word starting with each of its
+words; if nothing does, entries sharing most of the query's trigrams are
+returned instead, which catches typos and words matched mid-way.
+
+`feature_count`, `first` and `last` match map_index.json, so the front end can
+check that the index was built from the GeoJSON it loaded.
+
+Usage:
+    python search_index.py [geojson] [--output shp/search_index.json]
+    python search_index.py --query "burl"
+"""
+
+import argparse
+import json
+import os
+from bisect import bisect_left
+
+from dedup import normalize_text
+from map_index import GEOJSON_PATH, feature_fingerprint
+
+SEARCH_INDEX_PATH = 'shp/search_index.json'
+
+# Searchable properties and the entry type they produce
+SEARCH_FIELDS = (('Artist', 'artist'), ('Venue', 'venue'))
+
+MAX_RESULTS = 8
+
+# Fraction of a query's trigrams an entry needs for a fuzzy match
+TRIGRAM_THRESHOLD = 0.5
+
+
+def trigrams(text):
+    """
+    Character trigrams of a normalized name, padded so word edges count.
+    """
+    padded = f" {text} "
+    return {padded[position:position + 3] for position in range(len(padded) - 2)}
+
+
+def build_search_index(geojson_data):
+    """
+    Collect the distinct artist and venue names and index their words.
+
+    Args:
+        geojson_data (dict): FeatureCollection as loaded from the GeoJSON
+
+    Returns:
+        dict: Search index (see module docstring)
+    """
+    features = geojson_data.get('features', [])
+    entries = {}
+    for offset, feature in enumerate(features):
+        properties = feature.get('properties') or {}
+        for field, entry_type in SEARCH_FIELDS:
+            name = properties.get(field)
+            key = normalize_text(name)
+            if not key:
+                continue
+            entry = entries.get((key, entry_type))
+            if entry is None:
+                entry = entries[(key, entry_type)] = {'name': name, 'features': [], 'dates': set()}
+            entry['features'].append(offset)
+            if properties.get('Date'):
+                entry['dates'].add(properties['Date'])
+
+    def date_of(offset):
+        return (features[offset].get('properties') or {}).get('Date') or ''
+
+    ordered = sorted(entries.items(), key=lambda item: (item[0][0], item[0][1]))
+    token_entries = {}
+    trigram_entries = {}
+    rows = []
+    for entry_id, ((key, entry_type), entry) in enumerate(ordered):
+        rows.append([entry['name'], entry_type, sorted(entry['features'], key=date_of), sorted(entry['dates'])])
+        for token in set(key.split()):
+            token_entries.setdefault(token, []).append(entry_id)
+        for trigram in trigrams(key):
+            trigram_entries.setdefault(trigram, []).append(entry_id)
+
+    tokens = sorted(token_entries)
+    return {
+        'feature_count': len(features),
+        'first': feature_fingerprint(features[0]) if features else None,
+        'last': feature_fingerprint(features[-1]) if features else None,
+        'entries': rows,
+        'tokens': tokens,
+        'token_entries': [token_entries[token] for token in tokens],
+        'trigrams': {trigram: trigram_entries[trigram] for trigram in sorted(trigram_entries)}
+    }
+
+
+class SearchIndex:
+    """
+    Type-ahead lookups over a built or exported search index.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.entries = data['entries']
+        self.tokens = data['tokens']
+        self.token_entries = data['token_entries']
+        self.trigrams = data['trigrams']
+
+    @classmethod
+    def load(cls, path=SEARCH_INDEX_PATH):
+        """
+        Load an exported search index.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def prefix_entries(self, prefix):
+        """
+        Entries with a word starting with `prefix`, via binary search.
+        """
+        first = bisect_left(self.tokens, prefix)
+        last = bisect_left(self.tokens, prefix + '\uffff', first)
+        matches = set()
+        for entry_ids in self.token_entries[first:last]:
+            matches.update(entry_ids)
+        return matches
+
+    def fuzzy_entries(self, query):
+        """
+        Entries sharing at least TRIGRAM_THRESHOLD of the query's trigrams.
+        """
+        query_trigrams = trigrams(query)
+        counts = {}
+        for trigram in query_trigrams:
+            for entry_id in self.trigrams.get(trigram, ()):
+                counts[entry_id] = counts.get(entry_id, 0) + 1
+        needed = TRIGRAM_THRESHOLD * len(query_trigrams)
+        return {entry_id for entry_id, count in counts.items() if count >= needed}
+
+    def search(self, query, limit=MAX_RESULTS):
+        """
+        Find artists and venues for a (partial) query.
+
+        Exact names rank first, then names starting with the query, then
+        names with the most events.
+
+        Returns:
+            list: Dicts with name, type, features and dates
+        """
+        query = normalize_text(query)
+        if not query:
+            return []
+
+        matches = None
+        for word in query.split():
+            word_matches = self.prefix_entries(word)
+            matches = word_matches if matches is None else matches & word_matches
+            if not matches:
+                break
+        if not matches and len(query) >= 3:
+            matches = self.fuzzy_entries(query)
+
+        def rank(entry_id):
+            name, _, features, _ = self.entries[entry_id]
+            key = normalize_text(name)
+            return (key != query, not key.startswith(query), -len(features), key)
+
+        return [
+            dict(zip(('name', 'type', 'features', 'dates'), self.entries[entry_id]))
+            for entry_id in sorted(matches or (), key=rank)[:limit]
+        ]
+
+
+def write_search_index(geojson_path=GEOJSON_PATH, index_path=SEARCH_INDEX_PATH):
+    """
+    Build the search index for a GeoJSON file and write it atomically.
+
+    Returns:
+        dict: The index that was written
+    """
+    with open(geojson_path, 'r', encoding='utf-8') as f:
+        index = build_search_index(json.load(f))
+
+    temp_path = index_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_path, index_path)
+    return index
+
+
+def main():
+    """
+    Rebuild the search index, or run a query against it, from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Precompute the artist and venue search index for the map')
+    parser.add_argument('geojson', nargs='?', default=GEOJSON_PATH, help='map GeoJSON')
+    parser.add_argument('--output', default=SEARCH_INDEX_PATH, help='index path')
+    parser.add_argument('--query', help='search the exported index instead of rebuilding it')
+    args = parser.parse_args()
+
+    if args.query:
+        results = SearchIndex.load(args.output).search(args.query)
+        print(f"🔎 {len(results)} results for {args.query!r}")
+        for result in results:
+            dates = f"{result['dates'][0]} ... {result['dates'][-1]}" if result['dates'] else 'no dates'
+            print(f"  - {result['name']} ({result['type']}): {len(result['features'])} events, {dates}")
+        return
+
+    index = write_search_index(args.geojson, args.output)
+    print(f"🔎 Indexed {len(index['entries'])} names ({len(index['tokens'])} words, "
+          f"{len(index['trigrams'])} trigrams) from {index['feature_count']} features")
+    print(f"📁 Search index written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Versioned GeoJSON Snapshots and Deltas
+
+Every scrape replaces shp/merged_venues_events.geojson, so returning visitors
+used to download the whole file even when only a few events changed. After
+each run this module:
+
+1. makes sure every feature carries a stable `EventKey` property
+2. stores the GeoJSON as a numbered snapshot in shp/snapshots/
+3. writes a delta from each of the last K snapshots to the new one
+4. writes shp/version.json, the pointer clients check first:
+
+    {
+        "version": 12,
+        "hash": "<sha256 prefix of the features>",
+        "generated_at": "2025-09-01T06:00:00",
+        "geojson": "shp/merged_venues_events.geojson",
+        "feature_count": 15,
+        "deltas": {"11": "shp/deltas/11-12.json", "10": "shp/deltas/10-12.json"}
+    }
+
+A delta holds the features added and modified (by key), the keys removed,
+and the key order of the new version, so a client can patch its cached copy
+into exactly the published file:
+
+    {"from": 11, "to": 12, "feature_count": 15,
+     "added": [...], "modified": [...], "removed": [...], "order": [...]}
+
+A run that produces identical features does not create a new version.
+
+Usage:
+    python snapshot_deltas.py [geojson]
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+from dedup import event_key
+
+GEOJSON_PATH = 'shp/merged_venues_events.geojson'
+SNAPSHOT_DIR = 'shp/snapshots'
+DELTA_DIR = 'shp/deltas'
+VERSION_PATH = 'shp/version.json'
+
+# Number of previous versions a client can patch from
+DELTA_DEPTH = 5
+
+SNAPSHOT_PATTERN = re.compile(r'v(\d+)\.json$')
+
+
+def to_web_path(path):
+    """
+    Convert an OS path to the forward-slash form used by the front end.
+    """
+    return path.replace(os.sep, '/')
+
+
+def assign_feature_keys(features):
+    """
+    Give every feature a unique `EventKey` property.
+
+    Features without a key get the same concert-ID or artist+venue+date key
+    the scrapers use; repeated keys get a numeric suffix.
+
+    Args:
+        features (list): GeoJSON features, updated in place
+
+    Returns:
+        bool: True if any feature was changed
+    """
+    changed = False
+    seen = {}
+    for feature in features:
+        properties = feature.setdefault('properties', {})
+        key = properties.get('EventKey')
+        if not key:
+            key = event_key(properties.get('ArtistLink'), properties.get('Artist'),
+                            properties.get('Venue'), properties.get('Date'))
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        if count:
+            key = f"{key}#{count}"
+        if properties.get('EventKey') != key:
+            properties['EventKey'] = key
+            changed = True
+    return changed
+
+
+def features_hash(features):
+    """
+    Hash features in a canonical form, ignoring formatting.
+    """
+    canonical = json.dumps(features, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def build_delta(old_features, new_features, from_version, to_version):
+    """
+    Compute the changes from one snapshot's features to another's.
+
+    Args:
+        old_features (list): Features of the older version (keyed)
+        new_features (list): Features of the new version (keyed)
+        from_version (int): Older version number
+        to_version (int): New version number
+
+    Returns:
+        dict: Delta with added, modified and removed features and key order
+    """
+    old_by_key = {feature['properties']['EventKey']: feature for feature in old_features}
+    new_keys = [feature['properties']['EventKey'] for feature in new_features]
+
+    added = []
+    modified = []
+    for key, feature in zip(new_keys, new_features):
+        previous = old_by_key.get(key)
+        if previous is None:
+            added.append(feature)
+        elif previous != feature:
+            modified.append(feature)
+
+    new_key_set = set(new_keys)
+    removed = [key for key in old_by_key if key not in new_key_set]
+
+    return {
+        'from': from_version,
+        'to': to_version,
+        'feature_count': len(new_features),
+        'added': added,
+        'modified': modified,
+        'removed': removed,
+        'order': new_keys
+    }
+
+
+def load_version(path=VERSION_PATH):
+    """
+    Load the version pointer, or None if there is none yet.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def list_snapshots(snapshot_dir=SNAPSHOT_DIR):
+    """
+    List stored snapshots, oldest first.
+
+    Returns:
+        list: (version, path) tuples
+    """
+    snapshots = []
+    for path in glob.glob(os.path.join(snapshot_dir, 'v*.json')):
+        match = SNAPSHOT_PATTERN.search(os.path.basename(path))
+        if match:
+            snapshots.append((int(match.group(1)), path))
+    return sorted(snapshots)
+
+
+def _write_json(data, path, **kwargs):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, **kwargs)
+    os.replace(temp_path, path)
+
+
+def write_geojson(geojson_data, path):
+    """
+    Write a FeatureCollection atomically, one feature per line as GDAL does.
+    """
+    header = {key: value for key, value in geojson_data.items() if key != 'features'}
+    lines = ['{']
+    lines.extend(f"{json.dumps(key)}: {json.dumps(value, ensure_ascii=False)}," for key, value in header.items())
+    lines.append('"features": [')
+    lines.append(',\n'.join(json.dumps(feature, ensure_ascii=False) for feature in geojson_data.get('features', [])))
+    lines.extend([']', '}'])
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(temp_path, path)
+
+
+def publish_snapshot(geojson_path=GEOJSON_PATH, snapshot_dir=SNAPSHOT_DIR,
+                     delta_dir=DELTA_DIR, version_path=VERSION_PATH, depth=DELTA_DEPTH):
+    """
+    Snapshot the current GeoJSON and write deltas from recent versions.
+
+    Args:
+        geojson_path (str): Published map GeoJSON (keys are added in place)
+        snapshot_dir (str): Directory for numbered snapshots
+        delta_dir (str): Directory for delta files
+        version_path (str): Version pointer path
+        depth (int): Number of previous versions to write deltas from
+
+    Returns:
+        dict: The version pointer (unchanged if the features did not change)
+    """
+    with open(geojson_path, 'r', encoding='utf-8') as f:
+        geojson_data = json.load(f)
+    features = geojson_data.get('features', [])
+    if assign_feature_keys(features):
+        write_geojson(geojson_data, geojson_path)
+
+    current_hash = features_hash(features)
+    pointer = load_version(version_path)
+    snapshots = list_snapshots(snapshot_dir)
+    if pointer and pointer.get('hash') == current_hash and snapshots and snapshots[-1][0] == pointer['version']:
+        return pointer
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    os.makedirs(delta_dir, exist_ok=True)
+    version = max([pointer['version'] if pointer else 0] + [number for number, _ in snapshots]) + 1
+
+    snapshot_path = os.path.join(snapshot_dir, f"v{version}.json")
+    _write_json(features, snapshot_path, separators=(',', ':'))
+
+    # Deltas from the most recent previous versions
+    deltas = {}
+    previous = snapshots[-depth:] if depth > 0 else []
+    for old_version, old_path in previous:
+        with open(old_path, 'r', encoding='utf-8') as f:
+            old_features = json.load(f)
+        delta = build_delta(old_features, features, old_version, version)
+        delta_path = os.path.join(delta_dir, f"{old_version}-{version}.json")
+        _write_json(delta, delta_path, separators=(',', ':'))
+        deltas[str(old_version)] = to_web_path(delta_path)
+
+    # Keep only the snapshots future deltas will need, and deltas to this version
+    keep = max(depth - 1, 0)
+    for old_version, old_path in snapshots[:max(len(snapshots) - keep, 0)]:
+        os.remove(old_path)
+    for delta_path in glob.glob(os.path.join(delta_dir, '*.json')):
+        if to_web_path(delta_path) not in deltas.values():
+            os.remove(delta_path)
+
+    pointer = {
+        'version': version,
+        'hash': current_hash,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'geojson': to_web_path(geojson_path),
+        'feature_count': len(features),
+        'deltas': deltas
+    }
+    _write_json(pointer, version_path, indent=2)
+    return pointer
+
+
+def main():
+    """
+    Publish a snapshot of the map GeoJSON from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Snapshot the map GeoJSON and write deltas for clients')
+    parser.add_argument('geojson', nargs='?', default=GEOJSON_PATH, help='map GeoJSON')
+    parser.add_argument('--depth', type=int, default=DELTA_DEPTH,
+                        help='number of previous versions to write deltas from')
+    args = parser.parse_args()
+
+    pointer = publish_snapshot(args.geojson, depth=args.depth)
+    print(f"🗃️  Version {pointer['version']} ({pointer['feature_count']} features), "
+          f"{len(pointer['deltas'])} deltas")
+    print(f"📁 Version pointer written to {VERSION_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,26 +16,51 @@ Author: Enhanced version of original scraper
 Date: 2025
 """
 
+import argparse
 import os
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import time
-from urllib.parse import urljoin, urlparse
 import re
 import sys
 from datetime import datetime
 
+from event_extraction import (
+    find_event_elements, parse_event, records_to_dataframe,
+    split_datetime_columns, convert_to_imperial, clean_location_column
+)
+from event_schema import to_category, to_dates
+from dedup import EventDeduplicator
+from image_variants import generate_variants
+from image_store import ImageStore
+from http_client import create_session
+from artist_enrichment import ArtistEnricher, ENRICHMENT_COLUMNS
+from data_quality import (
+    profile_events, load_rules, load_previous_report, save_report, print_report
+)
+
 # Configuration variables
 SONGKICK_URL = 'https://www.songkick.com/metro-areas/24580-us-lexington?utf8=%E2%9C%93&filters%5BminDate%5D=07%2F03%2F2025&filters%5BmaxDate%5D=07%2F30%2F2025'
 ARTIST_IMAGES_DIR = 'artist_images'
 OUTPUT_CSV = 'lexington_events_enhanced.csv'
 
+# Output columns for scraped events, keyed by EventRecord attribute
+EVENT_COLUMNS = {
+    'artist': 'Artist',
+    'location': 'Location',
+    'datetime': 'Datetime',
+    'artist_link': 'Artist_Link',
+    'image_path': 'Artist_Image',
+    'time_text': 'Time_Text'
+}
+
 # Request headers to mimic a real browser
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 
+# Shared session: pooled connections, retries, compression and per-host rate limiting
+SESSION = create_session(HEADERS)
+
 def sanitize_filename(filename):
     """
     Sanitize a filename by removing/replacing invalid characters.
@@ -54,13 +79,15 @@ def sanitize_filename(filename):
     filename = filename.strip('._')
     return filename
 
-def download_image(image_url, artist_name):
+def download_image(image_url, artist_name, image_store=None):
     """
     Download an artist image from URL and save it locally.
     
     Args:
         image_url (str): URL of the image to download
         artist_name (str): Name of the artist for filename
+        image_store (ImageStore): Deduplicating store; identical or
+            near-identical images are saved once and shared
         
     Returns:
         str: Local path to the downloaded image, or None if failed
@@ -71,12 +98,18 @@ def download_image(image_url, artist_name):
         filename = f"{ARTIST_IMAGES_DIR}/{safe_name}.jpg"
         
         # Download the image
-        response = requests.get(image_url, headers=HEADERS, timeout=10)
+        response = SESSION.get(image_url, timeout=10)
         response.raise_for_status()
         
-        # Save the image
-        with open(filename, 'wb') as img_file:
-            img_file.write(response.content)
+        # Save the image, reusing a stored copy if it is a duplicate
+        if image_store is not None:
+            filename = image_store.save(response.content, artist_name, filename)
+            if filename is None:
+                print(f"  ✗ Image for {artist_name} is not a valid image")
+                return None
+        else:
+            with open(filename, 'wb') as img_file:
+                img_file.write(response.content)
         
         print(f"  ✓ Downloaded image for {artist_name}")
         return filename
@@ -85,42 +118,6 @@ def download_image(image_url, artist_name):
         print(f"  ✗ Failed to download image for {artist_name}: {str(e)}")
         return None
 
-def extract_artist_image_url(event_element):
-    """
-    Extract the artist image URL from an event element.
-    
-    Args:
-        event_element: BeautifulSoup element containing event data
-        
-    Returns:
-        str: Image URL or None if not found
-    """
-    try:
-        # Look for the image in the event thumbnail
-        thumb_link = event_element.find('a', class_='thumb')
-        if thumb_link:
-            img_tag = thumb_link.find('img', class_='artist-profile-image')
-            if img_tag:
-                # Check for data-src attribute (lazy loading)
-                if 'data-src' in img_tag.attrs:
-                    image_url = img_tag['data-src']
-                elif 'src' in img_tag.attrs:
-                    image_url = img_tag['src']
-                else:
-                    return None
-                
-                # Ensure URL has protocol
-                if image_url.startswith('//'):
-                    image_url = 'https:' + image_url
-                elif not image_url.startswith('http'):
-                    image_url = 'https://' + image_url
-                
-                return image_url
-    except Exception as e:
-        print(f"Error extracting image URL: {str(e)}")
-    
-    return None
-
 def scrape_songkick_events(url):
     """
     Scrape event data from SongKick for Lexington, KY.
@@ -133,81 +130,40 @@ def scrape_songkick_events(url):
     """
     print(f"Starting to scrape events from: {url}")
     
-    # Initialize lists to store extracted data
-    events_data = []
+    # Parsed events, kept as compact EventRecords until the final DataFrame
+    records = []
+    image_store = ImageStore()
     
     try:
         # Fetch the webpage content
         print("Fetching webpage...")
-        response = requests.get(url, headers=HEADERS, timeout=30)
+        response = SESSION.get(url, timeout=30)
         response.raise_for_status()
         
-        # Parse the HTML content
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
         # Find all event listings
-        event_elements = soup.find_all('li', class_='event-listings-element')
+        event_elements = find_event_elements(response.content)
         print(f"Found {len(event_elements)} events to process")
         
         # Process each event
         for i, event in enumerate(event_elements, 1):
             print(f"\nProcessing event {i}/{len(event_elements)}...")
             
-            # Extract artist name
-            artist_tag = event.find('p', class_='artists')
-            artist_name = None
-            if artist_tag and artist_tag.strong:
-                artist_name = artist_tag.strong.get_text(strip=True)
-            
-            if not artist_name:
+            record = parse_event(event)
+            if record is None:
                 print(f"  ⚠ Skipping event {i}: No artist name found")
                 continue
             
-            # Extract artist link
-            artist_link = None
-            if artist_tag:
-                artist_link_tag = artist_tag.find('a')
-                if artist_link_tag and 'href' in artist_link_tag.attrs:
-                    artist_link = urljoin('https://www.songkick.com', artist_link_tag['href'])
-            
-            # Extract event location
-            location_tag = event.find('p', class_='location')
-            location_name = location_tag.get_text(strip=True) if location_tag else None
-            
-            # Extract date and time
-            time_element = event.find('time')
-            datetime_value = 'N/A'
-            time_text = 'N/A'
-            
-            if time_element:
-                datetime_value = time_element.get('datetime', 'N/A')
-                time_text = time_element.get_text(strip=True)
-            
-            # Extract and download artist image
-            image_url = extract_artist_image_url(event)
-            local_image_path = None
-            
-            if image_url:
-                local_image_path = download_image(image_url, artist_name)
-                # Add a small delay to be respectful to the server
-                time.sleep(0.5)
+            # Download artist image
+            if record.image_url:
+                record.image_path = download_image(record.image_url, record.artist, image_store)
             else:
-                print(f"  ⚠ No image found for {artist_name}")
+                print(f"  ⚠ No image found for {record.artist}")
             
-            # Store the event data
-            event_data = {
-                'Artist': artist_name,
-                'Location': location_name,
-                'Datetime': datetime_value,
-                'Artist_Link': artist_link,
-                'Artist_Image': local_image_path,
-                'Time_Text': time_text
-            }
-            
-            events_data.append(event_data)
-            print(f"  ✓ Processed: {artist_name} at {location_name}")
+            records.append(record)
+            print(f"  ✓ Processed: {record.artist} at {record.location}")
         
-        print(f"\n✅ Successfully processed {len(events_data)} events!")
+        image_store.save_index()
+        print(f"\n✅ Successfully processed {len(records)} events!")
         
     except requests.RequestException as e:
         print(f"❌ Error fetching webpage: {str(e)}")
@@ -216,169 +172,119 @@ def scrape_songkick_events(url):
         print(f"❌ Unexpected error during scraping: {str(e)}")
         return pd.DataFrame()
     
-    # Create DataFrame from collected data
-    df = pd.DataFrame(events_data)
+    # Convert collected records to DataFrame columns in bulk
+    df = records_to_dataframe(records, EVENT_COLUMNS)
     return df
 
 def process_datetime_data(df):
     """
     Process datetime data to extract date and convert time to imperial format.
     
+    Columns are added in place, typed with the event schema.
+    
     Args:
         df (pandas.DataFrame): DataFrame with datetime data
         
     Returns:
-        pandas.DataFrame: DataFrame with processed date and time columns
+        pandas.DataFrame: The same DataFrame with Date and Time columns
     """
     print("Processing datetime data...")
     
-    def split_datetime(row):
-        """Split datetime into date and time components"""
-        datetime_str = row['Datetime']
-        
-        if pd.isna(datetime_str) or datetime_str == 'N/A':
-            return pd.Series([None, None])
-        
-        # Handle different datetime formats
-        if 'T' in str(datetime_str):
-            # ISO format: 2025-07-24T19:00:00-0500
-            try:
-                date_part = datetime_str.split('T')[0]
-                time_part = datetime_str.split('T')[1][:5]  # HH:MM
-                return pd.Series([date_part, time_part])
-            except:
-                return pd.Series([None, None])
-        else:
-            # Date only format
-            return pd.Series([datetime_str, None])
-    
-    def convert_to_imperial(time_str):
-        """Convert 24-hour time to 12-hour format"""
-        if pd.isna(time_str) or time_str is None:
-            return None
-        
-        try:
-            time_obj = pd.to_datetime(time_str, format='%H:%M')
-            return time_obj.strftime('%I:%M %p')
-        except:
-            return time_str
-    
-    # Create a copy to avoid modifying the original
-    processed_df = df.copy()
-    
     # Split datetime into date and time
-    processed_df[['Date', 'Time']] = processed_df.apply(split_datetime, axis=1)
+    dates, times = split_datetime_columns(df['Datetime'])
+    df['Date'] = to_dates(dates)
     
     # Convert time to imperial format
-    processed_df['Time'] = processed_df['Time'].apply(convert_to_imperial)
+    df['Time'] = to_category(convert_to_imperial(times))
     
     print("✅ Datetime processing completed!")
-    return processed_df
+    return df
 
 def clean_location_data(df):
     """
     Clean location data by removing common suffixes and formatting issues.
     
+    The Location column is cleaned in place (once per distinct location).
+    
     Args:
         df (pandas.DataFrame): DataFrame with location data
         
     Returns:
-        pandas.DataFrame: DataFrame with cleaned location data
+        pandas.DataFrame: The same DataFrame with cleaned location data
     """
     print("Cleaning location data...")
     
-    # Common location suffixes to remove
-    location_suffixes = [
-        ',Lexington, KY, US',
-        ',Georgetown, KY, US',
-        ',London, KY, US',
-        ',North Lexington, KY, US',
-        ',Richmond, KY, US',
-        ',Nicholasville, KY, US',
-        ',Winchester, KY, US'
-    ]
-    
-    cleaned_df = df.copy()
-    
-    for suffix in location_suffixes:
-        cleaned_df['Location'] = cleaned_df['Location'].str.replace(suffix, '', regex=False)
-    
-    # Clean up any extra commas and whitespace
-    cleaned_df['Location'] = cleaned_df['Location'].str.strip().str.rstrip(',')
+    # Remove city/state suffixes and clean up extra commas and whitespace
+    df['Location'] = clean_location_column(df['Location'])
     
     print("✅ Location cleaning completed!")
-    return cleaned_df
+    return df
 
-def save_enhanced_data(df, filename):
+def save_enhanced_data(df, filename, profile=None):
     """
     Save the enhanced event data to CSV file.
     
     Args:
         df (pandas.DataFrame): DataFrame to save
         filename (str): Output filename
+        profile (dict): Data-quality profile of df (computed if not given)
     """
     try:
         # Save to CSV
         df.to_csv(filename, index=False)
         print(f"✅ Enhanced data saved to: {filename}")
         
+        if profile is None:
+            profile = profile_events(df)
+        
         # Display summary statistics
         print(f"\n📊 Data Summary:")
-        print(f"Total events: {len(df)}")
-        print(f"Events with images: {df['Artist_Image'].notna().sum()}")
-        print(f"Events with times: {df['Time'].notna().sum()}")
-        print(f"Unique venues: {df['Location'].nunique()}")
+        print(f"Total events: {profile['row_count']}")
+        print(f"Events with images: {profile['row_count'] - profile['null_counts']['Artist_Image']}")
+        print(f"Events with times: {profile['row_count'] - profile['null_counts']['Time']}")
+        print(f"Unique venues: {len(profile['venue_counts'])}")
         
         # Show sample of venues
         print(f"\n🏢 Venues found:")
-        for venue in df['Location'].unique():
-            if pd.notna(venue):
-                event_count = len(df[df['Location'] == venue])
-                print(f"  - {venue}: {event_count} events")
+        for venue, event_count in profile['venue_counts'].items():
+            print(f"  - {venue}: {event_count} events")
         
     except Exception as e:
         print(f"❌ Error saving data: {str(e)}")
 
-def validate_data_quality(df):
+def validate_data_quality(df, profile=None):
     """
     Perform data quality checks on the scraped data.
     
     Args:
         df (pandas.DataFrame): DataFrame to validate
+        profile (dict): Data-quality profile of df (computed if not given)
+        
+    Returns:
+        dict: Data-quality profile including the overall `passed` flag
     """
     print("🔍 Performing data quality validation...")
     
-    # Check for missing data
-    missing_data = df.isnull().sum()
-    print(f"\n📋 Missing data summary:")
-    for column, missing_count in missing_data.items():
-        percentage = (missing_count / len(df)) * 100
-        print(f"  {column}: {missing_count} ({percentage:.1f}%)")
-    
-    # Check for duplicate events
-    duplicates = df.duplicated(subset=['Artist', 'Location', 'Date']).sum()
-    print(f"\n🔄 Duplicate events: {duplicates}")
-    
-    # Check date range
-    if 'Date' in df.columns:
-        valid_dates = pd.to_datetime(df['Date'], errors='coerce')
-        date_range = valid_dates.dropna()
-        if not date_range.empty:
-            print(f"\n📅 Date range: {date_range.min().date()} to {date_range.max().date()}")
-    
-    # Check image download success
-    if 'Artist_Image' in df.columns:
-        images_downloaded = df['Artist_Image'].notna().sum()
-        total_events = len(df)
-        success_rate = (images_downloaded / total_events) * 100
-        print(f"\n🖼️ Image download success rate: {success_rate:.1f}% ({images_downloaded}/{total_events})")
-    
-    print("✅ Data validation completed!")
+    if profile is None:
+        profile = profile_events(df, load_rules(), load_previous_report())
+    print_report(profile)
+    
+    save_report(profile)
+    if profile['passed']:
+        print("✅ Data validation completed!")
+    else:
+        print("❌ Data validation failed: one or more quality checks did not pass")
+    return profile
 
 def main():
     """
     Main function to orchestrate the scraping process.
     """
+    parser = argparse.ArgumentParser(description='Scrape SongKick events for the Lexington GigMap')
+    parser.add_argument('--enrich', action='store_true',
+                        help='add genres, tour status and similar artists from artist pages')
+    args = parser.parse_args()
+    
     print("🎵 Enhanced SongKick Scraper for Lexington GigMap")
     print("=" * 50)
     
@@ -396,6 +302,10 @@ def main():
         print("❌ No data was scraped. Exiting.")
         sys.exit(1)
     
+    # Generate thumbnails and WebP variants for new or changed images
+    variant_stats = generate_variants(ARTIST_IMAGES_DIR)
+    print(f"🖼️  Image variants: {variant_stats['rendered']} rendered, {variant_stats['unchanged']} unchanged")
+    
     # Display initial results
     print(f"\n📊 Initial scraped data:")
     print(events_df.head())
@@ -412,28 +322,45 @@ def main():
     # Clean location data
     final_df = clean_location_data(processed_df)
     
+    # Remove repeated concerts, keyed on the Songkick concert/festival ID
+    deduplicator = EventDeduplicator()
+    final_df = deduplicator.dedupe_dataframe(final_df, SONGKICK_URL, link='Artist_Link')
+    deduplicator.save()
+    print(f"Duplicate events removed: {deduplicator.duplicates}")
+    
     # Reorder columns for better readability
     column_order = [
         'Artist', 'Location', 'Date', 'Time', 'Datetime', 
-        'Artist_Link', 'Artist_Image', 'Time_Text'
+        'Artist_Link', 'Artist_Image', 'Time_Text', 'Event_Key'
     ]
+    
+    # Optionally add genres, tour status and similar artists (cached per artist)
+    if args.enrich:
+        enricher = ArtistEnricher(SESSION)
+        final_df = enricher.enrich_dataframe(final_df, link='Artist_Link')
+        enricher.save()
+        print(f"Artists enriched: {enricher.fetched} fetched, {len(enricher.cache)} cached")
+        column_order += list(ENRICHMENT_COLUMNS.values())
     final_df = final_df[column_order]
     
     print(f"\n📋 Final processed data:")
     print(final_df.head())
     print(f"Total events in final dataset: {len(final_df)}")
     
+    # Profile the final data once for the summary and the quality checks
+    profile = profile_events(final_df, load_rules(), load_previous_report())
+    
     # Step 3: Save enhanced data
     print("\n" + "=" * 50)
     print("STEP 3: Saving enhanced data")
     print("=" * 50)
-    save_enhanced_data(final_df, OUTPUT_CSV)
+    save_enhanced_data(final_df, OUTPUT_CSV, profile)
     
     # Step 4: Validate data quality
     print("\n" + "=" * 50)
     print("STEP 4: Data quality validation")
     print("=" * 50)
-    validate_data_quality(final_df)
+    validate_data_quality(final_df, profile)
     
     # Final summary
     print("\n" + "=" * 50)
@@ -447,6 +374,9 @@ def main():
     print("2. Update your GeoJSON merge process to use the new column names")
     print("3. Consider adding more data sources for comprehensive coverage")
     print("4. Implement periodic scraping for automatic updates")
+    
+    if not profile['passed']:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
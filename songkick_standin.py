@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Local Songkick Stand-in Server
+
+Concurrency, rate limiting and retries can't be load-tested against the real
+site, so this serves generated metro-area listing pages from a local HTTP
+server instead:
+
+- paginated listing pages using Songkick's `event-listings-element` markup,
+  with venues from shp/venues.shp so events join to the map
+- artist images (small generated JPEGs; every 10th artist shares a
+  placeholder, like Songkick's default image)
+- injected faults: added latency, 429 responses with Retry-After, hung
+  responses that trip client timeouts, and malformed event entries
+
+Faults are drawn from a seeded random generator, and every request is
+counted by kind and status so a harness can compare what the scraper saw
+with what the server did (see load_test.py).
+
+Usage:
+    python songkick_standin.py [--port 8765] [--pages 5] [--events-per-page 50]
+                               [--latency 0.05] [--throttle-rate 0.1]
+                               [--timeout-rate 0.02] [--malformed-rate 0.05]
+"""
+
+import argparse
+import io
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from PIL import Image, ImageDraw
+
+METRO_AREA_PATH = '/metro-areas/24580-us-lexington'
+
+# Venues from shp/venues.shp, so stand-in events are mapped
+VENUES = (
+    'The Burl', 'The Green Lantern', 'Manchester Music Hall', "Al's Bar",
+    'Lexington Opera House', 'Break Room', 'Kentucky Theater', 'Rupp Arena',
+    'Tin Roof', 'Lyric Theater',
+)
+CITY_SUFFIX = ',Lexington, KY, US'
+
+# Every Nth artist uses the shared placeholder image
+PLACEHOLDER_EVERY = 10
+IMAGE_SIZE = (120, 120)
+
+# Kinds of malformed entries injected into listing pages
+MALFORMED_KINDS = ('no_artist', 'no_time', 'no_image', 'bad_datetime')
+
+
+class StandinConfig:
+    """
+    Content and fault settings for the stand-in server.
+
+    Args:
+        pages (int): Number of listing pages
+        events_per_page (int): Events on each page
+        latency (float): Added delay per response in seconds
+        latency_jitter (float): Random extra delay, up to this many seconds
+        throttle_rate (float): Fraction of requests answered with 429
+        retry_after (float): Retry-After seconds sent with 429 responses
+        max_rps (float): Answer 429 when more requests than this arrive
+            within one second (0 to disable)
+        timeout_rate (float): Fraction of requests that hang
+        hang (float): Seconds a hung request stalls before answering
+        malformed_rate (float): Fraction of events with broken markup
+        seed (int): Seed for content and fault decisions
+    """
+
+    def __init__(self, pages=5, events_per_page=50, latency=0.0, latency_jitter=0.0,
+                 throttle_rate=0.0, retry_after=1.0, max_rps=0.0, timeout_rate=0.0,
+                 hang=11.0, malformed_rate=0.0, seed=0):
+        self.pages = pages
+        self.events_per_page = events_per_page
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.max_rps = max_rps
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.malformed_rate = malformed_rate
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def generate_events(config):
+    """
+    Generate the events listed by the stand-in, page by page.
+
+    Returns:
+        list: One list of event dicts per page
+    """
+    rng = random.Random(config.seed)
+    start = date.today()
+    pages = []
+    for page_number in range(config.pages):
+        events = []
+        for position in range(config.events_per_page):
+            number = page_number * config.events_per_page + position + 1
+            event_date = start + timedelta(days=number % 60)
+            hour = rng.choice((18, 19, 20, 21))
+            events.append({
+                'id': 90000000 + number,
+                'artist': f"Stand-in Artist {number:05d}",
+                'venue': rng.choice(VENUES),
+                'date': event_date.isoformat(),
+                'datetime': f"{event_date.isoformat()}T{hour:02d}:00:00-0500",
+                'image': 'placeholder' if number % PLACEHOLDER_EVERY == 0 else str(number),
+                'malformed': (rng.choice(MALFORMED_KINDS)
+                              if rng.random() < config.malformed_rate else None)
+            })
+        pages.append(events)
+    return pages
+
+
+def render_event(event, image_base):
+    """
+    Render one event as Songkick `event-listings-element` markup.
+    """
+    slug = event['artist'].lower().replace(' ', '-')
+    malformed = event['malformed']
+
+    if malformed == 'no_image':
+        thumb = '<a class="thumb" href="#"><img class="artist-profile-image" alt=""></a>'
+    else:
+        image_url = f"{image_base}/images/{event['image']}.jpg"
+        thumb = (f'<a class="thumb" href="/concerts/{event["id"]}-{slug}">'
+                 f'<img class="artist-profile-image" data-src="{escape(image_url)}" alt=""></a>')
+
+    if malformed == 'no_artist':
+        artists = '<p class="artists"><a href="#"></a></p>'
+    else:
+        artists = (f'<p class="artists"><a href="/concerts/{event["id"]}-{slug}">'
+                   f'<strong>{escape(event["artist"])}</strong></a></p>')
+
+    if malformed == 'no_time':
+        time_tag = ''
+    elif malformed == 'bad_datetime':
+        time_tag = '<time datetime="TBA">TBA</time>'
+    else:
+        time_tag = f'<time datetime="{event["datetime"]}">{event["date"]}</time>'
+
+    return (f'<li class="event-listings-element">{time_tag}{thumb}'
+            f'<div class="event-details">{artists}'
+            f'<p class="location">{escape(event["venue"] + CITY_SUFFIX)}</p></div></li>')
+
+
+def render_listing_page(events, page_number, page_count, query, image_base):
+    """
+    Render a listing page with a rel="next" link to the following page.
+    """
+    items = '\n'.join(render_event(event, image_base) for event in events)
+    next_link = ''
+    if page_number < page_count:
+        params = {key: values[0] for key, values in query.items()}
+        params['page'] = page_number + 1
+        next_link = f'<a rel="next" class="next_page" href="{METRO_AREA_PATH}?{escape(urlencode(params))}">Next</a>'
+    return (f'<!DOCTYPE html><html><head><title>Lexington concerts (stand-in)</title></head><body>'
+            f'<ul class="event-listings">\n{items}\n</ul><div class="pagination">{next_link}</div>'
+            f'</body></html>')
+
+
+def render_image(key):
+    """
+    Generate a small JPEG of random blocks seeded by the image key.
+
+    Flat colours would all look alike to the perceptual hash in
+    image_store.py, so each key gets its own pattern.
+    """
+    rng = random.Random(key)
+    image = Image.new('RGB', IMAGE_SIZE)
+    draw = ImageDraw.Draw(image)
+    block = IMAGE_SIZE[0] // 8
+    for x in range(0, IMAGE_SIZE[0], block):
+        for y in range(0, IMAGE_SIZE[1], block):
+            shade = rng.randrange(256)
+            draw.rectangle([x, y, x + block - 1, y + block - 1], fill=(shade, shade, rng.randrange(256)))
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=80)
+    return buffer.getvalue()
+
+
+class StandinServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding the generated site and request counters.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, config, host='127.0.0.1', port=0):
+        super().__init__((host, port), StandinHandler)
+        self.config = config
+        self.pages = generate_events(config)
+        self.rng = random.Random(config.seed + 1)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        self.recent = []
+        self.images = {}
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def metro_area_url(self):
+        return self.base_url + METRO_AREA_PATH
+
+    def expected_events(self, pages=None):
+        """
+        Count listed events, and those a parser should accept.
+
+        Returns:
+            tuple: (listed, parseable)
+        """
+        events = [event for page in self.pages[:pages] for event in page]
+        return len(events), sum(1 for event in events if event['malformed'] != 'no_artist')
+
+    def draw_faults(self):
+        """
+        Decide the faults for one request.
+
+        Returns:
+            tuple: (delay in seconds, throttle?, hang?)
+        """
+        config = self.config
+        with self.lock:
+            now = time.monotonic()
+            self.recent = [t for t in self.recent if now - t < 1.0]
+            self.recent.append(now)
+            over_limit = config.max_rps > 0 and len(self.recent) > config.max_rps
+            delay = config.latency + self.rng.uniform(0, config.latency_jitter)
+            throttle = over_limit or self.rng.random() < config.throttle_rate
+            hang = not throttle and self.rng.random() < config.timeout_rate
+        return delay, throttle, hang
+
+    def image(self, key):
+        with self.lock:
+            content = self.images.get(key)
+            if content is None:
+                content = self.images[key] = render_image(key)
+        return content
+
+    def count(self, *keys):
+        with self.lock:
+            self.stats.update(keys)
+
+    def snapshot_stats(self):
+        """
+        Copy of the request counters.
+        """
+        with self.lock:
+            return dict(self.stats)
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats.clear()
+
+    def start(self):
+        """
+        Serve in a background thread.
+        """
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """
+    Serves listing pages, images and the `/__stats` counters.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        if parts.path == '/__stats':
+            self.send_body(200, json.dumps(server.snapshot_stats()).encode('utf-8'), 'application/json')
+            return
+
+        if parts.path == METRO_AREA_PATH:
+            kind = 'listing'
+        elif parts.path.startswith('/images/'):
+            kind = 'image'
+        else:
+            kind = 'other'
+        server.count('requests', f"{kind}_requests")
+
+        delay, throttle, hang = server.draw_faults()
+        if delay:
+            time.sleep(delay)
+        if throttle:
+            server.count('throttled', f"{kind}_throttled")
+            self.send_body(429, b'Too Many Requests', 'text/plain',
+                           {'Retry-After': f"{server.config.retry_after:g}"})
+            return
+        if hang:
+            server.count('hung', f"{kind}_hung")
+            time.sleep(server.config.hang)
+
+        if kind == 'listing':
+            query = parse_qs(parts.query)
+            try:
+                page_number = int(query.get('page', ['1'])[0])
+            except ValueError:
+                page_number = 1
+            if not 1 <= page_number <= len(server.pages):
+                self.send_error_body(404)
+                return
+            body = render_listing_page(server.pages[page_number - 1], page_number,
+                                       len(server.pages), query, server.base_url)
+            self.send_body(200, body.encode('utf-8'), 'text/html; charset=utf-8')
+        elif kind == 'image':
+            key = parts.path[len('/images/'):].removesuffix('.jpg')
+            self.send_body(200, server.image(key), 'image/jpeg')
+        else:
+            self.send_error_body(404)
+
+    def send_error_body(self, status):
+        self.send_body(status, b'Not Found', 'text/plain')
+
+    def send_body(self, status, body, content_type, headers=None):
+        self.server.count(f"status_{status}")
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (e.g. timed out) before the response was sent
+            self.server.count('client_disconnects')
+
+
+def add_config_arguments(parser):
+    """
+    Add the stand-in's content and fault options to an argument parser.
+    """
+    defaults = StandinConfig()
+    parser.add_argument('--pages', type=int, default=defaults.pages, help='listing pages')
+    parser.add_argument('--events-per-page', type=int, default=defaults.events_per_page, help='events per page')
+    parser.add_argument('--latency', type=float, default=defaults.latency, help='added delay per response (s)')
+    parser.add_argument('--latency-jitter', type=float, default=defaults.latency_jitter,
+                        help='random extra delay, up to this many seconds')
+    parser.add_argument('--throttle-rate', type=float, default=defaults.throttle_rate,
+                        help='fraction of requests answered with 429')
+    parser.add_argument('--retry-after', type=float, default=defaults.retry_after,
+                        help='Retry-After seconds on 429 responses')
+    parser.add_argument('--max-rps', type=float, default=defaults.max_rps,
+                        help='answer 429 above this many requests per second (0 = off)')
+    parser.add_argument('--timeout-rate', type=float, default=defaults.timeout_rate,
+                        help='fraction of requests that hang')
+    parser.add_argument('--hang', type=float, default=defaults.hang,
+                        help='seconds a hung request stalls (images time out after 10s, pages after 30s)')
+    parser.add_argument('--malformed-rate', type=float, default=defaults.malformed_rate,
+                        help='fraction of events with broken markup')
+    parser.add_argument('--seed', type=int, default=defaults.seed, help='random seed')
+
+
+def config_from_args(args):
+    """
+    Build a StandinConfig from parsed add_config_arguments options.
+    """
+    return StandinConfig(**{key: getattr(args, key) for key in StandinConfig().to_dict()})
+
+
+def main():
+    """
+    Run the stand-in server in the foreground.
+    """
+    parser = argparse.ArgumentParser(description='Serve generated Songkick listing pages locally')
+    parser.add_argument('--host', default='127.0.0.1', help='address to bind')
+    parser.add_argument('--port', type=int, default=8765, help='port to listen on')
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = StandinServer(config_from_args(args), args.host, args.port)
+    listed, parseable = server.expected_events()
+    print(f"🎤 Serving {len(server.pages)} pages ({listed} events, {parseable} parseable)")
+    print(f"🔗 {server.metro_area_url}")
+    print(f"📊 Request counters at {server.base_url}/__stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Dependency-Aware Stage Runner
+
+run_complete_pipeline runs every stage on every run, and the GeoJSON
+follow-up scripts are run by hand afterwards. This module runs pipeline
+stages as a small DAG instead and skips work whose inputs have not changed.
+
+Each stage declares the stages it depends on, the files it reads and writes
+and the config that affects its output. Before a stage runs, its fingerprint
+is computed from its config and the content hashes of its input files
+(including every output of the stages it depends on). The stage is skipped
+when the fingerprint matches the last successful run and its outputs are
+still on disk, unchanged:
+
+    stage_state.json
+    {
+        "merge": {
+            "fingerprint": "...",
+            "outputs": {"shp/merged_venues_events.geojson": "<sha256>"},
+            "completed_at": "..."
+        }
+    }
+
+Because downstream fingerprints hash upstream outputs, a stage that reruns
+but produces identical files does not invalidate the stages after it. A
+volatile stage (the scrape, whose real input is the live listing) is never
+fresh: it runs on every run that selects it, and the stages after it are
+skipped when it fetched the same events as last time.
+
+Running named stages forces them and re-checks everything that depends on
+them, so re-merging after editing shp/venues.shp does not re-scrape:
+
+    runner = StageRunner(stages)
+    runner.run(['merge'])
+
+The pipeline's stages are defined in automated_scraper.py
+(LexingtonEventScraper.pipeline_stages).
+
+Usage:
+    python stage_runner.py                     # show which stages are stale
+    python automated_scraper.py --staged [--stage merge] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+from image_variants import file_hash
+
+STAGE_STATE_FILE = 'stage_state.json'
+
+# Intermediate outputs of stages that have no file of their own in the repo
+STAGE_CACHE_DIR = 'stage_cache'
+
+
+class Stage:
+    """
+    One pipeline step: a callable with declared dependencies, files and config.
+    """
+
+    def __init__(self, name, run, deps=(), inputs=(), outputs=(), config=None, volatile=False,
+                 description=''):
+        """
+        Args:
+            name (str): Stage name
+            run (callable): Does the work; returns False on failure
+            deps: Names of the stages this one runs after
+            inputs: Files read besides the outputs of deps (data, code)
+            outputs: Files the stage writes
+            config (dict): JSON-serializable settings that affect the output
+            volatile (bool): Reads something outside its inputs (e.g. a live
+                site), so it runs whenever it is selected
+            description (str): One line for status listings
+        """
+        self.name = name
+        self.run = run
+        self.deps = tuple(deps)
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.config = config or {}
+        self.volatile = volatile
+        self.description = description
+
+
+def topological_order(stages):
+    """
+    Order stages so each comes after its dependencies, keeping the declared
+    order where dependencies allow.
+
+    Raises:
+        ValueError: On duplicate names, unknown dependencies or cycles
+    """
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage: {stage.name}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+
+    ordered = []
+    placed = set()
+    while len(ordered) < len(stages):
+        ready = [stage for stage in stages
+                 if stage.name not in placed and all(dep in placed for dep in stage.deps)]
+        if not ready:
+            cycle = sorted(stage.name for stage in stages if stage.name not in placed)
+            raise ValueError(f"Stage dependencies form a cycle: {', '.join(cycle)}")
+        ordered.append(ready[0])
+        placed.add(ready[0].name)
+    return ordered
+
+
+class StageRunner:
+    """
+    Run a DAG of stages, skipping those whose fingerprint has not changed.
+    """
+
+    def __init__(self, stages, state_path=STAGE_STATE_FILE):
+        self.order = topological_order(list(stages))
+        self.stages = {stage.name: stage for stage in self.order}
+        self.state_path = state_path
+        self.state = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def save(self):
+        """
+        Write the stage state atomically.
+        """
+        temp_path = self.state_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.state_path)
+
+    # Fingerprints
+
+    def input_paths(self, stage):
+        """
+        Files a stage reads: its own inputs plus the outputs of its dependencies.
+        """
+        paths = list(stage.inputs)
+        for dep in stage.deps:
+            paths.extend(self.stages[dep].outputs)
+        return sorted(set(paths))
+
+    def fingerprint(self, stage):
+        """
+        Hash of a stage's config and the current content of its inputs.
+        """
+        inputs = {path: file_hash(path) if os.path.exists(path) else None
+                  for path in self.input_paths(stage)}
+        payload = json.dumps({'stage': stage.name, 'config': stage.config, 'inputs': inputs},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def is_fresh(self, stage, fingerprint=None):
+        """
+        Check whether a stage's last successful run is still valid: same
+        fingerprint, and every output still present with the content it wrote.
+        """
+        entry = self.state.get(stage.name)
+        if stage.volatile or not entry or entry.get('fingerprint') != (fingerprint or self.fingerprint(stage)):
+            return False
+        recorded = entry.get('outputs', {})
+        for path in stage.outputs:
+            if not os.path.exists(path) or file_hash(path) != recorded.get(path):
+                return False
+        return True
+
+    # Selection
+
+    def dependents(self, names):
+        """
+        The named stages and every stage that depends on them, in run order.
+
+        Raises:
+            ValueError: If a name is not a stage
+        """
+        for name in names:
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name} (stages: {', '.join(self.stages)})")
+        selected = set(names)
+        for stage in self.order:
+            if any(dep in selected for dep in stage.deps):
+                selected.add(stage.name)
+        return [stage for stage in self.order if stage.name in selected]
+
+    def status(self):
+        """
+        List (name, fresh, description) for every stage in run order.
+        """
+        return [(stage.name, self.is_fresh(stage), stage.description) for stage in self.order]
+
+    # Running
+
+    def run(self, targets=None, force=False):
+        """
+        Run stale stages in dependency order.
+
+        Args:
+            targets: Stage names to rerun along with everything depending on
+                them; upstream stages are left alone. None runs the whole DAG.
+            force (bool): Rerun every selected stage, even if it is fresh
+
+        Returns:
+            dict: Stage names that ran, were skipped, failed, or were blocked
+            by a failed dependency
+        """
+        selected = self.dependents(targets) if targets else self.order
+        forced = set(stage.name for stage in selected) if force else set(targets or ())
+        result = {'ran': [], 'skipped': [], 'failed': [], 'blocked': []}
+
+        for stage in selected:
+            if any(dep in result['failed'] or dep in result['blocked'] for dep in stage.deps):
+                result['blocked'].append(stage.name)
+                continue
+
+            fingerprint = self.fingerprint(stage)
+            if stage.name not in forced and self.is_fresh(stage, fingerprint):
+                logging.info(f"Stage {stage.name}: unchanged, using cached outputs")
+                result['skipped'].append(stage.name)
+                continue
+
+            logging.info(f"Stage {stage.name}: running")
+            try:
+                succeeded = stage.run() is not False
+            except Exception as e:
+                logging.error(f"Stage {stage.name} raised: {str(e)}")
+                succeeded = False
+
+            if not succeeded:
+                logging.error(f"Stage {stage.name} failed; stages depending on it were not run")
+                self.state.pop(stage.name, None)
+                self.save()
+                result['failed'].append(stage.name)
+                continue
+
+            self.state[stage.name] = {
+                'fingerprint': fingerprint,
+                'outputs': {path: file_hash(path) for path in stage.outputs if os.path.exists(path)},
+                'completed_at': datetime.now().isoformat(timespec='seconds')
+            }
+            self.save()
+            result['ran'].append(stage.name)
+
+        logging.info(f"Stages ran: {', '.join(result['ran']) or 'none'}; "
+                     f"skipped: {', '.join(result['skipped']) or 'none'}")
+        return result
+
+
+def main():
+    """
+    Show which pipeline stages would run, from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Show the state of the pipeline stages')
+    parser.add_argument('--months-ahead', type=int, default=2, help='date range of the scrape stage')
+    parser.add_argument('--enrich', action='store_true', help='include artist enrichment in the config')
+    args = parser.parse_args()
+
+    from automated_scraper import LexingtonEventScraper
+    stages = LexingtonEventScraper().pipeline_stages(args.months_ahead, args.enrich)
+    runner = StageRunner(stages)
+    for name, fresh, description in runner.status():
+        stage = runner.stages[name]
+        deps = f" (after {', '.join(stage.deps)})" if stage.deps else ''
+        print(f"  {'✅ fresh' if fresh else '🔄 stale'}  {name:<10} {description}{deps}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Streaming Scrape Pipeline for the Lexington Gig Map
+
+Runs the scrape as a chain of generators instead of collecting every event
+into a DataFrame first:
+
+    listing pages -> events -> normalized rows -> venue join -> output
+
+Each page's rows are appended to the CSV and to a GeoJSON sequence file
+(one feature per line) as soon as the page is processed, so partial output is
+usable while a long crawl is still running and memory stays bounded by the
+size of one page. When the crawl finishes, the feature sequence is streamed
+into the regular FeatureCollection used by the map.
+"""
+
+import csv
+import json
+import logging
+import os
+
+from bs4 import BeautifulSoup
+
+from event_extraction import (
+    iter_event_records, find_next_page_url, split_datetime_value,
+    imperial_time, clean_location
+)
+from venue_registry import open_registry
+
+# CSV columns written by the streaming pipeline (same as the batch pipeline)
+CSV_COLUMNS = ['Artist', 'Location', 'Datetime', 'Artist Link', 'Artist Image', 'Date', 'Time', 'Event_Key']
+
+# GeoJSON property names for the optional artist enrichment columns
+ENRICHMENT_PROPERTIES = {
+    'Genres': 'Genres',
+    'On_Tour': 'OnTour',
+    'Similar_Artists': 'SimilarArtists'
+}
+
+
+def iter_pages(session, url, max_pages=None):
+    """
+    Fetch listing pages, following pagination links.
+
+    Args:
+        session: requests.Session (or compatible) used for fetching
+        url (str): URL of the first listing page
+        max_pages (int): Stop after this many pages (None for all)
+
+    Yields:
+        tuple: (page URL, next page URL or None, parsed BeautifulSoup page)
+    """
+    page_count = 0
+    while url and (max_pages is None or page_count < max_pages):
+        logging.info(f"Fetching listing page {page_count + 1}: {url}")
+        response = session.get(url, timeout=30)
+        response.raise_for_status()
+
+        page = BeautifulSoup(response.content, 'html.parser')
+        next_url = find_next_page_url(page, url)
+        yield url, next_url, page
+
+        page_count += 1
+        url = next_url
+
+
+def iter_page_events(pages):
+    """
+    Parse every page into a list of EventRecords.
+
+    Records are grouped per page so that output can be flushed page by page.
+
+    Args:
+        pages: Iterable of (page URL, next page URL, BeautifulSoup page)
+
+    Yields:
+        tuple: (page URL, next page URL, list of EventRecords for the page)
+    """
+    for url, next_url, page in pages:
+        yield url, next_url, list(iter_event_records(page))
+
+
+def normalize_record(record):
+    """
+    Turn an EventRecord into an output row with date, imperial time and
+    cleaned venue name.
+
+    Args:
+        record (EventRecord): Parsed event
+
+    Returns:
+        dict: Row keyed by CSV column name, plus the source 'Image URL'
+        for the image download step
+    """
+    date, time_24h = split_datetime_value(record.datetime)
+    return {
+        'Artist': record.artist,
+        'Location': clean_location(record.location),
+        'Datetime': record.datetime,
+        'Artist Link': record.artist_link,
+        'Artist Image': record.image_path,
+        'Date': date,
+        'Time': imperial_time(time_24h),
+        'Image URL': record.image_url
+    }
+
+
+def load_venue_points(registry=None):
+    """
+    Load venue points into a dict for constant-time joins.
+
+    Args:
+        registry (VenueRegistry): Venue registry (the default registry if None)
+
+    Returns:
+        dict: Venue name or alias -> (id, [lon, lat])
+    """
+    if registry is not None:
+        return registry.points()
+    with open_registry() as registry:
+        return registry.points()
+
+
+def join_venue(row, venues):
+    """
+    Build a GeoJSON feature for a row whose venue is known.
+
+    Args:
+        row (dict): Normalized event row
+        venues (dict): Venue name -> (id, [lon, lat])
+
+    Returns:
+        dict: GeoJSON feature, or None if the venue has no point location
+    """
+    venue = venues.get(row['Location'])
+    if venue is None:
+        return None
+
+    venue_id, coordinates = venue
+    return {
+        'type': 'Feature',
+        'properties': {
+            'id': venue_id,
+            'Venue': row['Location'],
+            'Artist': row['Artist'],
+            'Location': row['Location'],
+            'Datetime': row['Datetime'],
+            'ArtistLink': row['Artist Link'],
+            'ArtistImage': row['Artist Image'],
+            'Date': row['Date'],
+            'Time': row['Time'],
+            'EventKey': row.get('Event_Key'),
+            **{
+                property_name: row[column]
+                for column, property_name in ENRICHMENT_PROPERTIES.items()
+                if column in row
+            }
+        },
+        'geometry': {'type': 'Point', 'coordinates': coordinates}
+    }
+
+
+class CsvAppendWriter:
+    """
+    Append rows to a CSV file, flushing after every batch.
+    """
+
+    def __init__(self, filename, columns=CSV_COLUMNS, append=False):
+        exists = append and os.path.exists(filename) and os.path.getsize(filename) > 0
+        self.file = open(filename, 'a' if exists else 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=columns, extrasaction='ignore')
+        if not exists:
+            self.writer.writeheader()
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class GeoJsonFeatureWriter:
+    """
+    Append GeoJSON features to a newline-delimited sequence file during the
+    crawl and assemble the final FeatureCollection on close.
+    """
+
+    def __init__(self, filename, name='merged_venues_events', append=False):
+        self.filename = filename
+        self.sequence_filename = os.path.splitext(filename)[0] + '.geojsonl'
+        self.name = name
+        self.file = open(self.sequence_filename, 'a' if append else 'w', encoding='utf-8')
+
+    def write_features(self, features):
+        for feature in features:
+            self.file.write(json.dumps(feature, ensure_ascii=False))
+            self.file.write('\n')
+        self.file.flush()
+
+    def close(self, finalize=True):
+        """
+        Close the sequence file and stream it into the FeatureCollection.
+
+        Args:
+            finalize (bool): Write the FeatureCollection; pass False after a
+                failed crawl to keep the previous map data in place
+        """
+        self.file.close()
+        if not finalize:
+            return
+
+        temp_filename = self.filename + '.tmp'
+        with open(self.sequence_filename, 'r', encoding='utf-8') as source, \
+                open(temp_filename, 'w', encoding='utf-8') as target:
+            target.write('{\n"type": "FeatureCollection",\n')
+            target.write(f'"name": "{self.name}",\n')
+            target.write('"crs": { "type": "name", "properties": { "name": "urn:ogc:def:crs:OGC:1.3:CRS84" } },\n')
+            target.write('"features": [\n')
+            first = True
+            for line in source:
+                line = line.strip()
+                if not line:
+                    continue
+                if not first:
+                    target.write(',\n')
+                target.write(line)
+                first = False
+            target.write('\n]\n}\n')
+        os.replace(temp_filename, self.filename)
+
+
+def run_streaming_pipeline(session, url, csv_filename, geojson_filename,
+                           registry=None, download_image=None,
+                           max_pages=None, deduplicator=None, enricher=None,
+                           checkpoint=None):
+    """
+    Scrape, normalize, join and write events one page at a time.
+
+    Args:
+        session: requests.Session (or compatible) used for fetching pages
+        url (str): URL of the first listing page
+        csv_filename (str): CSV output path
+        geojson_filename (str): GeoJSON output path
+        registry (VenueRegistry): Venues to join against (the default
+            registry if None)
+        download_image (callable): Optional (image_url, artist) -> local path
+        max_pages (int): Stop after this many pages (None for all)
+        deduplicator (EventDeduplicator): Drops events already seen on an
+            earlier page; its registry is saved when the crawl completes
+        enricher (ArtistEnricher): Adds artist genres, tour status and
+            similar artists to each page's rows; its cache is saved at the end
+        checkpoint (RunCheckpoint): Records each written page; if it holds
+            pages from an interrupted run, output is appended after them and
+            the crawl continues from the next page
+
+    Returns:
+        dict: Counts of pages, events, mapped events, duplicates and
+        unmapped venues
+    """
+    venues = load_venue_points(registry)
+    stats = {'pages': 0, 'events': 0, 'mapped': 0, 'duplicates': 0, 'unmapped_venues': set()}
+
+    resume = checkpoint is not None and bool(checkpoint.pages)
+    if resume:
+        # Continue after the pages already written by the interrupted run
+        stats['pages'] = len(checkpoint.pages)
+        stats['events'] = sum(page['events'] for page in checkpoint.pages)
+        stats['mapped'] = sum(page['mapped'] for page in checkpoint.pages)
+        stats['unmapped_venues'].update(checkpoint.state['unmapped_venues'])
+        if deduplicator is not None:
+            deduplicator.run_keys.update(checkpoint.state['event_keys'])
+        url = checkpoint.next_url
+        if max_pages is not None:
+            max_pages = max(0, max_pages - stats['pages'])
+        logging.info(f"Resuming crawl after {stats['pages']} pages ({stats['events']} events)")
+
+    columns = CSV_COLUMNS + list(ENRICHMENT_PROPERTIES) if enricher is not None else CSV_COLUMNS
+    csv_writer = CsvAppendWriter(csv_filename, columns, append=resume)
+    geojson_writer = GeoJsonFeatureWriter(geojson_filename, append=resume)
+    completed = False
+    try:
+        pages = iter_page_events(iter_pages(session, url, max_pages))
+        for page_number, (page_url, next_url, records) in enumerate(pages, stats['pages'] + 1):
+            rows = []
+            features = []
+            unmapped_venues = set()
+            page_rows = map(normalize_record, records)
+            if deduplicator is not None:
+                page_rows = deduplicator.filter_rows(page_rows, f"{url}#page={page_number}")
+            for row in page_rows:
+                if download_image and row['Image URL']:
+                    row['Artist Image'] = download_image(row['Image URL'], row['Artist'])
+                rows.append(row)
+
+            if enricher is not None:
+                enricher.enrich_rows(rows)
+                enricher.save()
+
+            for row in rows:
+                feature = join_venue(row, venues)
+                if feature is None:
+                    unmapped_venues.add(row['Location'])
+                else:
+                    features.append(feature)
+
+            csv_writer.write_rows(rows)
+            geojson_writer.write_features(features)
+
+            stats['pages'] += 1
+            stats['events'] += len(rows)
+            stats['mapped'] += len(features)
+            stats['unmapped_venues'].update(unmapped_venues)
+            if checkpoint is not None:
+                checkpoint.record_page(page_url, next_url, len(rows), len(features),
+                                       [row.get('Event_Key') for row in rows], unmapped_venues)
+            logging.info(f"Page {stats['pages']}: wrote {len(rows)} events ({len(features)} mapped)")
+        completed = True
+        if deduplicator is not None:
+            stats['duplicates'] = deduplicator.duplicates
+            deduplicator.save()
+    finally:
+        if enricher is not None:
+            enricher.save()
+        csv_writer.close()
+        geojson_writer.close(finalize=completed)
+
+    if stats['unmapped_venues']:
+        logging.warning(f"Venues without point locations: {sorted(map(str, stats['unmapped_venues']))}")
+    return stats
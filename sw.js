@@ -32,37 +32,147 @@ if (isLocalhost) {
   });
 } else {
   // Production service worker code
-  const CACHE_NAME = 'gigmap-v1';
-  const urlsToCache = [
-    './',
-    './index.html',
-    './styles.css',
-    './script.js',
-    './fonts/RobotoCondensed-VariableFont_wght.ttf',
-    './fonts/RobotoCondensed-Italic-VariableFont_wght.ttf',
-    './fonts/Archivo-VariableFont_wdth,wght.ttf',
-    './fonts/Archivo-Italic-VariableFont_wdth,wght.ttf'
-  ];
+  // Cache names are fixed: freshness comes from per-entry revisions in
+  // precache-manifest.json (written by the scraper pipeline), not from
+  // bumping the cache name by hand.
+  const PRECACHE_NAME = 'gigmap-precache';
+  const RUNTIME_CACHE_NAME = 'gigmap-runtime';
+  const MANIFEST_URL = new URL('./precache-manifest.json', self.registration.scope).href;
+
+  // Check the manifest at most this often when navigating
+  const SYNC_INTERVAL_MS = 60 * 1000;
 
   // Files that should bypass cache (dynamic data)
   const bypassCache = [
-    'merged_venues_events.geojson',
+    'precache-manifest.json',
+    'shp/version.json',
     'lexington_events_time_imperial_modified.csv',
     '/ws', // WebSocket connections
     'chrome-extension' // Browser extensions
   ];
 
+  let syncInProgress = null;
+  let lastSyncTime = 0;
+
+  function toAbsolute(url) {
+    return new URL(url, self.registration.scope).href;
+  }
+
+  function readCachedManifest(cache) {
+    return cache.match(MANIFEST_URL)
+      .then(response => response ? response.json() : { entries: [] })
+      .catch(() => ({ entries: [] }));
+  }
+
+  // Bring the precache in line with the latest manifest: fetch entries whose
+  // revision changed (or that were evicted), drop entries no longer listed,
+  // and leave everything else cached.
+  function syncPrecache() {
+    if (syncInProgress) {
+      return syncInProgress;
+    }
+
+    syncInProgress = caches.open(PRECACHE_NAME).then(cache =>
+      Promise.all([
+        fetch(MANIFEST_URL, { cache: 'no-store' }).then(response => {
+          if (!response.ok) {
+            throw new Error(`Precache manifest request failed: ${response.status}`);
+          }
+          return response.json();
+        }),
+        readCachedManifest(cache),
+        cache.keys()
+      ]).then(([manifest, previous, cachedRequests]) => {
+        const cachedUrls = new Set(cachedRequests.map(request => request.url));
+        const previousRevisions = new Map(
+          previous.entries.map(entry => [toAbsolute(entry.url), entry.revision])
+        );
+        const entries = manifest.entries.map(entry => ({
+          url: toAbsolute(entry.url),
+          revision: entry.revision
+        }));
+        const wanted = new Set(entries.map(entry => entry.url));
+
+        const updates = entries.map(entry => {
+          if (previousRevisions.get(entry.url) === entry.revision && cachedUrls.has(entry.url)) {
+            return Promise.resolve({ url: entry.url, revision: entry.revision });
+          }
+          // Revalidate against the server so the HTTP cache can't hand back the old file
+          return fetch(entry.url, { cache: 'no-cache' })
+            .then(response => {
+              if (!response.ok) {
+                throw new Error(`${response.status}`);
+              }
+              return cache.put(entry.url, response);
+            })
+            .then(() => ({ url: entry.url, revision: entry.revision }))
+            .catch(() => {
+              // Keep the old copy (if any) and retry on the next sync
+              const oldRevision = previousRevisions.get(entry.url);
+              return oldRevision && cachedUrls.has(entry.url)
+                ? { url: entry.url, revision: oldRevision }
+                : null;
+            });
+        });
+
+        const removals = cachedRequests
+          .filter(request => request.url !== MANIFEST_URL && !wanted.has(request.url))
+          .map(request => cache.delete(request));
+
+        return Promise.all([Promise.all(updates), Promise.all(removals)]).then(([stored]) => {
+          // Record what is actually cached, so failed entries are retried
+          const recorded = {
+            version: manifest.version,
+            entries: stored.filter(entry => entry !== null)
+          };
+          return cache.put(MANIFEST_URL, new Response(JSON.stringify(recorded), {
+            headers: { 'Content-Type': 'application/json' }
+          }));
+        });
+      })
+    ).finally(() => {
+      syncInProgress = null;
+      lastSyncTime = Date.now();
+    });
+
+    return syncInProgress;
+  }
+
+  function fetchAndCache(request) {
+    return fetch(request)
+      .then(response => {
+        // Only cache successful responses for HTML, CSS, JS
+        if (response && response.status === 200) {
+          const contentType = response.headers.get('content-type');
+          if (contentType && (
+            contentType.includes('text/html') ||
+            contentType.includes('text/css') ||
+            contentType.includes('application/javascript') ||
+            contentType.includes('font')
+          )) {
+            const responseToCache = response.clone();
+            caches.open(RUNTIME_CACHE_NAME)
+              .then(cache => {
+                cache.put(request, responseToCache);
+              });
+          }
+        }
+        return response;
+      })
+      .catch(() => {
+        // Return a basic error response instead of failing silently
+        return new Response('Network error', {
+          status: 408,
+          statusText: 'Request Timeout'
+        });
+      });
+  }
+
   // Install event
   self.addEventListener('install', event => {
     event.waitUntil(
-      caches.open(CACHE_NAME)
-        .then(cache => {
-          // Use addAll with error handling
-          return cache.addAll(urlsToCache).catch(() => {
-            // Continue even if some files fail
-            return Promise.resolve();
-          });
-        })
+      // Continue even if the manifest or some files fail
+      syncPrecache().catch(() => Promise.resolve())
     );
     // Skip waiting to activate new service worker immediately
     self.skipWaiting();
@@ -87,9 +197,23 @@ if (isLocalhost) {
     if (url.origin !== location.origin) {
       return; // Let browser handle normally
     }
+
+    // Each page load checks for a new manifest in the background
+    if (event.request.mode === 'navigate' && Date.now() - lastSyncTime > SYNC_INTERVAL_MS) {
+      event.waitUntil(syncPrecache().catch(() => Promise.resolve()));
+    }
+
+    // Requests made while a sync is running wait for it, so data files
+    // loaded right after navigation come from the updated precache. The
+    // page itself is served straight from cache.
+    const synced = event.request.mode === 'navigate' || !syncInProgress
+      ? Promise.resolve()
+      : syncInProgress.catch(() => Promise.resolve());
     
     event.respondWith(
-      caches.match(event.request)
+      synced
+        .then(() => caches.match(event.request, { ignoreSearch: true, cacheName: PRECACHE_NAME }))
+        .then(cachedResponse => cachedResponse || caches.match(event.request, { cacheName: RUNTIME_CACHE_NAME }))
         .then(cachedResponse => {
           // Return cached version if available
           if (cachedResponse) {
@@ -97,33 +221,7 @@ if (isLocalhost) {
           }
           
           // Otherwise, fetch from network
-          return fetch(event.request)
-            .then(response => {
-              // Only cache successful responses for HTML, CSS, JS
-              if (response && response.status === 200) {
-                const contentType = response.headers.get('content-type');
-                if (contentType && (
-                  contentType.includes('text/html') ||
-                  contentType.includes('text/css') ||
-                  contentType.includes('application/javascript') ||
-                  contentType.includes('font')
-                )) {
-                  const responseToCache = response.clone();
-                  caches.open(CACHE_NAME)
-                    .then(cache => {
-                      cache.put(event.request, responseToCache);
-                    });
-                }
-              }
-              return response;
-            })
-            .catch(() => {
-              // Return a basic error response instead of failing silently
-              return new Response('Network error', {
-                status: 408,
-                statusText: 'Request Timeout'
-              });
-            });
+          return fetchAndCache(event.request);
         })
     );
   });
@@ -134,12 +232,13 @@ if (isLocalhost) {
       caches.keys().then(cacheNames => {
         return Promise.all(
           cacheNames.map(cacheName => {
-            if (cacheName !== CACHE_NAME) {
+            // Also removes the old hand-versioned cache ('gigmap-v1')
+            if (cacheName !== PRECACHE_NAME && cacheName !== RUNTIME_CACHE_NAME) {
               return caches.delete(cacheName);
             }
           })
         );
-      })
+      }).then(() => self.clients.claim())
     );
   });
 }
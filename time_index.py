@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Sorted Epoch Time Index for Event Date-Range Queries
+
+Event dates travel through the pipeline as YYYY-MM-DD text plus a 12-hour
+Time string ("08:00 PM"), so every consumer that wanted "events in the next
+two weeks" parsed or string-compared them again. This module parses them
+once into epoch seconds and keeps the events sorted by start time, so a
+date-range query is two binary searches:
+
+    index = TimeIndex.from_frame(df)
+    index.positions(*window_bounds('weekend'))   # row positions, in time order
+
+Start times are the listing's wall-clock date and time in LOCAL_TIMEZONE;
+events without a time start at local midnight, so they fall inside any
+window that covers their day. Events without a usable date are left out.
+
+Named windows (see window_bounds):
+
+    tonight    today from midnight until 5 AM tomorrow
+    weekend    Friday through Sunday (the current weekend from Friday on)
+    <N>d       today and the next N-1 days, e.g. 14d
+
+The pipeline also exports the index of the map GeoJSON as a sidecar file, so
+the front end can run the same queries by bisecting the epoch list:
+
+    shp/time_index.json
+    {
+        "feature_count": 15, "first": {...}, "last": {...},
+        "timezone": "America/New_York",
+        "epochs": [1763701200, ...],     # sorted start times
+        "features": [0, 4, ...]          # GeoJSON feature offsets, same order
+    }
+
+Usage:
+    python time_index.py [geojson] [--output shp/time_index.json]
+    python time_index.py --window weekend [--csv events.csv]
+"""
+
+import argparse
+import json
+import os
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from event_schema import DATE_FORMAT, date_text, to_dates
+from map_index import GEOJSON_PATH, feature_fingerprint
+
+TIME_INDEX_PATH = 'shp/time_index.json'
+LOCAL_TIMEZONE = 'America/New_York'
+TIME_FORMAT = '%I:%M %p'
+
+# "Tonight" runs past midnight until this hour
+TONIGHT_END_HOUR = 5
+
+
+def event_epochs(df, timezone=LOCAL_TIMEZONE):
+    """
+    Start time of every event as epoch seconds, parsed in one vectorized pass.
+
+    Args:
+        df (pandas.DataFrame): Events with a Date column and optional Time
+        timezone (str): Timezone of the listed dates and times
+
+    Returns:
+        pandas.Series: Epoch seconds (nullable Int64, NA where the date is
+        missing or invalid), aligned with df
+    """
+    if 'Date' not in df.columns:
+        return pd.Series(pd.NA, index=df.index, dtype='Int64')
+
+    starts = to_dates(df['Date'])
+    if 'Time' in df.columns:
+        times = pd.to_datetime(df['Time'].astype(object), format=TIME_FORMAT, errors='coerce')
+        offsets = pd.to_timedelta(times.dt.hour * 3600 + times.dt.minute * 60, unit='s')
+        starts = starts + offsets.fillna(pd.Timedelta(0))
+
+    # DST: nonexistent times move forward, repeated ones use standard time
+    local = starts.dt.tz_localize(timezone, ambiguous=np.zeros(len(starts), dtype=bool),
+                                  nonexistent='shift_forward')
+    seconds = (local - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+    return seconds.astype('Int64')
+
+
+def to_epoch(value, timezone=LOCAL_TIMEZONE):
+    """
+    Convert a datetime, date string or epoch to epoch seconds.
+
+    Naive datetimes and dates are taken as local time; None stays None
+    (an open end of a range).
+    """
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.strptime(value, DATE_FORMAT)
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=ZoneInfo(timezone))
+    return int(value.timestamp())
+
+
+def window_bounds(window, now=None, timezone=LOCAL_TIMEZONE):
+    """
+    Start and end (exclusive) epoch seconds of a named window.
+
+    Args:
+        window (str): 'tonight', 'weekend' or '<N>d' (see module docstring)
+        now (datetime): Reference time (defaults to now)
+        timezone (str): Timezone the window's days are counted in
+
+    Returns:
+        tuple: (start, end) epoch seconds
+    """
+    zone = ZoneInfo(timezone)
+    now = (now or datetime.now(zone))
+    now = now.astimezone(zone) if now.tzinfo else now.replace(tzinfo=zone)
+    today = now.date()
+
+    if window == 'tonight':
+        start, end = today, today + timedelta(days=1)
+        end_hour = TONIGHT_END_HOUR
+    elif window == 'weekend':
+        # Friday is weekday 4; from Friday to Sunday this is the current weekend
+        start = today + timedelta(days=(4 - today.weekday()) % 7 if today.weekday() < 4 else 0)
+        end = start + timedelta(days=7 - start.weekday())
+        end_hour = 0
+    elif window.endswith('d') and window[:-1].isdigit():
+        start, end = today, today + timedelta(days=int(window[:-1]))
+        end_hour = 0
+    else:
+        raise ValueError(f"Unknown time window: {window!r}")
+
+    start_time = datetime(start.year, start.month, start.day, tzinfo=zone)
+    end_time = datetime(end.year, end.month, end.day, end_hour, tzinfo=zone)
+    return int(start_time.timestamp()), int(end_time.timestamp())
+
+
+class TimeIndex:
+    """
+    Events sorted by start time, for O(log n) date-range queries.
+    """
+
+    def __init__(self, epochs, positions, timezone=LOCAL_TIMEZONE):
+        """
+        Args:
+            epochs (list): Sorted start times (epoch seconds)
+            positions (list): Row positions or feature offsets, in the same order
+            timezone (str): Timezone of the listed dates
+        """
+        self.epochs = list(epochs)
+        self.order = list(positions)
+        self.timezone = timezone
+
+    @classmethod
+    def from_frame(cls, df, timezone=LOCAL_TIMEZONE):
+        """
+        Build the index for a DataFrame; positions are row positions (iloc).
+        """
+        epochs = event_epochs(df, timezone).to_numpy(dtype='float64', na_value=np.nan)
+        dated = np.flatnonzero(~np.isnan(epochs))
+        order = dated[np.argsort(epochs[dated], kind='stable')]
+        return cls(epochs[order].astype('int64').tolist(), order.tolist(), timezone)
+
+    @classmethod
+    def from_features(cls, features, timezone=LOCAL_TIMEZONE):
+        """
+        Build the index for GeoJSON features; positions are feature offsets.
+        """
+        properties = pd.DataFrame([feature.get('properties') or {} for feature in features],
+                                  columns=['Date', 'Time'])
+        return cls.from_frame(properties, timezone)
+
+    @classmethod
+    def load(cls, path=TIME_INDEX_PATH):
+        """
+        Load an exported sidecar file.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['epochs'], data['features'], data.get('timezone', LOCAL_TIMEZONE))
+
+    def __len__(self):
+        return len(self.epochs)
+
+    def span(self, start=None, end=None):
+        """
+        Slice bounds of the events starting in [start, end).
+
+        Args:
+            start: Epoch seconds, datetime or YYYY-MM-DD (None for open)
+            end: Epoch seconds, datetime or YYYY-MM-DD, exclusive (None for open)
+
+        Returns:
+            tuple: (first, last) offsets into the sorted index
+        """
+        start, end = to_epoch(start, self.timezone), to_epoch(end, self.timezone)
+        first = 0 if start is None else bisect_left(self.epochs, start)
+        last = len(self.epochs) if end is None else bisect_left(self.epochs, end, first)
+        return first, max(first, last)
+
+    def positions(self, start=None, end=None):
+        """
+        Positions of the events starting in [start, end), in time order.
+        """
+        first, last = self.span(start, end)
+        return self.order[first:last]
+
+    def count(self, start=None, end=None):
+        """
+        Number of events starting in [start, end).
+        """
+        first, last = self.span(start, end)
+        return last - first
+
+    def window(self, name, now=None):
+        """
+        Positions of the events in a named window (see window_bounds).
+        """
+        return self.positions(*window_bounds(name, now, self.timezone))
+
+    def first_date(self):
+        """
+        Local date of the earliest event as YYYY-MM-DD, or None if empty.
+        """
+        return self._local_date(self.epochs[0]) if self.epochs else None
+
+    def last_date(self):
+        """
+        Local date of the latest event as YYYY-MM-DD, or None if empty.
+        """
+        return self._local_date(self.epochs[-1]) if self.epochs else None
+
+    def _local_date(self, epoch):
+        return datetime.fromtimestamp(epoch, ZoneInfo(self.timezone)).strftime(DATE_FORMAT)
+
+
+def write_time_index(geojson_path=GEOJSON_PATH, index_path=TIME_INDEX_PATH):
+    """
+    Build the time index for a GeoJSON file and write the sidecar atomically.
+
+    Returns:
+        dict: The sidecar data that was written
+    """
+    with open(geojson_path, 'r', encoding='utf-8') as f:
+        features = json.load(f).get('features', [])
+    index = TimeIndex.from_features(features)
+
+    data = {
+        'feature_count': len(features),
+        'first': feature_fingerprint(features[0]) if features else None,
+        'last': feature_fingerprint(features[-1]) if features else None,
+        'timezone': index.timezone,
+        'epochs': index.epochs,
+        'features': index.order
+    }
+    temp_path = index_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_path, index_path)
+    return data
+
+
+def main():
+    """
+    Export the sidecar, or list the events in a window, from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Sorted epoch time index for event date ranges')
+    parser.add_argument('geojson', nargs='?', default=GEOJSON_PATH, help='map GeoJSON')
+    parser.add_argument('--output', default=TIME_INDEX_PATH, help='sidecar path')
+    parser.add_argument('--window', help="list events in a window: tonight, weekend or <N>d (e.g. 14d)")
+    parser.add_argument('--csv', help='query an events CSV instead of the GeoJSON')
+    args = parser.parse_args()
+
+    if not args.window:
+        data = write_time_index(args.geojson, args.output)
+        print(f"🕒 Indexed {len(data['epochs'])} of {data['feature_count']} features by start time")
+        print(f"📁 Time index written to {args.output}")
+        return
+
+    if args.csv:
+        from event_schema import read_events_csv
+        df = read_events_csv(args.csv)
+    else:
+        with open(args.geojson, 'r', encoding='utf-8') as f:
+            df = pd.DataFrame([feature['properties'] for feature in json.load(f)['features']])
+    index = TimeIndex.from_frame(df)
+    start, end = window_bounds(args.window)
+    events = df.iloc[index.positions(start, end)]
+    zone = ZoneInfo(index.timezone)
+    print(f"📅 {len(events)} events {datetime.fromtimestamp(start, zone):%a %Y-%m-%d %H:%M} "
+          f"to {datetime.fromtimestamp(end, zone):%a %Y-%m-%d %H:%M}")
+    for artist, location, date, time in zip(events['Artist'], events['Location'], events['Date'],
+                                            events['Time'] if 'Time' in events.columns else [None] * len(events)):
+        print(f"  - {date_text(date)} {time if isinstance(time, str) else 'TBA':>8}  {artist} @ {location}")
+
+
+if __name__ == "__main__":
+    main()
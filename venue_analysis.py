@@ -1,78 +1,185 @@
-import pandas as pd
+import argparse
 import json
-from collections import Counter
 
-def analyze_venues():
-    """Analyze venue data to identify missing point locations."""
-    
-    # Read the CSV file
-    print("Reading CSV data...")
-    df = pd.read_csv('lexington_events_time_imperial_modified.csv')
-    
-    # Read the GeoJSON file
-    print("Reading GeoJSON data...")
-    with open('shp/merged_venues_events.geojson', 'r') as f:
-        geojson_data = json.load(f)
-    
-    # Extract venues from CSV
-    csv_venues = set(df['Location'].unique())
-    print(f"\nVenues found in CSV ({len(csv_venues)}):")
-    for venue in sorted(csv_venues):
+from event_schema import apply_event_schema, date_text, read_events_csv
+from time_index import TimeIndex
+from venue_registry import REGISTRY_PATH, open_registry
+
+EVENTS_CSV = 'lexington_events_time_imperial_modified.csv'
+
+
+def load_events(csv_path=EVENTS_CSV, history_dir=None, window=None):
+    """
+    Load events from the CSV, or from the Parquet history archive, typed with the event schema.
+
+    The archive holds every scrape of an event, so it is reduced to the
+    latest scrape of each Event_Key. With a window ('tonight', 'weekend', '14d', ... see time_index.py) only
+    events starting in it are kept, in time order.
+    """
+    columns = ('Artist', 'Location', 'Date', 'Time')
+    if history_dir:
+        from history_archive import open_archive
+        table = open_archive(history_dir).to_table(columns=list(columns) + ['Event_Key', 'Scraped_At'])
+        df = table.to_pandas(categories=['Location']).sort_values('Scraped_At', kind='stable')
+        df = df.drop_duplicates('Event_Key', keep='last').drop(columns=['Event_Key', 'Scraped_At'])
+        df = apply_event_schema(df.reset_index(drop=True))
+    else:
+        df = read_events_csv(csv_path, usecols=lambda column: column in columns)
+    if window:
+        df = df.iloc[TimeIndex.from_frame(df).window(window)]
+    return df
+
+
+def load_registry_venues(registry_path=REGISTRY_PATH):
+    """Return venue names and aliases with point locations, mapped to their registry venue name."""
+    with open_registry(registry_path) as registry:
+        return registry.canonical_names()
+
+
+def build_coverage_report(df, venue_names):
+    """
+    Build the venue coverage report in a single pass over the events.
+
+    Per-venue stats come from one groupby; missing/extra venues are set
+    operations on the venue keys, so the cost is O(events + venues).
+    venue_names maps every registry name and alias to its venue name.
+    """
+    stats = df.groupby('Location', sort=False, observed=True).agg(
+        events=('Artist', 'size'),
+        first_date=('Date', 'min'),
+        last_date=('Date', 'max')
+    )
+    stats['mapped'] = stats.index.isin(list(venue_names))
+    stats = stats.sort_values('events', ascending=False, kind='stable')
+
+    csv_venues = set(stats.index)
+    registry_venues = set(venue_names.values())
+    missing_venues = csv_venues - set(venue_names)
+    extra_venues = registry_venues - {venue_names[venue] for venue in csv_venues - missing_venues}
+
+    # Event listings for missing venues, taken from one filtered groupby
+    missing_events = {}
+    unmapped = df[df['Location'].isin(missing_venues)]
+    for venue, events in unmapped.groupby('Location', sort=True, observed=True):
+        missing_events[venue] = [
+            {'artist': artist, 'date': date_text(date) or None}
+            for artist, date in zip(events['Artist'], events['Date'])
+        ]
+
+    venues = [
+        {
+            'venue': venue,
+            'events': int(row.events),
+            'first_date': date_text(row.first_date) or None,
+            'last_date': date_text(row.last_date) or None,
+            'mapped': bool(row.mapped)
+        }
+        for venue, row in zip(stats.index, stats.itertuples(index=False))
+    ]
+
+    return {
+        'csv_venues': sorted(csv_venues),
+        'registry_venues': sorted(registry_venues),
+        'missing_venues': sorted(missing_venues),
+        'extra_venues': sorted(extra_venues),
+        'missing_venue_events': missing_events,
+        'venues': venues,
+        'summary': {
+            'total_csv_venues': len(csv_venues),
+            'total_registry_venues': len(registry_venues),
+            'missing_point_locations': len(missing_venues),
+            'total_events': len(df),
+            'events_without_locations': int(stats.loc[~stats['mapped'], 'events'].sum())
+        }
+    }
+
+
+def print_report_table(report):
+    """Print the coverage report as a human-readable table."""
+    print(f"\nVenues found in CSV ({len(report['csv_venues'])}):")
+    for venue in report['csv_venues']:
         print(f"  - {venue}")
-    
-    # Extract venues from GeoJSON
-    geojson_venues = set()
-    for feature in geojson_data['features']:
-        venue = feature['properties']['Venue']
-        geojson_venues.add(venue)
-    
-    print(f"\nVenues found in GeoJSON ({len(geojson_venues)}):")
-    for venue in sorted(geojson_venues):
+
+    print(f"\nVenues in the venue registry ({len(report['registry_venues'])}):")
+    for venue in report['registry_venues']:
         print(f"  - {venue}")
-    
-    # Find missing venues (in CSV but not in GeoJSON)
-    missing_venues = csv_venues - geojson_venues
+
+    missing_venues = report['missing_venues']
     print(f"\n❌ MISSING VENUES ({len(missing_venues)}):")
     if missing_venues:
-        for venue in sorted(missing_venues):
+        for venue in missing_venues:
             print(f"  - {venue}")
-            
+
         # Show events for missing venues
         print(f"\n📅 Events at missing venues:")
-        for venue in sorted(missing_venues):
-            venue_events = df[df['Location'] == venue]
-            print(f"\n  {venue} ({len(venue_events)} events):")
-            for _, event in venue_events.iterrows():
-                print(f"    - {event['Artist']} on {event['Date']}")
+        for venue, events in report['missing_venue_events'].items():
+            print(f"\n  {venue} ({len(events)} events):")
+            for event in events:
+                print(f"    - {event['artist']} on {event['date']}")
     else:
         print("  ✅ All venues have point locations!")
-    
-    # Find extra venues (in GeoJSON but not in CSV)
-    extra_venues = geojson_venues - csv_venues
-    print(f"\n📊 EXTRA VENUES in GeoJSON ({len(extra_venues)}):")
+
+    extra_venues = report['extra_venues']
+    print(f"\n📊 EXTRA VENUES in the registry ({len(extra_venues)}):")
     if extra_venues:
-        for venue in sorted(extra_venues):
+        for venue in extra_venues:
             print(f"  - {venue}")
     else:
         print("  ✅ No extra venues found.")
-    
+
     # Venue statistics
     print(f"\n📈 VENUE STATISTICS:")
-    venue_counts = Counter(df['Location'])
     print("Events per venue:")
-    for venue, count in venue_counts.most_common():
-        status = "❌ MISSING" if venue in missing_venues else "✅ MAPPED"
-        print(f"  - {venue}: {count} events {status}")
-    
+    for venue in report['venues']:
+        status = "✅ MAPPED" if venue['mapped'] else "❌ MISSING"
+        print(f"  - {venue['venue']}: {venue['events']} events {status}")
+
     # Summary
+    summary = report['summary']
     print(f"\n🎯 SUMMARY:")
-    print(f"  - Total venues in CSV: {len(csv_venues)}")
-    print(f"  - Total venues in GeoJSON: {len(geojson_venues)}")
-    print(f"  - Missing point locations: {len(missing_venues)}")
-    print(f"  - Total events: {len(df)}")
-    print(f"  - Events without locations: {len(df[df['Location'].isin(missing_venues)])}")
-    
-    return missing_venues, df
+    print(f"  - Total venues in CSV: {summary['total_csv_venues']}")
+    print(f"  - Total venues in registry: {summary['total_registry_venues']}")
+    print(f"  - Missing point locations: {summary['missing_point_locations']}")
+    print(f"  - Total events: {summary['total_events']}")
+    print(f"  - Events without locations: {summary['events_without_locations']}")
+
+
+def analyze_venues(csv_path=EVENTS_CSV, registry_path=REGISTRY_PATH, history_dir=None, output='table',
+                   window=None):
+    """Analyze venue data to identify missing point locations."""
+
+    if output == 'table':
+        print("Reading event data...")
+    df = load_events(csv_path, history_dir, window)
+
+    if output == 'table':
+        print("Reading venue registry...")
+    venue_names = load_registry_venues(registry_path)
+
+    report = build_coverage_report(df, venue_names)
+
+    if output == 'json':
+        print(json.dumps(report, indent=2))
+    else:
+        print_report_table(report)
+
+    return set(report['missing_venues']), df
+
+
+def main():
+    """Run the venue coverage report from the command line."""
+    parser = argparse.ArgumentParser(description='Report which venues are missing point locations')
+    parser.add_argument('--format', choices=['table', 'json'], default='table', help='output format')
+    parser.add_argument('--csv', default=EVENTS_CSV, help='events CSV to analyze')
+    parser.add_argument('--history-dir', default=None,
+                        help='analyze the Parquet history archive instead of the CSV')
+    parser.add_argument('--registry', default=REGISTRY_PATH, help='venue registry database')
+    parser.add_argument('--window', default=None,
+                        help="only events in a time window: tonight, weekend or <N>d (e.g. 14d)")
+    args = parser.parse_args()
+
+    analyze_venues(args.csv, args.registry, args.history_dir, args.format, args.window)
+
 
 if __name__ == "__main__":
-    missing_venues, df = analyze_venues()
+    main()
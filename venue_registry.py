@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Venue Registry with an SQLite R-tree Index
+
+Venue locations used to live in three places: shp/venues.shp (edited by hand
+in QGIS, see venues.qgz), a hard-coded dict in add_missing_venues.py and the
+geocoder's missing_venue_coordinates.json. Each tool reloaded the file it
+knew about. This module keeps them in one SQLite database:
+
+    shp/venues.sqlite
+        venues        id, name, name_key, lon, lat, address, source, shapefile_id
+        venue_aliases alias_key -> venue id (e.g. "Al's Bar of Lexington")
+        venue_rtree   R-tree over venue points, for bounding-box and
+                      nearest-venue queries
+        sources       signature of each imported file
+
+Names are matched by their normalized form (see dedup.normalize_text) and by
+alias. Sources have a priority: the hand-edited shapefile wins over manual
+entries, which win over geocoder results, so a geocoder run never moves a
+venue someone placed in QGIS. A geocoded point within MATCH_DISTANCE_MILES of
+an existing venue under another name is stored as an alias of that venue.
+
+open_registry() re-imports the shapefile and JSON whenever they change, so
+callers always see the current data without reloading the files themselves.
+
+Usage:
+    python venue_registry.py import
+    python venue_registry.py lookup "Al's Bar of Lexington"
+    python venue_registry.py nearest 38.0406 -84.5037 [--count 3]
+    python venue_registry.py bbox -84.52 38.04 -84.49 38.06
+"""
+
+import argparse
+import json
+import math
+import os
+import sqlite3
+from datetime import datetime
+
+from dedup import normalize_text
+
+REGISTRY_PATH = 'shp/venues.sqlite'
+SHAPEFILE_PATH = 'shp/venues.shp'
+GEOCODED_PATH = 'missing_venue_coordinates.json'
+
+# Higher wins when the same venue comes from several sources
+SOURCE_PRIORITY = {'geocoder': 1, 'manual': 2, 'shapefile': 3}
+
+# A new name this close to a known venue is treated as an alias of it
+MATCH_DISTANCE_MILES = 0.05
+
+EARTH_RADIUS_MILES = 3959
+MILES_PER_DEGREE_LAT = 69.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS venues (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL UNIQUE,
+    lon REAL NOT NULL,
+    lat REAL NOT NULL,
+    address TEXT,
+    source TEXT NOT NULL,
+    shapefile_id TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS venue_aliases (
+    alias_key TEXT PRIMARY KEY,
+    alias TEXT NOT NULL,
+    venue_id INTEGER NOT NULL REFERENCES venues(id) ON DELETE CASCADE
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS venue_rtree USING rtree(id, min_lon, max_lon, min_lat, max_lat);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    signature TEXT NOT NULL
+);
+"""
+
+COLUMNS = ('id', 'name', 'lon', 'lat', 'address', 'source', 'shapefile_id')
+
+
+def distance_miles(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance between two points in miles.
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+def degree_box(lat, lon, miles):
+    """
+    Bounding box (min_lon, min_lat, max_lon, max_lat) covering a radius.
+    """
+    dlat = miles / MILES_PER_DEGREE_LAT
+    dlon = miles / (MILES_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+    return lon - dlon, lat - dlat, lon + dlon, lat + dlat
+
+
+def file_signature(path):
+    """
+    Modification time and size of a file, to detect changes.
+    """
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class VenueRegistry:
+    """
+    Venue names and points in SQLite, with an R-tree spatial index.
+    """
+
+    def __init__(self, path=REGISTRY_PATH):
+        self.path = path
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _row(self, row):
+        return {column: row[column] for column in COLUMNS} if row is not None else None
+
+    # Writes
+
+    def upsert(self, name, lat, lon, source, address=None, shapefile_id=None, commit=True):
+        """
+        Add or update a venue.
+
+        An existing venue with the same normalized name (or alias) is only
+        updated if the new source has at least its priority.
+
+        Args:
+            name (str): Venue name as events list it
+            lat (float): Latitude
+            lon (float): Longitude
+            source (str): 'shapefile', 'manual' or 'geocoder'
+            address (str): Optional address
+            shapefile_id: Optional id from the shapefile
+            commit (bool): Commit immediately
+
+        Returns:
+            int: Venue id
+        """
+        key = normalize_text(name)
+        if not key:
+            raise ValueError(f"Invalid venue name: {name!r}")
+        now = datetime.now().isoformat(timespec='seconds')
+        existing = self._find_row(name)
+        if existing is None:
+            cursor = self.connection.execute(
+                "INSERT INTO venues (name, name_key, lon, lat, address, source, shapefile_id, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (name, key, lon, lat, address, source, shapefile_id, now))
+            venue_id = cursor.lastrowid
+            self.connection.execute("INSERT INTO venue_rtree VALUES (?, ?, ?, ?, ?)",
+                                    (venue_id, lon, lon, lat, lat))
+        else:
+            venue_id = existing['id']
+            if SOURCE_PRIORITY.get(source, 0) >= SOURCE_PRIORITY.get(existing['source'], 0):
+                self.connection.execute(
+                    "UPDATE venues SET lon = ?, lat = ?, address = COALESCE(?, address), source = ?, "
+                    "shapefile_id = COALESCE(?, shapefile_id), updated_at = ? WHERE id = ?",
+                    (lon, lat, address, source, shapefile_id, now, venue_id))
+                self.connection.execute(
+                    "UPDATE venue_rtree SET min_lon = ?, max_lon = ?, min_lat = ?, max_lat = ? WHERE id = ?",
+                    (lon, lon, lat, lat, venue_id))
+        if commit:
+            self.connection.commit()
+        return venue_id
+
+    def add_alias(self, alias, name, commit=True):
+        """
+        Make another name resolve to an existing venue.
+
+        Returns:
+            bool: True if the alias was added, False if the venue is unknown
+        """
+        venue = self._find_row(name)
+        alias_key = normalize_text(alias)
+        if venue is None or not alias_key or alias_key == normalize_text(venue['name']):
+            return False
+        self.connection.execute(
+            "INSERT OR REPLACE INTO venue_aliases (alias_key, alias, venue_id) VALUES (?, ?, ?)",
+            (alias_key, alias, venue['id']))
+        if commit:
+            self.connection.commit()
+        return True
+
+    def add_located(self, name, lat, lon, source, address=None, commit=True):
+        """
+        Record a venue found by geocoding or by hand.
+
+        If the point is within MATCH_DISTANCE_MILES of a known venue with a
+        different name, the name becomes an alias of that venue instead.
+
+        Returns:
+            int: Id of the venue the name now resolves to
+        """
+        if self._find_row(name) is None:
+            nearby = self.nearest(lat, lon, count=1, max_miles=MATCH_DISTANCE_MILES)
+            if nearby:
+                self.add_alias(name, nearby[0]['name'], commit=commit)
+                return nearby[0]['id']
+        return self.upsert(name, lat, lon, source, address=address, commit=commit)
+
+    def import_shapefile(self, path=SHAPEFILE_PATH):
+        """
+        Import the hand-edited venues shapefile (points in any CRS).
+
+        The shapefile is the source of truth for its venues: shapefile
+        venues deleted or renamed in it since the last import are removed
+        (their aliases cascade) in the same transaction.
+
+        Returns:
+            int: Venues imported
+        """
+        import geopandas as gpd
+
+        venues_gdf = gpd.read_file(path)
+        if venues_gdf.crs is not None and venues_gdf.crs.to_epsg() != 4326:
+            venues_gdf = venues_gdf.to_crs(epsg=4326)
+        imported = set()
+        ids = venues_gdf['id'] if 'id' in venues_gdf.columns else [None] * len(venues_gdf)
+        for venue_id, name, geometry in zip(ids, venues_gdf['Venue'], venues_gdf.geometry):
+            if not name or geometry is None or geometry.is_empty:
+                continue
+            shapefile_id = None if venue_id is None or venue_id != venue_id else str(venue_id)
+            imported.add(self.upsert(name, geometry.y, geometry.x, 'shapefile', shapefile_id=shapefile_id,
+                                     commit=False))
+        count = len(imported)
+
+        removed = [row['id'] for row in self.connection.execute("SELECT id FROM venues WHERE source = 'shapefile'")
+                   if row['id'] not in imported]
+        for venue_id in removed:
+            self.connection.execute("DELETE FROM venue_rtree WHERE id = ?", (venue_id,))
+            self.connection.execute("DELETE FROM venues WHERE id = ?", (venue_id,))
+        self._record_source(path)
+        self.connection.commit()
+        return count
+
+    def import_json(self, path=GEOCODED_PATH, source='geocoder'):
+        """
+        Import geocoded venues: a list of {venue, lat, lon, address}.
+
+        Returns:
+            int: Entries imported
+        """
+        with open(path, 'r') as f:
+            entries = json.load(f)
+        for entry in entries:
+            self.add_located(entry['venue'], entry['lat'], entry['lon'], source,
+                             address=entry.get('address'), commit=False)
+        self._record_source(path)
+        self.connection.commit()
+        return len(entries)
+
+    def import_dict(self, venues, source='manual'):
+        """
+        Import venues from a {name: {lat, lon, address}} mapping.
+
+        Returns:
+            int: Entries imported
+        """
+        for name, coords in venues.items():
+            self.add_located(name, coords['lat'], coords['lon'], source,
+                             address=coords.get('address'), commit=False)
+        self.connection.commit()
+        return len(venues)
+
+    def _record_source(self, path):
+        self.connection.execute("INSERT OR REPLACE INTO sources (path, signature) VALUES (?, ?)",
+                                (os.path.abspath(path), file_signature(path)))
+
+    def source_changed(self, path):
+        """
+        Check whether a source file changed since it was last imported.
+        """
+        if not os.path.exists(path):
+            return False
+        row = self.connection.execute("SELECT signature FROM sources WHERE path = ?",
+                                      (os.path.abspath(path),)).fetchone()
+        return row is None or row['signature'] != file_signature(path)
+
+    # Lookups
+
+    def _find_row(self, name):
+        key = normalize_text(name)
+        if not key:
+            return None
+        row = self.connection.execute("SELECT * FROM venues WHERE name_key = ?", (key,)).fetchone()
+        if row is None:
+            row = self.connection.execute(
+                "SELECT venues.* FROM venue_aliases JOIN venues ON venues.id = venue_aliases.venue_id "
+                "WHERE venue_aliases.alias_key = ?", (key,)).fetchone()
+        return row
+
+    def get(self, name):
+        """
+        Look up a venue by name or alias.
+
+        Returns:
+            dict: Venue (id, name, lon, lat, address, source, shapefile_id),
+            or None if unknown
+        """
+        return self._row(self._find_row(name))
+
+    def resolve(self, names):
+        """
+        Map event location names to registry venue names.
+
+        Returns:
+            dict: Location name -> canonical venue name (known names only)
+        """
+        resolved = {}
+        for name in names:
+            venue = self._find_row(name)
+            if venue is not None:
+                resolved[name] = venue['name']
+        return resolved
+
+    def all(self):
+        """
+        Return every venue, ordered by name.
+        """
+        rows = self.connection.execute("SELECT * FROM venues ORDER BY name").fetchall()
+        return [self._row(row) for row in rows]
+
+    def names(self):
+        """
+        Return the set of canonical venue names.
+        """
+        return {row['name'] for row in self.connection.execute("SELECT name FROM venues")}
+
+    def canonical_names(self):
+        """
+        Map every name and alias to its venue name.
+
+        Returns:
+            dict: Name or alias -> venue name
+        """
+        names = {row['name']: row['name'] for row in self.connection.execute("SELECT name FROM venues")}
+        for row in self.connection.execute(
+                "SELECT venue_aliases.alias, venues.name FROM venue_aliases "
+                "JOIN venues ON venues.id = venue_aliases.venue_id"):
+            names.setdefault(row['alias'], row['name'])
+        return names
+
+    def points(self):
+        """
+        Map every name and alias to its point, for constant-time joins.
+
+        Returns:
+            dict: Name -> (shapefile id, [lon, lat])
+        """
+        points = {}
+        for row in self.connection.execute("SELECT * FROM venues"):
+            points[row['name']] = (row['shapefile_id'], [row['lon'], row['lat']])
+        for row in self.connection.execute(
+                "SELECT venue_aliases.alias, venues.* FROM venue_aliases "
+                "JOIN venues ON venues.id = venue_aliases.venue_id"):
+            points.setdefault(row['alias'], (row['shapefile_id'], [row['lon'], row['lat']]))
+        return points
+
+    def in_bbox(self, min_lon, min_lat, max_lon, max_lat):
+        """
+        Venues inside a bounding box, via the R-tree.
+
+        Returns:
+            list: Venue dicts
+        """
+        rows = self.connection.execute(
+            "SELECT venues.* FROM venue_rtree JOIN venues ON venues.id = venue_rtree.id "
+            "WHERE venue_rtree.min_lon <= ? AND venue_rtree.max_lon >= ? "
+            "AND venue_rtree.min_lat <= ? AND venue_rtree.max_lat >= ?",
+            (max_lon, min_lon, max_lat, min_lat)).fetchall()
+        return [self._row(row) for row in rows]
+
+    def extent(self):
+        """
+        Bounding box of all venues, or None if the registry is empty.
+
+        Returns:
+            tuple: (min_lon, min_lat, max_lon, max_lat)
+        """
+        row = self.connection.execute(
+            "SELECT MIN(min_lon), MIN(min_lat), MAX(max_lon), MAX(max_lat) FROM venue_rtree").fetchone()
+        return None if row[0] is None else tuple(row)
+
+    def nearest(self, lat, lon, count=1, max_miles=None):
+        """
+        Find the venues closest to a point.
+
+        The search box grows until it holds enough candidates, then one box
+        with the radius of the farthest candidate makes the result exact.
+
+        Args:
+            lat (float): Latitude
+            lon (float): Longitude
+            count (int): Number of venues to return
+            max_miles (float): Ignore venues farther than this
+
+        Returns:
+            list: Venue dicts with a 'distance_miles' key, nearest first
+        """
+        total = self.connection.execute("SELECT COUNT(*) FROM venues").fetchone()[0]
+        wanted = min(count, total)
+        if wanted == 0:
+            return []
+
+        radius = 0.5 if max_miles is None else min(max_miles, 0.5)
+        while True:
+            candidates = self.in_bbox(*degree_box(lat, lon, radius))
+            if len(candidates) >= wanted or (max_miles is not None and radius >= max_miles):
+                break
+            radius = radius * 4 if max_miles is None else min(radius * 4, max_miles)
+
+        for venue in candidates:
+            venue['distance_miles'] = distance_miles(lat, lon, venue['lat'], venue['lon'])
+        candidates.sort(key=lambda venue: venue['distance_miles'])
+        if len(candidates) >= wanted:
+            # Venues outside the box may still beat the farthest candidate
+            reach = candidates[wanted - 1]['distance_miles']
+            if max_miles is not None:
+                reach = min(reach, max_miles)
+            candidates = self.in_bbox(*degree_box(lat, lon, reach))
+            for venue in candidates:
+                venue['distance_miles'] = distance_miles(lat, lon, venue['lat'], venue['lon'])
+            candidates.sort(key=lambda venue: venue['distance_miles'])
+
+        if max_miles is not None:
+            candidates = [venue for venue in candidates if venue['distance_miles'] <= max_miles]
+        return candidates[:count]
+
+
+def open_registry(path=REGISTRY_PATH, shapefile_path=SHAPEFILE_PATH, geocoded_path=GEOCODED_PATH):
+    """
+    Open the registry, importing the shapefile and geocoded JSON if they
+    changed since the last import.
+
+    Returns:
+        VenueRegistry: Up-to-date registry
+    """
+    registry = VenueRegistry(path)
+    shapefile_changed = registry.source_changed(shapefile_path)
+    if shapefile_changed:
+        registry.import_shapefile(shapefile_path)
+    # Geocoded names may alias venues the shapefile just renamed or removed
+    if (shapefile_changed and os.path.exists(geocoded_path)) or registry.source_changed(geocoded_path):
+        registry.import_json(geocoded_path)
+    return registry
+
+
+def main():
+    """
+    Import sources and query the registry from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Venue registry with spatial queries')
+    parser.add_argument('--registry', default=REGISTRY_PATH, help='registry database')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('import', help='re-import the shapefile and geocoded venues')
+    lookup = subparsers.add_parser('lookup', help='look up a venue by name or alias')
+    lookup.add_argument('name')
+    nearest = subparsers.add_parser('nearest', help='venues closest to a point')
+    nearest.add_argument('lat', type=float)
+    nearest.add_argument('lon', type=float)
+    nearest.add_argument('--count', type=int, default=3)
+    bbox = subparsers.add_parser('bbox', help='venues inside a bounding box')
+    for name in ('min_lon', 'min_lat', 'max_lon', 'max_lat'):
+        bbox.add_argument(name, type=float)
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        with VenueRegistry(args.registry) as registry:
+            shapefile_count = registry.import_shapefile(SHAPEFILE_PATH) if os.path.exists(SHAPEFILE_PATH) else 0
+            geocoded_count = registry.import_json(GEOCODED_PATH) if os.path.exists(GEOCODED_PATH) else 0
+            print(f"📍 Imported {shapefile_count} shapefile venues and {geocoded_count} geocoded entries; "
+                  f"{len(registry.names())} venues in {args.registry}")
+        return
+
+    with open_registry(args.registry) as registry:
+        if args.command == 'lookup':
+            venue = registry.get(args.name)
+            if venue is None:
+                print(f"❌ No venue named {args.name!r}")
+            else:
+                print(f"📍 {venue['name']}: {venue['lat']:.6f}, {venue['lon']:.6f} ({venue['source']})")
+        elif args.command == 'nearest':
+            for venue in registry.nearest(args.lat, args.lon, args.count):
+                print(f"📍 {venue['name']}: {venue['distance_miles']:.2f} miles")
+        else:
+            venues = registry.in_bbox(args.min_lon, args.min_lat, args.max_lon, args.max_lat)
+            print(f"📦 {len(venues)} venues in box")
+            for venue in sorted(venues, key=lambda venue: venue['name']):
+                print(f"  - {venue['name']}: {venue['lat']:.6f}, {venue['lon']:.6f}")
+
+
+if __name__ == "__main__":
+    main()